@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Measures the rate at which tiles are read from a local HTTP server, through HttpBackend's shared,
+pooled session, and through a new session for every read.
+
+    python benchmarks/http_read.py --tiles 2000 --workers 8
+"""
+import argparse
+import hashlib
+import http.server
+import socketserver
+import tempfile
+import threading
+import time
+from functools import partial
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import retry
+
+from slicedimage.backends import HttpBackend
+from slicedimage.backends._http import RETRY_STATUS_CODES
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    # HTTP/1.1, such that connections are kept alive between requests.  Without TCP_NODELAY, each
+    # response on a kept-alive connection would wait for the client's delayed acknowledgement.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+
+class PerReadSessionHttpBackend(HttpBackend):
+    """An HttpBackend that builds a new session, with its own connection pool, for every read."""
+    def _session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(max_retries=retry.Retry(
+            connect=10, read=10, status=10, backoff_factor=0.1,
+            status_forcelist=RETRY_STATUS_CODES))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+def write_tiles(path, num_tiles, tile_size):
+    """Writes `num_tiles` npy files of `tile_size` x `tile_size` uint16 pixels, and returns their
+    names and checksums."""
+    names_and_checksums = []
+    rng = np.random.RandomState(0)
+    for ix in range(num_tiles):
+        name = "tile-{}.npy".format(ix)
+        np.save(str(path / name), rng.randint(0, 65536, (tile_size, tile_size), dtype=np.uint16))
+        names_and_checksums.append(
+            (name, hashlib.sha256((path / name).read_bytes()).hexdigest()))
+    return names_and_checksums
+
+
+def tiles_per_second(backend, names_and_checksums, workers):
+    def read(name_and_checksum):
+        name, checksum = name_and_checksum
+        with backend.read_contextmanager(name, checksum) as fh:
+            fh.read()
+
+    pool = ThreadPool(workers)
+    try:
+        start = time.perf_counter()
+        pool.map(read, names_and_checksums)
+        return len(names_and_checksums) / (time.perf_counter() - start)
+    finally:
+        pool.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=2000, help="Number of tiles")
+    parser.add_argument(
+        "--tile-size", type=int, default=64, help="Number of pixels along each side of a tile")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Number of tiles to read concurrently")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of each measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        names_and_checksums = write_tiles(Path(tempdir), args.tiles, args.tile_size)
+
+        server = _ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(_QuietHandler, directory=tempdir))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            baseurl = "http://127.0.0.1:{}".format(server.server_address[1])
+            print("{} tiles of {} bytes, {} workers".format(
+                args.tiles, (Path(tempdir) / names_and_checksums[0][0]).stat().st_size,
+                args.workers))
+            for label, backend in (
+                    ("per-read sessions", PerReadSessionHttpBackend(baseurl)),
+                    ("pooled session", HttpBackend(baseurl)),
+            ):
+                rate = max(
+                    tiles_per_second(backend, names_and_checksums, args.workers)
+                    for _ in range(args.repeat))
+                print("{:>18}: {:.0f} tiles/s".format(label, rate))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Measures the time taken to parse a synthetic tileset manifest, with the standard library's JSON
+decoder and with the fast decoder (orjson or ujson), if one is installed.
+
+    python benchmarks/parse_manifest.py --tiles 100000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import slicedimage
+from slicedimage.io import _json
+
+
+def write_manifest(path, num_tiles):
+    """Writes a tileset manifest with `num_tiles` tiles, spread over 10 rounds and 4 channels."""
+    num_rounds, num_channels = 10, 4
+    num_zplanes = -(-num_tiles // (num_rounds * num_channels))
+    tiles = []
+    for r in range(num_rounds):
+        for ch in range(num_channels):
+            for z in range(num_zplanes):
+                if len(tiles) == num_tiles:
+                    break
+                tiles.append({
+                    "coordinates": {
+                        "xc": [0.0, 0.1], "yc": [0.2, 0.3], "zc": [z * 0.01, z * 0.01]},
+                    "indices": {"r": r, "c": ch, "z": z},
+                    "file": "tile-r{}-c{}-z{}.npy".format(r, ch, z),
+                    "sha256": "{:064x}".format(len(tiles) + 1),
+                    "tile_shape": {"y": 2048, "x": 2048},
+                    "tile_format": "NUMPY",
+                })
+    doc = {
+        "version": "0.1.0",
+        "extras": {},
+        "dimensions": ["x", "y", "r", "c", "z"],
+        "shape": {"r": num_rounds, "c": num_channels, "z": num_zplanes},
+        "tiles": tiles,
+    }
+    with open(str(path), "w") as fh:
+        json.dump(doc, fh)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=100000, help="Number of tiles")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of each measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir) / "tileset.json"
+        write_manifest(path, args.tiles)
+        data = path.read_bytes()
+        print("{} tiles, {:.1f} MB manifest".format(args.tiles, len(data) / 1e6))
+
+        def parse():
+            slicedimage.Reader.parse_doc(path.name, path.parent.as_uri())
+
+        decoders = [("json", None)]
+        if _json.FAST_DECODER_NAME is not None:
+            decoders.append((_json.FAST_DECODER_NAME, _json._fast_loads))
+        fast_loads = _json._fast_loads
+        try:
+            for decoder_name, loads in decoders:
+                _json._fast_loads = loads
+                decode_time = best_of(args.repeat, lambda: _json.loads(data))
+                parse_time = best_of(args.repeat, parse)
+                print("{:>8}: decode {:.3f}s, parse_doc {:.3f}s ({:.1f} us/tile)".format(
+                    decoder_name, decode_time, parse_time, parse_time / args.tiles * 1e6))
+        finally:
+            _json._fast_loads = fast_loads
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,10 @@ setuptools.setup(
         )
     ),
     install_requires=install_requires,
+    extras_require={
+        # decodes large tileset documents several times faster than the standard library.
+        "fast-json": ["orjson"],
+    },
     entry_points={
         'console_scripts': "slicedimage=slicedimage.cli.main:main"
     }
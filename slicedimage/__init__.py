@@ -1,5 +1,7 @@
+from ._array_cache import DecodedArrayCache, decoded_array_cache
 from ._dimensions import DimensionNames
 from ._formats import ImageFormat
+from ._lazy_array import LazyTileArray
 from ._collection import Collection
 from ._tile import Tile
 from ._tileset import TileSet
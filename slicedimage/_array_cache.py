@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_SIZE_LIMIT = 0
+"""Default number of bytes of decoded tile data that are retained in memory.  The cache is disabled
+by default."""
+
+
+class DecodedArrayCache:
+    """
+    A bounded, thread-safe, least-recently-used cache of decoded tile data.  Entries are keyed by
+    the tile's sha256 checksum, or, if `key_by_url` is set, by its url if the tile has no checksum.
+    Once the total size of the cached arrays exceeds `size_limit`, the least recently used arrays
+    are evicted.
+
+    Arrays held by the cache are shared by every tile that decodes to the same key, and are
+    therefore marked read-only.  Callers that wish to modify tile data in place should copy it.
+    Because of this, the cache is disabled unless a size limit is set, e.g.,
+    ``slicedimage.decoded_array_cache.size_limit = 256 * 1024 * 1024``.
+
+    Tiles without a checksum are not cached unless `key_by_url` is set, as a file that is rewritten
+    in place would then be served from the cache as it was before.
+    """
+    def __init__(self, size_limit=DEFAULT_SIZE_LIMIT, key_by_url=False):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._size_limit = size_limit
+        self.key_by_url = key_by_url
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def size_limit(self):
+        """The number of bytes of arrays retained by the cache.  A size limit of 0 disables the
+        cache."""
+        return self._size_limit
+
+    @size_limit.setter
+    def size_limit(self, size_limit):
+        with self._lock:
+            self._size_limit = size_limit
+            self._evict()
+
+    def get(self, key):
+        """Returns the array stored under `key`, or None if there is no such array."""
+        if self._size_limit == 0:
+            return None
+        with self._lock:
+            array = self._entries.get(key, None)
+            if array is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return array
+
+    def put(self, key, array):
+        """
+        Stores `array` under `key`, evicting the least recently used arrays as needed.  Arrays that
+        are larger than the size limit, and arrays put while the cache is disabled, are not stored.
+        Returns the array that callers should use, which is read-only if it was stored.
+        """
+        if self._size_limit == 0 or array.nbytes > self._size_limit:
+            return array
+        array.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.nbytes
+            self._entries[key] = array
+            self.size += array.nbytes
+            self._evict()
+        return array
+
+    def clear(self):
+        """Removes all the arrays from the cache, and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _evict(self):
+        while self.size > self._size_limit and len(self._entries) > 0:
+            _, array = self._entries.popitem(last=False)
+            self.size -= array.nbytes
+            self.evictions += 1
+
+
+decoded_array_cache = DecodedArrayCache()
+"""The cache of decoded tile data shared by all the tilesets and collections in this process."""
@@ -1,22 +1,56 @@
+from threading import Lock
+
 from ._tileset import TileSet
 
 
 class Collection:
     def __init__(self, extras=None):
         self.extras = extras
-        self._partitions = dict()
+        # maps the name of each partition to the partition, or to a _PartitionFuture that produces
+        # the partition if it has not been loaded yet.
+        self._partition_entries = dict()
+        # the executor that partitions that have not been loaded yet are loaded on, concurrently.
+        # This is set for the collections of a lazily parsed document, to the executor of the
+        # parse.
+        self._executor = None
+
+    @property
+    def _partitions(self):
+        """All the partitions of this collection, keyed by name.  Partitions that have not been
+        loaded yet are loaded first."""
+        self._load_all()
+        return self._partition_entries
+
+    @_partitions.setter
+    def _partitions(self, partitions):
+        self._partition_entries = partitions
 
     def validate(self):
         pass
 
     def add_partition(self, name, partition):
-        self._partitions[name] = partition
+        self._partition_entries[name] = partition
+
+    def add_partition_future(self, name, future):
+        """
+        Adds a partition that is not loaded until it is first accessed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the partition.
+        future : Callable[[], Union[Collection, TileSet]]
+            A callable that yields the partition when invoked.  It is invoked at most once.
+        """
+        self._partition_entries[name] = _PartitionFuture(future)
 
     def all_tilesets(self):
         """
         Return all tilesets in this collection, directly or indirectly, as (name, tileset) tuples.
+        Partitions that have not been loaded are loaded as the iteration reaches them.
         """
-        for name, partition in self._partitions.items():
+        for name in list(self._partition_entries.keys()):
+            partition = self._get_partition(name)
             if isinstance(partition, Collection):
                 for descendant_name, descendant_tileset in partition.all_tilesets():
                     yield descendant_name, descendant_tileset
@@ -24,6 +58,11 @@ class Collection:
                 yield name, partition
 
     def find_tileset(self, name):
+        # a tileset that is a direct child can be found without loading any other partition.
+        if name in self._partition_entries:
+            partition = self._get_partition(name)
+            if isinstance(partition, TileSet):
+                return partition
         for partition_name, image_partition in self.all_tilesets():
             if name == partition_name:
                 return image_partition
@@ -34,3 +73,49 @@ class Collection:
         for partion_name, image_partition in self.all_tilesets():
             result.extend(image_partition.tiles(filter_fn))
         return result
+
+    def select(self, **indices):
+        """
+        Return the tiles of all the tilesets in this collection whose indices match all the given
+        indices.  See :py:meth:`TileSet.select`.
+        """
+        result = []
+        for partition_name, image_partition in self.all_tilesets():
+            result.extend(image_partition.select(**indices))
+        return result
+
+    def _get_partition(self, name):
+        partition = self._partition_entries[name]
+        if isinstance(partition, _PartitionFuture):
+            partition = partition.result()
+            self._partition_entries[name] = partition
+        return partition
+
+    def _load_all(self):
+        """Load all the partitions that have not been loaded yet, concurrently if the collection
+        has an executor, and one by one otherwise."""
+        pending = [
+            name
+            for name, partition in self._partition_entries.items()
+            if isinstance(partition, _PartitionFuture)
+        ]
+        if self._executor is None or len(pending) <= 1:
+            for name in pending:
+                self._get_partition(name)
+            return
+        self._executor.map(self._get_partition, pending)
+
+
+class _PartitionFuture:
+    """Wraps a callable that produces a partition, such that it is invoked at most once, even when
+    the partition is requested by several threads at once."""
+    def __init__(self, future):
+        self._future = future
+        self._lock = Lock()
+        self._result = None
+
+    def result(self):
+        with self._lock:
+            if self._result is None:
+                self._result = self._future()
+            return self._result
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -7,3 +8,11 @@ def fspath(pathlib_path):
         return os.fspath(pathlib_path)
     else:
         return str(pathlib_path)
+
+
+def get_running_loop():
+    if sys.version_info >= (3, 7):
+        return asyncio.get_running_loop()
+    else:
+        # from within a coroutine, this is the running loop.
+        return asyncio.get_event_loop()
@@ -26,6 +26,73 @@ def numpy_reader():
     return np.load
 
 
+def numpy_mmap_reader():
+    """
+    Return a method that accepts a path to a local file and maps it into memory read-only.
+    """
+    # lazy load numpy
+    import numpy as np
+
+    def reader(path):
+        return np.load(path, mmap_mode="r")
+
+    return reader
+
+
+def tiff_region_reader():
+    """
+    Return a method that accepts (read_range, y_slice, x_slice) and returns that region of the
+    image, reading only the parts of the file needed for the region.  If the file's layout is not
+    supported, the method returns None.
+    """
+    from ._layouts import read_tiff_region
+
+    return read_tiff_region
+
+
+def numpy_region_reader():
+    """
+    Return a method that accepts (read_range, y_slice, x_slice) and returns that region of the
+    array, reading only the parts of the file needed for the region.  If the array's layout is not
+    supported, the method returns None.
+    """
+    from ._layouts import read_npy_region
+
+    return read_npy_region
+
+
+def tiff_header_reader():
+    """
+    Return a method that accepts a read_range callable and returns the (shape, dtype) of the image,
+    reading only the header of the file.  If the header does not describe the decoded image, the
+    method returns None.
+    """
+    from ._layouts import read_tiff_header
+
+    return read_tiff_header
+
+
+def png_header_reader():
+    """
+    Return a method that accepts a read_range callable and returns the (shape, dtype) of the image,
+    reading only the header of the file.  If the header does not describe the decoded image, the
+    method returns None.
+    """
+    from ._layouts import read_png_header
+
+    return read_png_header
+
+
+def numpy_header_reader():
+    """
+    Return a method that accepts a read_range callable and returns the (shape, dtype) of the array,
+    reading only the header of the file.  If the header cannot be parsed, the method returns None.
+    """
+    from ._layouts import read_npy_header
+
+    return read_npy_header
+
+
 def tiff_writer():
     """
     Return a method that accepts (file, array) and saves it to the file.  File may be a file-like
@@ -76,11 +143,18 @@ class ImageFormat(enum.Enum):
     The ImageFormat Enum exposes reading and writing methods for each enumerated object.
 
     To add a new object, assign to a name (e.g., NEW_FORMAT) a 4-tuple of (reader_provider,
-    writer_provider, file_extension, {alternative_extensions}).
+    writer_provider, file_extension, {alternative_extensions}).  The tuple may optionally be
+    followed by a mmap_reader_provider, for formats that can be mapped into memory from a local
+    file, a region_reader_provider, for formats that can read a region of an image without
+    reading the entire file, and a header_reader_provider, for formats that can determine the shape
+    of an image from the header of the file.
     """
-    TIFF = (tiff_reader, tiff_writer, "tiff", {"tif"})
-    NUMPY = (numpy_reader, numpy_writer, "npy", None)
-    PNG = (png_reader, png_writer, "png", None)
+    TIFF = (
+        tiff_reader, tiff_writer, "tiff", {"tif"}, None, tiff_region_reader, tiff_header_reader)
+    NUMPY = (
+        numpy_reader, numpy_writer, "npy", None, numpy_mmap_reader, numpy_region_reader,
+        numpy_header_reader)
+    PNG = (png_reader, png_writer, "png", None, None, None, png_header_reader)
 
     def __init__(
             self,
@@ -88,11 +162,17 @@ class ImageFormat(enum.Enum):
             writer_func,
             file_ext,
             alternate_extensions,
+            mmap_reader_func=None,
+            region_reader_func=None,
+            header_reader_func=None,
     ):
         self._reader_func = reader_func
         self._writer_func = writer_func
         self._file_ext = file_ext
         self._alternate_extensions = set() if alternate_extensions is None else alternate_extensions
+        self._mmap_reader_func = mmap_reader_func
+        self._region_reader_func = region_reader_func
+        self._header_reader_func = header_reader_func
 
     @staticmethod
     def find_by_extension(extension):
@@ -113,6 +193,41 @@ class ImageFormat(enum.Enum):
     def writer_func(self):
         return self._writer_func()
 
+    @property
+    def mmap_reader_func(self):
+        """
+        Returns a method that accepts a path to a local file and maps it into memory, or None if
+        this format cannot be mapped into memory.
+        """
+        if self._mmap_reader_func is None:
+            return None
+        return self._mmap_reader_func()
+
+    @property
+    def region_reader_func(self):
+        """
+        Returns a method that accepts (read_range, y_slice, x_slice), where read_range is a callable
+        that accepts an offset and a length and returns those bytes of the file, and returns that
+        region of the image, or None if the file's layout does not support it.  If this format does
+        not support reading regions, None is returned instead of a method.
+        """
+        if self._region_reader_func is None:
+            return None
+        return self._region_reader_func()
+
+    @property
+    def header_reader_func(self):
+        """
+        Returns a method that accepts read_range, where read_range is a callable that accepts an
+        offset and a length and returns those bytes of the file, and returns the (shape, dtype) of
+        the decoded image, reading only the header of the file.  The method returns None if the
+        header does not describe the decoded image.  If this format does not support reading
+        headers, None is returned instead of a method.
+        """
+        if self._header_reader_func is None:
+            return None
+        return self._header_reader_func()
+
     @property
     def file_ext(self):
         return self._file_ext
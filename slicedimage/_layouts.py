@@ -0,0 +1,374 @@
+"""
+Parsers for the layout of image files, such that parts of an image can be read without reading the
+entire file.  All the methods in this module accept a `read_range` callable, which accepts an
+offset and a length, and returns the bytes at that location of the file.  Fewer bytes may be
+returned if the file is not long enough.
+"""
+import struct
+from io import BytesIO
+
+NPY_HEADER_PROBE_SIZE = 512
+TIFF_IFD_PROBE_SIZE = 4096
+PNG_HEADER_PROBE_SIZE = 33
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# maps the PNG color types, other than indexed color, to the number of samples per pixel.
+PNG_SAMPLES_PER_PIXEL = {0: 1, 2: 3, 4: 2, 6: 4}
+
+TIFF_TAG_IMAGE_WIDTH = 256
+TIFF_TAG_IMAGE_LENGTH = 257
+TIFF_TAG_BITS_PER_SAMPLE = 258
+TIFF_TAG_COMPRESSION = 259
+TIFF_TAG_STRIP_OFFSETS = 273
+TIFF_TAG_SAMPLES_PER_PIXEL = 277
+TIFF_TAG_ROWS_PER_STRIP = 278
+TIFF_TAG_PLANAR_CONFIGURATION = 284
+TIFF_TAG_TILE_WIDTH = 322
+TIFF_TAG_TILE_LENGTH = 323
+TIFF_TAG_TILE_OFFSETS = 324
+TIFF_TAG_SAMPLE_FORMAT = 339
+
+TIFF_COMPRESSION_NONE = 1
+TIFF_PLANAR_CONFIGURATION_SEPARATE = 2
+
+# maps the TIFF field types to their struct format character.
+TIFF_FIELD_TYPES = {
+    1: "B",  # BYTE
+    2: "c",  # ASCII
+    3: "H",  # SHORT
+    4: "I",  # LONG
+    5: "II",  # RATIONAL
+    6: "b",  # SBYTE
+    7: "B",  # UNDEFINED
+    8: "h",  # SSHORT
+    9: "i",  # SLONG
+    10: "ii",  # SRATIONAL
+    11: "f",  # FLOAT
+    12: "d",  # DOUBLE
+}
+
+# maps the TIFF SampleFormat to the numpy dtype kind.
+TIFF_SAMPLE_FORMATS = {1: "u", 2: "i", 3: "f"}
+
+
+class NpyLayout:
+    def __init__(self, shape, fortran_order, dtype, data_offset):
+        self.shape = shape
+        self.fortran_order = fortran_order
+        self.dtype = dtype
+        self.data_offset = data_offset
+
+
+class TiffLayout:
+    """The layout of the first page of a TIFF file."""
+    def __init__(
+            self, width, height, dtype, compression, samples_per_pixel, is_multipage,
+            strip_offsets=None, rows_per_strip=None,
+            tile_offsets=None, tile_width=None, tile_length=None, planar_configuration=1):
+        self.width = width
+        self.height = height
+        self.dtype = dtype
+        self.compression = compression
+        self.samples_per_pixel = samples_per_pixel
+        self.is_multipage = is_multipage
+        self.strip_offsets = strip_offsets
+        self.rows_per_strip = rows_per_strip
+        self.tile_offsets = tile_offsets
+        self.tile_width = tile_width
+        self.tile_length = tile_length
+        self.planar_configuration = planar_configuration
+
+    @property
+    def is_simple(self):
+        """Returns True if the pixel data is stored uncompressed, one sample per pixel, such that
+        regions can be located without decoding anything."""
+        return (
+            self.compression == TIFF_COMPRESSION_NONE
+            and self.samples_per_pixel == 1
+            and self.dtype is not None
+            and (self.strip_offsets is not None or self.tile_offsets is not None)
+        )
+
+
+def read_npy_layout(read_range):
+    """
+    Parse the header of a .npy file.  Returns a :py:class:`NpyLayout`, or None if the header cannot
+    be parsed.
+    """
+    import numpy as np
+
+    prefix = read_range(0, NPY_HEADER_PROBE_SIZE)
+    try:
+        major, minor = np.lib.format.read_magic(BytesIO(prefix))
+    except ValueError:
+        return None
+    if major == 1:
+        header_length_size = 2
+        read_array_header = np.lib.format.read_array_header_1_0
+    elif major == 2:
+        header_length_size = 4
+        read_array_header = np.lib.format.read_array_header_2_0
+    else:
+        return None
+
+    header_length = int.from_bytes(prefix[8:8 + header_length_size], "little")
+    data_offset = 8 + header_length_size + header_length
+    if data_offset > len(prefix):
+        prefix = read_range(0, data_offset)
+
+    fh = BytesIO(prefix)
+    np.lib.format.read_magic(fh)
+    try:
+        shape, fortran_order, dtype = read_array_header(fh)
+    except ValueError:
+        return None
+    return NpyLayout(shape, fortran_order, dtype, data_offset)
+
+
+def read_tiff_layout(read_range, with_offsets=True):
+    """
+    Parse the header and the first image file directory of a TIFF file.  Returns a
+    :py:class:`TiffLayout`, or None if the file is not a classic TIFF file.  If `with_offsets` is
+    False, the offsets of the strips or tiles are not read, which saves a read for files with more
+    than one strip or tile.
+    """
+    import numpy as np
+
+    header = read_range(0, 8)
+    if header[:4] == b"II*\x00":
+        byteorder = "<"
+    elif header[:4] == b"MM\x00*":
+        byteorder = ">"
+    else:
+        # not a TIFF file, or a BigTIFF file.
+        return None
+    ifd_offset, = struct.unpack(byteorder + "I", header[4:8])
+
+    ifd = read_range(ifd_offset, TIFF_IFD_PROBE_SIZE)
+    num_entries, = struct.unpack(byteorder + "H", ifd[:2])
+    ifd_length = 2 + 12 * num_entries + 4
+    if ifd_length > len(ifd):
+        ifd = read_range(ifd_offset, ifd_length)
+
+    tags = {}
+    for entry_offset in range(2, 2 + 12 * num_entries, 12):
+        tag, field_type, count = struct.unpack(
+            byteorder + "HHI", ifd[entry_offset:entry_offset + 8])
+        field_format = TIFF_FIELD_TYPES.get(field_type, None)
+        if field_format is None:
+            continue
+        if not with_offsets and tag in (TIFF_TAG_STRIP_OFFSETS, TIFF_TAG_TILE_OFFSETS):
+            continue
+        value_format = byteorder + field_format * count
+        value_size = struct.calcsize(value_format)
+        if value_size <= 4:
+            value_data = ifd[entry_offset + 8:entry_offset + 8 + value_size]
+        else:
+            value_offset, = struct.unpack(
+                byteorder + "I", ifd[entry_offset + 8:entry_offset + 12])
+            value_data = read_range(value_offset, value_size)
+        tags[tag] = struct.unpack(value_format, value_data)
+    next_ifd_offset, = struct.unpack(
+        byteorder + "I", ifd[2 + 12 * num_entries:2 + 12 * num_entries + 4])
+
+    def scalar(tag, default=None):
+        values = tags.get(tag, None)
+        return default if values is None else values[0]
+
+    bits_per_sample = scalar(TIFF_TAG_BITS_PER_SAMPLE, 1)
+    sample_kind = TIFF_SAMPLE_FORMATS.get(scalar(TIFF_TAG_SAMPLE_FORMAT, 1), None)
+    if sample_kind is not None and bits_per_sample % 8 == 0:
+        dtype = np.dtype("{}{}{}".format(byteorder, sample_kind, bits_per_sample // 8))
+    else:
+        dtype = None
+
+    height = scalar(TIFF_TAG_IMAGE_LENGTH)
+    return TiffLayout(
+        width=scalar(TIFF_TAG_IMAGE_WIDTH),
+        height=height,
+        dtype=dtype,
+        compression=scalar(TIFF_TAG_COMPRESSION, TIFF_COMPRESSION_NONE),
+        samples_per_pixel=scalar(TIFF_TAG_SAMPLES_PER_PIXEL, 1),
+        is_multipage=next_ifd_offset != 0,
+        strip_offsets=tags.get(TIFF_TAG_STRIP_OFFSETS, None),
+        rows_per_strip=min(scalar(TIFF_TAG_ROWS_PER_STRIP, height), height),
+        tile_offsets=tags.get(TIFF_TAG_TILE_OFFSETS, None),
+        tile_width=scalar(TIFF_TAG_TILE_WIDTH),
+        tile_length=scalar(TIFF_TAG_TILE_LENGTH),
+        planar_configuration=scalar(TIFF_TAG_PLANAR_CONFIGURATION, 1),
+    )
+
+
+def read_png_header(read_range):
+    """
+    Parse the IHDR chunk of a PNG file.  Returns the shape and the dtype of the decoded image, or
+    None if the file is not a PNG file, or is one whose decoded form cannot be determined from the
+    header alone (i.e., indexed color or fewer than 8 bits per sample).
+    """
+    import numpy as np
+
+    header = read_range(0, PNG_HEADER_PROBE_SIZE)
+    if (len(header) < PNG_HEADER_PROBE_SIZE
+            or header[:8] != PNG_SIGNATURE
+            or header[12:16] != b"IHDR"):
+        return None
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", header[16:26])
+    samples_per_pixel = PNG_SAMPLES_PER_PIXEL.get(color_type, None)
+    if samples_per_pixel is None or bit_depth not in (8, 16):
+        return None
+
+    shape = (height, width) if samples_per_pixel == 1 else (height, width, samples_per_pixel)
+    return shape, np.dtype(np.uint8 if bit_depth == 8 else np.uint16)
+
+
+def read_npy_header(read_range):
+    """
+    Parse the header of a .npy file.  Returns the shape and the dtype of the array, or None if the
+    header cannot be parsed.
+    """
+    layout = read_npy_layout(read_range)
+    if layout is None:
+        return None
+    return layout.shape, layout.dtype
+
+
+def read_tiff_header(read_range):
+    """
+    Parse the first image file directory of a TIFF file.  Returns the shape and the dtype of the
+    decoded image, or None if they cannot be determined from the first image file directory, e.g.,
+    because the file has more than one page.  The dtype is None if the samples are not a whole
+    number of bytes.
+    """
+    layout = read_tiff_layout(read_range, with_offsets=False)
+    if layout is None or layout.is_multipage or layout.width is None or layout.height is None:
+        return None
+    if layout.samples_per_pixel == 1:
+        shape = (layout.height, layout.width)
+    elif layout.planar_configuration == TIFF_PLANAR_CONFIGURATION_SEPARATE:
+        shape = (layout.samples_per_pixel, layout.height, layout.width)
+    else:
+        shape = (layout.height, layout.width, layout.samples_per_pixel)
+    dtype = layout.dtype
+    if dtype is not None and not dtype.isnative:
+        dtype = dtype.newbyteorder("=")
+    return shape, dtype
+
+
+def read_npy_region(read_range, y_slice, x_slice):
+    """
+    Read a region of a 2D array stored in a .npy file, reading only the rows that intersect the
+    region.  Returns None if the array's layout is not supported.
+    """
+    import numpy as np
+
+    layout = read_npy_layout(read_range)
+    if (layout is None
+            or len(layout.shape) != 2
+            or layout.fortran_order
+            or layout.dtype.hasobject):
+        return None
+    height, width = layout.shape
+    row_size = width * layout.dtype.itemsize
+
+    rows = range(*y_slice.indices(height))
+    if len(rows) == 0:
+        return np.empty((0, width), dtype=layout.dtype)[:, x_slice]
+    first_row, last_row = min(rows[0], rows[-1]), max(rows[0], rows[-1])
+
+    data = read_range(
+        layout.data_offset + first_row * row_size, (last_row - first_row + 1) * row_size)
+    block = np.frombuffer(data, dtype=layout.dtype).reshape(last_row - first_row + 1, width)
+    return block[np.asarray(rows) - first_row][:, x_slice]
+
+
+def read_tiff_region(read_range, y_slice, x_slice):
+    """
+    Read a region of a single-page, uncompressed, strip- or tile-organized TIFF file, reading only
+    the strips or tiles that intersect the region.  Returns None if the file's layout is not
+    supported.
+    """
+    import numpy as np
+
+    layout = read_tiff_layout(read_range)
+    if layout is None or layout.is_multipage or not layout.is_simple:
+        return None
+
+    rows = range(*y_slice.indices(layout.height))
+    columns = range(*x_slice.indices(layout.width))
+    if len(rows) == 0 or len(columns) == 0:
+        return np.empty((len(rows), len(columns)), dtype=layout.dtype)
+    first_row, last_row = min(rows[0], rows[-1]), max(rows[0], rows[-1])
+    first_column, last_column = min(columns[0], columns[-1]), max(columns[0], columns[-1])
+
+    # read a block that spans all the rows of the region, and the columns of the region rounded out
+    # to the tile boundaries.
+    itemsize = layout.dtype.itemsize
+    ranges = []
+    if layout.tile_offsets is not None:
+        tiles_across = -(-layout.width // layout.tile_width)
+        first_tile_column = first_column // layout.tile_width
+        last_tile_column = last_column // layout.tile_width
+        block_column_origin = first_tile_column * layout.tile_width
+        block = np.empty(
+            (last_row - first_row + 1,
+             (last_tile_column - first_tile_column + 1) * layout.tile_width),
+            dtype=layout.dtype)
+        tile_size = layout.tile_width * layout.tile_length * itemsize
+        for tile_row in range(first_row // layout.tile_length, last_row // layout.tile_length + 1):
+            for tile_column in range(first_tile_column, last_tile_column + 1):
+                offset = layout.tile_offsets[tile_row * tiles_across + tile_column]
+                ranges.append((offset, tile_size, (tile_row, tile_column)))
+
+        for data, (tile_row, tile_column) in _coalesced_reads(read_range, ranges):
+            tile = np.frombuffer(data, dtype=layout.dtype).reshape(
+                layout.tile_length, layout.tile_width)
+            tile_first_row = tile_row * layout.tile_length
+            src_start = max(first_row - tile_first_row, 0)
+            src_stop = min(last_row + 1 - tile_first_row, layout.tile_length)
+            dst_start = tile_first_row + src_start - first_row
+            dst_column = (tile_column - first_tile_column) * layout.tile_width
+            block[dst_start:dst_start + src_stop - src_start,
+                  dst_column:dst_column + layout.tile_width] = tile[src_start:src_stop]
+    else:
+        block_column_origin = 0
+        block = np.empty((last_row - first_row + 1, layout.width), dtype=layout.dtype)
+        row_size = layout.width * itemsize
+        for strip in range(
+                first_row // layout.rows_per_strip, last_row // layout.rows_per_strip + 1):
+            strip_first_row = strip * layout.rows_per_strip
+            src_start = max(first_row, strip_first_row)
+            src_stop = min(last_row + 1, strip_first_row + layout.rows_per_strip)
+            offset = layout.strip_offsets[strip] + (src_start - strip_first_row) * row_size
+            ranges.append((offset, (src_stop - src_start) * row_size, src_start))
+
+        for data, src_start in _coalesced_reads(read_range, ranges):
+            strip_data = np.frombuffer(data, dtype=layout.dtype).reshape(-1, layout.width)
+            block[src_start - first_row:src_start - first_row + strip_data.shape[0]] = strip_data
+
+    result = block[np.asarray(rows) - first_row][:, np.asarray(columns) - block_column_origin]
+    if not result.dtype.isnative:
+        result = result.astype(result.dtype.newbyteorder("="))
+    return result
+
+
+def _coalesced_reads(read_range, ranges):
+    """
+    Given a sequence of (offset, length, context) tuples, read the ranges, merging ranges that are
+    adjacent in the file into a single read.  Yields (data, context) for each of the ranges.
+    """
+    ranges = sorted(ranges, key=lambda _range: _range[0])
+    position = 0
+    while position < len(ranges):
+        run_end = position + 1
+        while (run_end < len(ranges)
+               and ranges[run_end - 1][0] + ranges[run_end - 1][1] == ranges[run_end][0]):
+            run_end += 1
+
+        run_offset = ranges[position][0]
+        run_length = ranges[run_end - 1][0] + ranges[run_end - 1][1] - run_offset
+        data = read_range(run_offset, run_length)
+        for offset, length, context in ranges[position:run_end]:
+            yield data[offset - run_offset:offset - run_offset + length], context
+
+        position = run_end
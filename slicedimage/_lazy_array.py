@@ -0,0 +1,264 @@
+import itertools
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from ._array_cache import decoded_array_cache
+from ._dimensions import DimensionNames
+
+
+class LazyTileArray:
+    """
+    A read-only, array-like view of a tileset.  The array has one axis for each of the dimensions in
+    `dims_order`, followed by the y and x axes of the tiles, and each tile is one chunk of the
+    array.  No tile is fetched or decoded until the part of the array that it holds is read, and
+    then only the tiles that are needed are fetched, concurrently.  Positions without a tile read as
+    zeros.
+
+    Tiles with a checksum are read in their entirety, such that their checksum is verified, and such
+    that they are served from the backend's caches and the decoded array cache.  Only the tiles
+    without a checksum, whose data is not already at hand, are read through ranged reads of just the
+    part of the tile that is needed.
+
+    The view supports basic indexing (integers, slices, and Ellipsis), conversion through
+    ``np.asarray``, and reductions along its leading axes.  It exposes `shape`, `dtype`, `ndim`,
+    and `chunks`, such that it can be wrapped by ``dask.array.from_array(view, chunks=view.chunks)``
+    to build a task graph with one task per tile.
+
+    Instances are obtained from :py:meth:`TileSet.to_lazy_array`.
+    """
+    def __init__(self, tileset, dims_order, shape, dtype=None, max_workers=None):
+        self.dims_order = list(dims_order)
+        self.shape = tuple(shape)
+        self.max_workers = max_workers
+        self._dtype = np.dtype(dtype) if dtype is not None else None
+
+        # maps the position of each tile along the leading axes to the tile.
+        self._tiles_by_position = dict()
+        for tile in tileset.tiles():
+            try:
+                position = tuple(tile.indices[dim] for dim in self.dims_order)
+            except KeyError as ex:
+                raise ValueError(
+                    "Tile with indices {} does not have an index for {}".format(
+                        tile.indices, ex.args[0])) from ex
+            self._tiles_by_position[position] = tile
+
+    def __repr__(self):
+        return "<slicedimage.LazyTileArray shape={} dims={}>".format(
+            self.shape, self.dims_order + [DimensionNames.Y.value, DimensionNames.X.value])
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def dtype(self):
+        """The dtype of the array.  If it was not provided, it is read from the header of the first
+        tile's file, or if that is not possible, the first tile is decoded to find it."""
+        if self._dtype is None:
+            if len(self._tiles_by_position) == 0:
+                raise ValueError("Cannot determine the dtype of an array without any tiles")
+            first_tile = next(iter(self._tiles_by_position.values()))
+            header = first_tile._read_header()
+            if header is not None and header[1] is not None:
+                self._dtype = header[1]
+            else:
+                self._dtype = first_tile.numpy_array.dtype
+        return self._dtype
+
+    @property
+    def chunks(self):
+        """The chunks of the array, in the form used by dask, i.e., one chunk per tile."""
+        return tuple((1,) * size for size in self.shape[:-2]) + (
+            (self.shape[-2],), (self.shape[-1],))
+
+    def __array__(self, dtype=None):
+        result = self[...]
+        if dtype is not None:
+            result = result.astype(dtype, copy=False)
+        return result
+
+    def __getitem__(self, key):
+        leading_selections, leading_is_scalar, y_slice, y_is_scalar, x_slice, x_is_scalar = \
+            self._normalize_key(key)
+
+        num_rows = len(range(*y_slice.indices(self.shape[-2])))
+        num_columns = len(range(*x_slice.indices(self.shape[-1])))
+        result = np.zeros(
+            tuple(len(selection) for selection in leading_selections) + (num_rows, num_columns),
+            dtype=self.dtype)
+
+        work = []
+        for result_position, position in zip(
+                itertools.product(*(range(len(selection)) for selection in leading_selections)),
+                itertools.product(*leading_selections)):
+            tile = self._tiles_by_position.get(position, None)
+            if tile is not None:
+                work.append((result_position, tile))
+
+        def read(result_position_and_tile):
+            result_position, tile = result_position_and_tile
+            result[result_position] = _read_tile_region(tile, y_slice, x_slice)
+
+        self._map(read, work)
+
+        # drop the axes that were selected with an integer.
+        squeeze = tuple(
+            axis
+            for axis, is_scalar in enumerate(leading_is_scalar + [y_is_scalar, x_is_scalar])
+            if is_scalar)
+        if len(squeeze) > 0:
+            result = result.reshape(
+                tuple(size for axis, size in enumerate(result.shape) if axis not in squeeze))
+        return result
+
+    def reduce(self, ufunc, axis, dtype=None):
+        """
+        Reduce the array along one of its leading axes with a binary ufunc, e.g., ``np.maximum``.
+        The tiles are fetched concurrently, and folded into the result as they arrive, such that
+        only the result and the tiles being fetched are held in memory.  Positions without a tile
+        are treated as zeros.
+
+        Parameters
+        ----------
+        ufunc : np.ufunc
+            The binary ufunc to reduce with.  Because tiles are folded in the order they arrive, it
+            should be commutative and associative.
+        axis : Union[int, str]
+            The leading axis to reduce along, as an axis number or as the name of a dimension.
+        dtype : Optional[np.dtype]
+            The dtype of the result.  If None, it is the dtype that ``ufunc.reduce`` would produce
+            for the dtype of the array, e.g., sums of small integers are accumulated as 64-bit
+            integers.
+
+        Returns
+        -------
+        np.ndarray :
+            The reduced array, which has all the axes of this array except `axis`.
+        """
+        if isinstance(axis, str) or isinstance(axis, DimensionNames):
+            dim = axis.value if isinstance(axis, DimensionNames) else axis
+            if dim not in self.dims_order:
+                raise ValueError("{} is not one of the dimensions {}".format(dim, self.dims_order))
+            axis = self.dims_order.index(dim)
+        num_leading_axes = len(self.dims_order)
+        if axis < 0:
+            axis += num_leading_axes
+        if not 0 <= axis < num_leading_axes:
+            raise ValueError("Can only reduce along one of the {} leading axes".format(
+                num_leading_axes))
+
+        if dtype is None:
+            dtype = ufunc.reduce(np.zeros(1, dtype=self.dtype)).dtype
+        result_shape = self.shape[:axis] + self.shape[axis + 1:]
+        result = np.zeros(result_shape, dtype=dtype)
+        tiles_per_result_position = dict()
+        work = []
+        for position, tile in self._tiles_by_position.items():
+            result_position = position[:axis] + position[axis + 1:]
+            tiles_per_result_position[result_position] = (
+                tiles_per_result_position.get(result_position, 0) + 1)
+            work.append((result_position, tile))
+
+        def read(result_position_and_tile):
+            result_position, tile = result_position_and_tile
+            return result_position, tile.numpy_array
+
+        initialized = set()
+        for result_position, data in self._imap_unordered(read, work):
+            if result_position not in initialized:
+                result[result_position] = data
+                initialized.add(result_position)
+            else:
+                ufunc(result[result_position], data, out=result[result_position],
+                      dtype=result.dtype, casting="unsafe")
+
+        # fold in the zeros of any positions without a tile.
+        for result_position, count in tiles_per_result_position.items():
+            if count < self.shape[axis]:
+                ufunc(result[result_position], 0, out=result[result_position])
+
+        return result
+
+    def max(self, axis):
+        """Maximum projection along one of the leading axes.  See :py:meth:`reduce`."""
+        return self.reduce(np.maximum, axis)
+
+    def sum(self, axis, dtype=None):
+        """Sum along one of the leading axes.  See :py:meth:`reduce`."""
+        return self.reduce(np.add, axis, dtype)
+
+    def _normalize_key(self, key):
+        """Converts an index into a list of the selected positions along each leading axis, and
+        slices along the y and x axes.  Axes selected with an integer are flagged as such."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        num_ellipsis = sum(1 for item in key if item is Ellipsis)
+        if num_ellipsis > 1:
+            raise IndexError("an index can only have a single ellipsis ('...')")
+        if len(key) - num_ellipsis > self.ndim:
+            raise IndexError("too many indices for array of {} dimensions".format(self.ndim))
+        if num_ellipsis == 1:
+            ellipsis_position = key.index(Ellipsis)
+            key = (key[:ellipsis_position]
+                   + (slice(None),) * (self.ndim - len(key) + 1)
+                   + key[ellipsis_position + 1:])
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        selections = []
+        is_scalar = []
+        for axis, (item, size) in enumerate(zip(key, self.shape)):
+            if isinstance(item, slice):
+                selections.append(item)
+                is_scalar.append(False)
+            elif isinstance(item, (int, np.integer)):
+                index = int(item)
+                if index < -size or index >= size:
+                    raise IndexError("index {} is out of bounds for axis {} with size {}".format(
+                        index, axis, size))
+                index %= size
+                selections.append(slice(index, index + 1))
+                is_scalar.append(True)
+            else:
+                raise TypeError(
+                    "only integers, slices, and ellipsis are supported as indices, not {}".format(
+                        type(item).__name__))
+
+        leading_selections = [
+            list(range(*selection.indices(size)))
+            for selection, size in zip(selections[:-2], self.shape[:-2])
+        ]
+        return (leading_selections, is_scalar[:-2],
+                selections[-2], is_scalar[-2],
+                selections[-1], is_scalar[-1])
+
+    def _map(self, func, items):
+        for _ in self._imap_unordered(func, items):
+            pass
+
+    def _imap_unordered(self, func, items):
+        if len(items) <= 1:
+            for item in items:
+                yield func(item)
+            return
+        tp = ThreadPool(self.max_workers)
+        try:
+            for result in tp.imap_unordered(func, items):
+                yield result
+        finally:
+            tp.terminate()
+
+
+def _read_tile_region(tile, y_slice, x_slice):
+    """Reads a region of a tile.  Tiles without a checksum whose data is neither in memory nor in
+    the decoded array cache are read through ranged reads.  All other tiles are read in their
+    entirety, which verifies their checksum, and cropped."""
+    if tile._numpy_array is None and tile.sha256 is None:
+        cache_key = getattr(tile._numpy_array_future, "cache_key", None)
+        if cache_key is None or cache_key not in decoded_array_cache:
+            return tile.read_region(y_slice, x_slice)
+    return tile.numpy_array[..., y_slice, x_slice]
@@ -1,5 +1,6 @@
 import warnings
 
+from ._compat import get_running_loop
 from ._dimensions import DimensionNames
 from ._typeformatting import format_enum_keyed_dicts, format_tile_coordinates
 
@@ -30,11 +31,15 @@ class Tile:
     @property
     def tile_shape(self):
         if self._tile_shape is None:
-            warnings.warn(
-                "Decoding tile just to obtain shape.  It is recommended to include the tile shape "
-                "in the tileset document to avoid this."
-            )
-            shape = self._numpy_array_future().shape
+            header = self._read_header()
+            if header is not None:
+                shape = header[0]
+            else:
+                warnings.warn(
+                    "Decoding tile just to obtain shape.  It is recommended to include the tile "
+                    "shape in the tileset document to avoid this."
+                )
+                shape = self._numpy_array_future().shape
             self._tile_shape = Tile.format_tuple_shape_to_dict_shape(shape)
 
         return self._tile_shape
@@ -45,13 +50,69 @@ class Tile:
             return self._numpy_array
         else:
             result = self._numpy_array_future()
+            self._check_decoded_shape(result)
+            return result
 
-            if self._tile_shape is not None:
-                assert Tile.format_dict_shape_to_tuple_shape(self._tile_shape) == result.shape
-            else:
-                self._tile_shape = Tile.format_tuple_shape_to_dict_shape(result.shape)
+    def read_region(self, y_slice=slice(None), x_slice=slice(None)):
+        """
+        Returns a region of the tile data.  If the tile data is not in memory and the tile's file
+        has a known layout (i.e., uncompressed numpy or TIFF files), only the parts of the file
+        needed for the region are read.  Otherwise, the entire tile is read and cropped.
 
-            return result
+        Data read as part of a region is not verified against the tile's checksum.
+
+        Parameters
+        ----------
+        y_slice : slice
+            The rows of the tile to return.
+        x_slice : slice
+            The columns of the tile to return.
+        """
+        if self._numpy_array is None:
+            read_region = getattr(self._numpy_array_future, "read_region", None)
+            if read_region is not None:
+                result = read_region(y_slice, x_slice)
+                if result is not None:
+                    return result
+        return self.numpy_array[..., y_slice, x_slice]
+
+    async def numpy_array_async(self, executor=None):
+        """
+        Asynchronously returns the tile data.  If the tile data is provided by a future that
+        supports asynchronous reads, the data is fetched through the backend's asynchronous read
+        path.  Otherwise, the future is run on `executor`.  In either case, decoding runs on
+        `executor`, which defaults to the event loop's default executor.
+        """
+        if self._numpy_array is not None:
+            return self._numpy_array
+
+        call_async = getattr(self._numpy_array_future, "call_async", None)
+        if call_async is not None:
+            result = await call_async(executor)
+        else:
+            loop = get_running_loop()
+            result = await loop.run_in_executor(executor, self._numpy_array_future)
+        self._check_decoded_shape(result)
+        return result
+
+    def _read_header(self):
+        """
+        Returns the (shape, dtype) of the tile data without decoding it, or None if that is not
+        possible.  If the tile data is provided by a future that supports it, only the header of the
+        tile's file is read.  The dtype may be None if it cannot be determined from the header.
+        """
+        if self._numpy_array is not None:
+            return self._numpy_array.shape, self._numpy_array.dtype
+        read_header = getattr(self._numpy_array_future, "read_header", None)
+        if read_header is None:
+            return None
+        return read_header()
+
+    def _check_decoded_shape(self, result):
+        if self._tile_shape is not None:
+            assert Tile.format_dict_shape_to_tuple_shape(self._tile_shape) == result.shape
+        else:
+            self._tile_shape = Tile.format_tuple_shape_to_dict_shape(result.shape)
 
     @numpy_array.setter
     def numpy_array(self, numpy_array):
@@ -63,6 +124,13 @@ class Tile:
         self._numpy_array = numpy_array
         self._numpy_array_future = None
 
+    def _load(self):
+        """
+        Fetches and decodes the tile data if it has not been yet, and retains it in the tile.
+        """
+        if self._numpy_array is None:
+            self.numpy_array = self._numpy_array_future()
+
     def set_numpy_array_future(self, future):
         """
         Provides a tile with a callable, which should return the tile data when invoked.  It should
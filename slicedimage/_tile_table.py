@@ -0,0 +1,823 @@
+import itertools
+import threading
+import weakref
+
+import numpy as np
+
+from ._dimensions import DimensionNames
+from ._tile import Tile
+from ._typeformatting import format_tile_coordinates
+
+INT64_MIN, INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+
+MISSING_INDEX = INT64_MIN
+"""The value that stands for a missing index in an integer index column."""
+
+UNKNOWN_SHAPE = -1
+"""The value that stands for an unknown tile shape in the tile shape column."""
+
+NO_DIGEST = bytes(32)
+
+INITIAL_CAPACITY = 16
+
+MIN_UNSORTED_ROWS = 256
+"""Rows appended after a lookup structure was sorted are scanned, rather than merged into it, until
+there are more than this many of them, or than the square root of the number of sorted rows, or
+until the rows scanned add up to a sixteenth of the sorted rows."""
+
+
+class TileTable:
+    """
+    Columnar storage for the tiles of a tileset.  Tiles may be appended as :py:class:`Tile` objects,
+    which are retained as they are, or as records of their metadata, which are stored only in numpy
+    arrays, one per index, coordinate, shape, and checksum.  Tiles appended as records are presented
+    as :py:class:`TileView` objects, which are created when the tile is requested, and which read
+    and write through to the columns.  This keeps the cost of a tile that is not in use to a few
+    hundred bytes, instead of a handful of Python objects and dicts.
+
+    The view of a row is shared by all the requests for the row for as long as it is in use, and is
+    then discarded, unless attributes were set on it that are not stored in the table.  The
+    coordinates and indices of a view are presented as dicts, which are built from the columns when
+    they are first accessed.  A dict that is changed is retained by the table, such that the change
+    is kept, as it is for a :py:class:`Tile`.  As for a :py:class:`Tile`, such changes are not seen
+    by lookups.
+
+    Lookups may be made from several threads at once, but not while tiles are appended.
+
+    The index and coordinate columns are also kept for the tiles appended as :py:class:`Tile`
+    objects, such that all the tiles can be looked up by their indices and coordinates without
+    scanning them.
+    """
+    def __init__(self):
+        self._size = 0
+        self._capacity = 0
+        # maps each index name to an int64 array of the tiles' values, or to an object array if any
+        # of the values is not an integer.
+        self._indices = {}
+        # maps each coordinate name to a (capacity, 2) float64 array of the tiles' extents.  NaN
+        # stands for a missing coordinate.
+        self._coordinates = {}
+        self._tile_shapes = np.full((0, 2), UNKNOWN_SHAPE, dtype=np.int64)
+        # the checksums are stored as raw digests.  An all-zero digest stands for a missing
+        # checksum.
+        self._sha256 = np.zeros(0, dtype="V32")
+        self._source_ids = np.full(0, -1, dtype=np.int32)
+        self._names = []
+
+        # the callables that produce the futures of the tiles appended as records, each of which is
+        # invoked as factory(name, sha256).
+        self._sources = []
+        self._source_ids_by_source = {}
+        # the tiles appended as Tile objects, and the views of the tiles appended as records that
+        # have attributes of their own, or None for the other tiles appended as records.
+        self._objects = []
+        # maps each row to its view, for as long as the view is in use.
+        self._views = weakref.WeakValueDictionary()
+        # maps each row to the attributes of the tile that do not have a column, or that do not fit
+        # in their column, e.g., extras, tile data, and futures that were set explicitly.
+        self._overrides = {}
+
+        # lookup structures, which are built when they are first needed, and brought up to date
+        # with the rows appended since then when they are next used.  The index lookup structures
+        # are discarded when an index column is added, or converted to an object column.
+        self._index_keys = None
+        self._sorted_indices = {}
+        self._coordinate_extents = {}
+        # guards the creation of views and lookup structures.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append_tile(self, tile):
+        """Appends a :py:class:`Tile` object, which is retained as it is."""
+        row = self._append_row(tile.indices, tile.coordinates)
+        self._objects.append(tile)
+        self._names.append(None)
+        return row
+
+    def append_record(self, coordinates, indices, tile_shape, sha256, extras, source, name):
+        """
+        Appends a tile as a record of its metadata.
+
+        Parameters
+        ----------
+        coordinates : Mapping[str, Union[float, Tuple[float, float]]]
+            The tile's coordinates, keyed by name.
+        indices : Mapping[str, int]
+            The tile's indices, keyed by name.
+        tile_shape : Optional[Mapping[str, int]]
+            The tile's shape, keyed by "y" and "x", or None if it is not known.
+        sha256 : Optional[str]
+            The tile's checksum.
+        extras : Optional[dict]
+            The tile's extras.
+        source : Callable[[str, Optional[str]], Callable[[], np.ndarray]]
+            A callable that, given the tile's file name and checksum, returns the future that
+            yields the tile's data.  Tiles that share a source should pass the same object.
+        name : str
+            The name of the tile's file.
+        """
+        self.append_records(
+            [coordinates], [indices], [tile_shape], [sha256], [extras], [source], [name])
+        return self._size - 1
+
+    def append_records(self, coordinates, indices, tile_shapes, sha256s, extras, sources, names):
+        """
+        Appends tiles as records of their metadata.  This is equivalent to calling
+        :py:meth:`append_record` for each tile, where each of the parameters is a sequence with one
+        entry per tile, but each column is converted with a single numpy operation.  Columns whose
+        values cannot be converted at once, e.g., because some of the values are not integers, are
+        filled one row at a time.
+        """
+        count = len(names)
+        first_row = self._new_rows(count)
+        rows = range(first_row, first_row + count)
+        self._objects.extend([None] * count)
+        self._names.extend(names)
+
+        for name in dict.fromkeys(key for tile_indices in indices for key in tile_indices):
+            values = [tile_indices.get(name, MISSING_INDEX) for tile_indices in indices]
+            column = self._indices.get(name, None)
+            if column is None:
+                column = self._new_index_column(name)
+            array = _as_integer_array(values) if column.dtype == np.int64 else None
+            if array is not None:
+                column[first_row:first_row + count] = array
+                continue
+            for row, tile_indices in zip(rows, indices):
+                if name in tile_indices:
+                    self._set_index(row, name, tile_indices[name])
+
+        # the offsets of the tiles with coordinates that the columns cannot return as they were
+        # given, e.g., integers, or nulls.
+        inexact_offsets = set()
+        for name in dict.fromkeys(key for extents in coordinates for key in extents):
+            column = self._coordinate_column(name)
+            values = [extents.get(name, None) for extents in coordinates]
+            try:
+                array = np.array(values, dtype=float)
+            except (TypeError, ValueError):
+                # some extents are scalars, and some are pairs, or some are not numbers.
+                array = None
+            if array is not None and array.shape in ((count, 2), (count,)):
+                column[first_row:first_row + count] = array.reshape(count, -1)
+                flat_values = values if array.ndim == 1 else itertools.chain.from_iterable(values)
+                if set(map(type, flat_values)) == {float} and not np.isnan(array).any():
+                    continue
+            else:
+                for row, value in zip(rows, values):
+                    column[row] = _as_extent(value)
+            inexact_offsets.update(
+                offset
+                for offset, extents in enumerate(coordinates)
+                if name in extents and not _is_float_extent(extents[name]))
+        for offset in sorted(inexact_offsets):
+            self._override(first_row + offset)["coordinates"] = format_tile_coordinates(
+                coordinates[offset])
+
+        array = _as_tile_shape_array(tile_shapes)
+        if array is not None:
+            self._tile_shapes[first_row:first_row + count] = array
+        else:
+            for row, tile_shape in zip(rows, tile_shapes):
+                if tile_shape is not None:
+                    self.set_tile_shape(row, tile_shape)
+
+        digests = _as_digest_array(sha256s)
+        if digests is not None:
+            self._sha256[first_row:first_row + count] = digests
+            # NO_DIGEST stands for a missing checksum, so checksums of all zeros are set one by one.
+            all_zeros = ~digests.view(np.uint8).reshape(count, 32).any(axis=1)
+            for offset in np.flatnonzero(all_zeros).tolist():
+                self.set_sha256(first_row + offset, sha256s[offset])
+        else:
+            for row, sha256 in zip(rows, sha256s):
+                if sha256 is not None:
+                    self.set_sha256(row, sha256)
+
+        for row, tile_extras in zip(rows, extras):
+            if tile_extras:
+                self._override(row)["extras"] = tile_extras
+
+        for source in dict.fromkeys(sources):
+            if source not in self._source_ids_by_source:
+                self._source_ids_by_source[source] = len(self._sources)
+                self._sources.append(source)
+        self._source_ids[first_row:first_row + count] = [
+            self._source_ids_by_source[source] for source in sources]
+
+    def tile(self, row):
+        """Returns the tile at a row, as the Tile object it was appended as, or as its view.  The
+        view of a row is returned by every request for the row for as long as it is in use."""
+        tile = self._objects[row]
+        if tile is None:
+            with self._lock:
+                tile = self._view(row)
+        return tile
+
+    def tiles(self):
+        with self._lock:
+            return [
+                self._view(row) if tile is None else tile
+                for row, tile in enumerate(self._objects)
+            ]
+
+    def _view(self, row):
+        view = self._views.get(row, None)
+        if view is None:
+            view = TileView(self, row)
+            self._views[row] = view
+        return view
+
+    def _retain(self, row, view):
+        """Retains the view of a row for as long as the table, e.g., because it has attributes that
+        are not stored in the table."""
+        self._objects[row] = view
+
+    def find(self, indices):
+        """Returns the first row whose indices are exactly `indices`, or None."""
+        if self._size == 0:
+            return None
+        for name in indices.keys():
+            if name not in self._indices:
+                return None
+        if len(self._indices) == 0:
+            return 0 if len(indices) == 0 else None
+        index_keys = self._index_keys
+        if index_keys is None:
+            with self._lock:
+                if self._index_keys is None:
+                    self._index_keys = self._build_index_keys()
+                index_keys = self._index_keys
+        names, sorted_keys = index_keys
+        if sorted_keys is not None:
+            query = [_as_integer_index(indices.get(name, MISSING_INDEX)) for name in names]
+            if None in query:
+                return None
+            query_key = _as_row_keys(np.array([query], dtype=np.int64))[0]
+            rows = sorted_keys.rows(query_key, self._size)
+            return int(rows.min()) if len(rows) > 0 else None
+
+        # some of the indices are not integers, so the rows are scanned.
+        matches = np.ones(self._size, dtype=bool)
+        for name in names:
+            if name in indices:
+                matches &= self._index_column(name) == indices[name]
+            else:
+                matches &= self._missing(name)
+        rows = np.flatnonzero(matches)
+        return int(rows[0]) if len(rows) > 0 else None
+
+    def select(self, indices):
+        """Returns the rows, in ascending order, whose indices match all of `indices`.  The rows
+        that match the most selective of the indices are found through a sorted copy of its column,
+        and only those rows are checked against the rest of the indices."""
+        ranges = []
+        remaining = []
+        for name, value in indices.items():
+            column = self._indices.get(name, None)
+            if column is None:
+                return np.zeros(0, dtype=np.intp)
+            if column.dtype != np.int64:
+                remaining.append((name, value))
+                continue
+            value = _as_integer_index(value)
+            if value is None:
+                return np.zeros(0, dtype=np.intp)
+            rows = self._sorted_index(name).rows(value, self._size)
+            ranges.append((len(rows), name, value, rows))
+
+        if len(ranges) > 0:
+            ranges.sort(key=lambda _range: _range[0])
+            candidates = np.sort(ranges[0][3])
+            remaining.extend((name, value) for _, name, value, _ in ranges[1:])
+        else:
+            candidates = np.arange(self._size)
+        for name, value in remaining:
+            candidates = candidates[self._index_column(name)[candidates] == value]
+        return candidates
+
+    def coordinate_extents(self, name):
+        """Returns arrays of the minimum and maximum coordinates of the tiles for a coordinate, or
+        None if no tile has that coordinate.  NaN stands for a missing coordinate."""
+        column = self._coordinates.get(name, None)
+        if column is None:
+            return None
+        extents = self._coordinate_extents.get(name, None)
+        num_rows = 0 if extents is None else len(extents[0])
+        if num_rows < self._size:
+            column = column[num_rows:self._size]
+            appended_extents = (
+                np.minimum(column[:, 0], column[:, 1]), np.maximum(column[:, 0], column[:, 1]))
+            if extents is None:
+                extents = appended_extents
+            else:
+                extents = tuple(
+                    np.concatenate(pair) for pair in zip(extents, appended_extents))
+            self._coordinate_extents[name] = extents
+        return extents
+
+    def tile_shapes(self):
+        """Returns a (size, 2) array of the (y, x) shapes of the tiles.  Unknown shapes are
+        UNKNOWN_SHAPE."""
+        shapes = self._tile_shapes[:self._size].copy()
+        for row, tile in enumerate(self._objects):
+            if (tile is not None
+                    and not isinstance(tile, TileView)
+                    and tile._tile_shape is not None):
+                shapes[row] = Tile.format_dict_shape_to_tuple_shape(tile._tile_shape)
+        return shapes
+
+    # accessors for the attributes of the tiles appended as records.
+
+    def get_indices(self, row):
+        """Returns the indices of a row as a dict.  Unless the indices of the row were set or
+        changed, the dict is built from the index columns, and retained only once it is changed."""
+        result = self.get_attribute(row, "indices", None)
+        if result is None:
+            values = {}
+            for name, column in self._indices.items():
+                value = column[row]
+                if column.dtype == np.int64:
+                    if value != MISSING_INDEX:
+                        values[name] = int(value)
+                elif value is not None:
+                    values[name] = value
+            result = _RowDict(self, row, "indices", values)
+        return result
+
+    def get_coordinates(self, row):
+        """Returns the coordinates of a row as a dict.  Unless the coordinates of the row were set
+        or changed, the dict is built from the coordinate columns, and retained only once it is
+        changed."""
+        result = self.get_attribute(row, "coordinates", None)
+        if result is None:
+            values = {}
+            for name, column in self._coordinates.items():
+                low, high = column[row].tolist()
+                if low == low:
+                    values[name] = (low, high)
+            result = _RowDict(self, row, "coordinates", values)
+        return result
+
+    def get_tile_shape(self, row):
+        override = self._overrides.get(row, None)
+        if override is not None and "tile_shape" in override:
+            return override["tile_shape"]
+        y, x = self._tile_shapes[row].tolist()
+        if y == UNKNOWN_SHAPE:
+            return None
+        return {DimensionNames.Y.value: y, DimensionNames.X.value: x}
+
+    def set_tile_shape(self, row, tile_shape):
+        override = self._overrides.get(row, None)
+        if override is not None:
+            override.pop("tile_shape", None)
+        if (tile_shape is not None
+                and len(tile_shape) == 2
+                and _as_integer_index(tile_shape.get(DimensionNames.Y.value, None)) is not None
+                and _as_integer_index(tile_shape.get(DimensionNames.X.value, None)) is not None):
+            self._tile_shapes[row] = (
+                tile_shape[DimensionNames.Y.value], tile_shape[DimensionNames.X.value])
+        else:
+            self._tile_shapes[row] = UNKNOWN_SHAPE
+            if tile_shape is not None:
+                self._override(row)["tile_shape"] = tile_shape
+
+    def get_sha256(self, row):
+        override = self._overrides.get(row, None)
+        if override is not None and "sha256" in override:
+            return override["sha256"]
+        digest = self._sha256[row].tobytes()
+        return digest.hex() if digest != NO_DIGEST else None
+
+    def set_sha256(self, row, sha256):
+        override = self._overrides.get(row, None)
+        if override is not None:
+            override.pop("sha256", None)
+        digest = _as_digest(sha256)
+        if digest is not None:
+            self._sha256[row] = digest
+        else:
+            self._sha256[row] = NO_DIGEST
+            if sha256 is not None:
+                self._override(row)["sha256"] = sha256
+
+    def get_future(self, row):
+        override = self._overrides.get(row, None)
+        if override is not None and "future" in override:
+            return override["future"]
+        source_id = self._source_ids[row]
+        if source_id < 0:
+            return None
+        return self._sources[source_id](self._names[row], self.get_sha256(row))
+
+    def get_attribute(self, row, name, default=None):
+        override = self._overrides.get(row, None)
+        if override is None:
+            return default
+        return override.get(name, default)
+
+    def set_attribute(self, row, name, value):
+        self._override(row)[name] = value
+
+    def _override(self, row):
+        override = self._overrides.get(row, None)
+        if override is None:
+            override = {}
+            self._overrides[row] = override
+        return override
+
+    # row and column management.
+
+    def _append_row(self, indices, coordinates):
+        row = self._new_rows(1)
+        for name, value in indices.items():
+            self._set_index(row, name, value)
+        for name, extent in coordinates.items():
+            self._coordinate_column(name)[row] = _as_extent(extent)
+        return row
+
+    def _new_rows(self, count):
+        """Adds `count` rows, with all their values missing, and returns the first of them."""
+        row = self._size
+        if row + count > self._capacity:
+            self._grow(max(INITIAL_CAPACITY, 2 * self._capacity, row + count))
+        self._size += count
+        return row
+
+    def _set_index(self, row, name, value):
+        column = self._indices.get(name, None)
+        if column is None:
+            column = self._new_index_column(name)
+        if column.dtype == np.int64:
+            integer_value = _as_integer_index(value)
+            if integer_value is None or integer_value == MISSING_INDEX:
+                column = self._to_object_column(name)
+            else:
+                value = integer_value
+        column[row] = value
+
+    def _coordinate_column(self, name):
+        column = self._coordinates.get(name, None)
+        if column is None:
+            column = np.full((self._capacity, 2), np.nan, dtype=np.float64)
+            self._coordinates[name] = column
+        return column
+
+    def _grow(self, capacity):
+        def grow(array, fill_value):
+            result = np.full((capacity,) + array.shape[1:], fill_value, dtype=array.dtype)
+            result[:self._size] = array[:self._size]
+            return result
+
+        for name, column in self._indices.items():
+            self._indices[name] = grow(
+                column, MISSING_INDEX if column.dtype == np.int64 else None)
+        for name, column in self._coordinates.items():
+            self._coordinates[name] = grow(column, np.nan)
+        self._tile_shapes = grow(self._tile_shapes, UNKNOWN_SHAPE)
+        self._sha256 = grow(self._sha256, NO_DIGEST)
+        self._source_ids = grow(self._source_ids, -1)
+        self._capacity = capacity
+
+    def _new_index_column(self, name):
+        column = np.full(self._capacity, MISSING_INDEX, dtype=np.int64)
+        self._indices[name] = column
+        # the keys of all the rows now include this index.
+        self._index_keys = None
+        return column
+
+    def _to_object_column(self, name):
+        column = self._indices[name]
+        object_column = np.full(self._capacity, None, dtype=object)
+        present = column != MISSING_INDEX
+        object_column[present] = [int(value) for value in column[present]]
+        self._indices[name] = object_column
+        self._index_keys = None
+        self._sorted_indices.pop(name, None)
+        return object_column
+
+    def _index_column(self, name):
+        return self._indices[name][:self._size]
+
+    def _missing(self, name):
+        column = self._index_column(name)
+        if column.dtype == np.int64:
+            return column == MISSING_INDEX
+        return np.array([value is None for value in column], dtype=bool)
+
+    def _build_index_keys(self):
+        """Returns the names of the index columns, and if they are all integer columns, the sorted
+        keys of the rows, where the key of a row consists of all its indices."""
+        names = sorted(self._indices.keys())
+        if not all(self._indices[name].dtype == np.int64 for name in names):
+            return names, None
+
+        def keys_of_rows(start, stop):
+            return _as_row_keys(
+                np.stack([self._indices[name][start:stop] for name in names], axis=1))
+
+        return names, _SortedKeys(keys_of_rows)
+
+    def _sorted_index(self, name):
+        """Returns the sorted values of an integer index column."""
+        sorted_index = self._sorted_indices.get(name, None)
+        if sorted_index is None:
+            with self._lock:
+                sorted_index = self._sorted_indices.get(name, None)
+                if sorted_index is None:
+                    sorted_index = _SortedKeys(lambda start, stop: self._indices[name][start:stop])
+                    self._sorted_indices[name] = sorted_index
+        return sorted_index
+
+
+class _SortedKeys:
+    """
+    The keys of the rows of a table, in sorted order, such that the rows with a given key are found
+    by binary search.  Rows appended after the keys were sorted are scanned, until there are enough
+    of them, or they have been scanned often enough, to be worth merging into the sorted keys.
+    Merging costs a sort of the appended keys and a pass over the sorted keys, rather than a sort
+    of all the keys.
+
+    The sorted keys are merged under a lock, and published together with the rows they cover, such
+    that lookups from several threads each search a consistent snapshot.
+    """
+    def __init__(self, keys_of_rows):
+        # returns the keys of the rows in [start, stop).
+        self._keys_of_rows = keys_of_rows
+        self._lock = threading.Lock()
+        # the number of rows that are sorted, their keys in sorted order, and the rows in the order
+        # of their keys.
+        self._sorted = (0, keys_of_rows(0, 0), np.zeros(0, dtype=np.intp))
+        # the number of rows scanned since the last merge.
+        self._num_scanned = 0
+
+    def rows(self, key, num_rows):
+        """Returns the rows, among the first `num_rows`, whose key is `key`, in no particular
+        order."""
+        with self._lock:
+            num_sorted = self._sorted[0]
+            num_unsorted = num_rows - num_sorted
+            if (num_unsorted > max(MIN_UNSORTED_ROWS, int(num_sorted ** 0.5))
+                    or self._num_scanned + num_unsorted > num_sorted // 16):
+                self._merge(num_rows)
+            num_sorted, sorted_keys, order = self._sorted
+            self._num_scanned += max(num_rows - num_sorted, 0)
+
+        start = np.searchsorted(sorted_keys, key, side="left")
+        stop = np.searchsorted(sorted_keys, key, side="right")
+        rows = order[start:stop]
+        if num_rows < num_sorted:
+            rows = rows[rows < num_rows]
+        elif num_rows > num_sorted:
+            unsorted_keys = self._keys_of_rows(num_sorted, num_rows)
+            rows = np.concatenate((rows, num_sorted + np.flatnonzero(unsorted_keys == key)))
+        return rows
+
+    def _merge(self, num_rows):
+        num_sorted, sorted_keys, sorted_order = self._sorted
+        if num_rows <= num_sorted:
+            return
+        keys = self._keys_of_rows(num_sorted, num_rows)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        positions = np.searchsorted(sorted_keys, keys, side="right")
+        self._sorted = (
+            num_rows,
+            np.insert(sorted_keys, positions, keys),
+            np.insert(sorted_order, positions, order + num_sorted),
+        )
+        self._num_scanned = 0
+
+
+class TileView(Tile):
+    """
+    A tile that is stored as a row of a :py:class:`TileTable`.  The view of a row is created when
+    the row is requested, and holds no state of its own, other than the dicts of its coordinates and
+    indices, and attributes set by callers.  A view with attributes set by callers is retained by
+    the table, such that the attributes are kept.
+    """
+    def __init__(self, table, row):
+        # the dicts of the coordinates and indices are kept in _dicts once they have been requested.
+        self.__dict__.update(_table=table, _row=row, _dicts={})
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not isinstance(getattr(type(self), name, None), property):
+            self._table._retain(self._row, self)
+
+    def _dict(self, name, getter):
+        result = self._dicts.get(name, None)
+        if result is None:
+            result = getter(self._row)
+            self._dicts[name] = result
+        return result
+
+    @property
+    def coordinates(self):
+        return self._dict("coordinates", self._table.get_coordinates)
+
+    @coordinates.setter
+    def coordinates(self, coordinates):
+        self._table.set_attribute(self._row, "coordinates", coordinates)
+        self._dicts["coordinates"] = coordinates
+
+    @property
+    def indices(self):
+        return self._dict("indices", self._table.get_indices)
+
+    @indices.setter
+    def indices(self, indices):
+        self._table.set_attribute(self._row, "indices", indices)
+        self._dicts["indices"] = indices
+
+    @property
+    def _tile_shape(self):
+        return self._table.get_tile_shape(self._row)
+
+    @_tile_shape.setter
+    def _tile_shape(self, tile_shape):
+        self._table.set_tile_shape(self._row, tile_shape)
+
+    @property
+    def sha256(self):
+        return self._table.get_sha256(self._row)
+
+    @sha256.setter
+    def sha256(self, sha256):
+        self._table.set_sha256(self._row, sha256)
+
+    @property
+    def extras(self):
+        extras = self._table.get_attribute(self._row, "extras", None)
+        if extras is None:
+            extras = {}
+            self._table.set_attribute(self._row, "extras", extras)
+        return extras
+
+    @extras.setter
+    def extras(self, extras):
+        self._table.set_attribute(self._row, "extras", extras)
+
+    @property
+    def _numpy_array(self):
+        return self._table.get_attribute(self._row, "numpy_array", None)
+
+    @_numpy_array.setter
+    def _numpy_array(self, numpy_array):
+        self._table.set_attribute(self._row, "numpy_array", numpy_array)
+
+    @property
+    def _numpy_array_future(self):
+        return self._table.get_future(self._row)
+
+    @_numpy_array_future.setter
+    def _numpy_array_future(self, future):
+        self._table.set_attribute(self._row, "future", future)
+
+
+class _RowDict(dict):
+    """
+    The coordinates or indices of a row, as built from its columns.  The dict is retained by the
+    table as the row's attribute once it is changed, such that the change outlives the view that
+    built the dict.  Copies of the dict are plain dicts.
+    """
+    __slots__ = ("_table", "_row", "_name")
+
+    def __init__(self, table, row, name, values):
+        super().__init__(values)
+        self._table = table
+        self._row = row
+        self._name = name
+
+    def _changed(self):
+        if self._table is not None:
+            self._table.set_attribute(self._row, self._name, self)
+            self._table = None
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _row_dict_mutator(name):
+    method = getattr(dict, name)
+
+    def mutate(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in (
+        "__setitem__", "__delitem__", "clear", "pop", "popitem", "setdefault", "update"):
+    setattr(_RowDict, _name, _row_dict_mutator(_name))
+
+
+def _as_integer_index(value):
+    """Returns an index value as a Python int if it is an integer, or None otherwise."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, np.integer)):
+        value = int(value)
+        if INT64_MIN <= value <= INT64_MAX:
+            return value
+    return None
+
+
+def _as_integer_array(values):
+    """Returns a sequence of index values, or of pairs of them, as an int64 array if they are all
+    integers, or None otherwise.  As in :py:func:`_as_integer_index`, booleans are not integers."""
+    try:
+        array = np.array(values)
+    except (ValueError, OverflowError):
+        return None
+    if not (array.dtype.kind == "i" or (
+            array.dtype.kind == "u" and (len(array) == 0 or array.max() <= INT64_MAX))):
+        return None
+    # numpy converts booleans mixed with integers to integers, so they are looked for in the
+    # values.
+    types = set(map(type, values if array.ndim == 1 else itertools.chain.from_iterable(values)))
+    if bool in types or np.bool_ in types:
+        return None
+    return array.astype(np.int64, copy=False)
+
+
+def _as_extent(value):
+    """Returns a coordinate value, which is a number or a pair of numbers, as a pair of floats that
+    can be stored in a coordinate column.  Values that are not numbers are stored as NaN."""
+    try:
+        array = np.array(value, dtype=float)
+    except (TypeError, ValueError):
+        return np.nan, np.nan
+    if array.shape == ():
+        return float(array), float(array)
+    if array.shape == (2,):
+        return tuple(array.tolist())
+    return np.nan, np.nan
+
+
+def _is_float_extent(value):
+    """Returns whether a coordinate value is a float, or a pair of floats, other than NaN, such that
+    a coordinate column returns it as it was given."""
+    pair = value if isinstance(value, (list, tuple)) else (value, value)
+    return len(pair) == 2 and all(type(item) is float and item == item for item in pair)
+
+
+def _as_tile_shape_array(tile_shapes):
+    """Returns a sequence of tile shapes as a (count, 2) int64 array of (y, x), with UNKNOWN_SHAPE
+    for the missing shapes, if they can all be stored in the tile shape column, or None
+    otherwise."""
+    y, x = DimensionNames.Y.value, DimensionNames.X.value
+    try:
+        pairs = [
+            (tile_shape[y], tile_shape[x]) if tile_shape is not None
+            else (UNKNOWN_SHAPE, UNKNOWN_SHAPE)
+            for tile_shape in tile_shapes
+        ]
+    except (KeyError, TypeError):
+        return None
+    if not all(tile_shape is None or len(tile_shape) == 2 for tile_shape in tile_shapes):
+        return None
+    array = _as_integer_array(pairs)
+    if array is None or array.shape != (len(tile_shapes), 2):
+        return None
+    return array
+
+
+def _as_digest_array(sha256s):
+    """Returns a sequence of checksums as an array of raw digests if they are all lowercase hex
+    strings of the right length, or None otherwise.  Checksums of all zeros are stored as
+    NO_DIGEST, as they would be by :py:func:`_as_digest`."""
+    if not all(isinstance(sha256, str) and len(sha256) == 64 for sha256 in sha256s):
+        return None
+    joined = "".join(sha256s)
+    if joined != joined.lower():
+        return None
+    try:
+        return np.frombuffer(bytes.fromhex(joined), dtype="V32")
+    except ValueError:
+        return None
+
+
+def _as_digest(sha256):
+    """Returns a checksum as a raw digest if it can be stored as one, such that it is returned as
+    the same string, or None otherwise."""
+    if not isinstance(sha256, str) or len(sha256) != 64 or sha256 != sha256.lower():
+        return None
+    try:
+        digest = bytes.fromhex(sha256)
+    except ValueError:
+        return None
+    return digest if digest != NO_DIGEST else None
+
+
+def _as_row_keys(matrix):
+    """Views each row of a 2D int64 array as a single opaque value, such that rows can be sorted
+    and searched as a whole."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.int64)
+    return matrix.view(np.dtype((np.void, matrix.dtype.itemsize * matrix.shape[1]))).ravel()
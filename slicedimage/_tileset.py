@@ -1,10 +1,18 @@
 from abc import abstractmethod
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
 
 from ._dimensions import DimensionNames
+from ._lazy_array import LazyTileArray
+from ._tile import Tile
+from ._tile_table import TileTable, UNKNOWN_SHAPE
 from ._typeformatting import (
     format_enum_keyed_dicts,
+    format_tile_coordinates,
     format_tileset_dimensions,
     format_tileset_shape,
+    _str_or_enum_to_str,
 )
 
 
@@ -22,7 +30,7 @@ class TileSet:
                                    if default_tile_shape is not None else None)
         self.default_tile_format = default_tile_format
         self.extras = {} if extras is None else extras
-        self._tiles = []
+        self._table = TileTable()
 
         self._discrete_dimensions = set()
 
@@ -33,22 +41,27 @@ class TileSet:
             for k in self.dimensions - {DimensionNames.Y, DimensionNames.X}
             if k in self.shape
         ]
-        xmin, xmax, ymin, ymax = float("inf"), float("-inf"), float("inf"), float("-inf")
-        for tile in self._tiles:
-            # try to get the shape in the following order:
-            # 1. read the tile's declared shape without forcing a read & decode of the tile data.
-            # 2. read the tileset's default tile shape.
-            # 3. read the tile's shape through a read & decode.
-            shape = tile._tile_shape
-            if shape is None:
-                shape = self.default_tile_shape
-            if shape is None:
-                shape = tile.tile_shape
-
-            xmin = min(xmin, shape[DimensionNames.X])
-            xmax = max(xmax, shape[DimensionNames.X])
-            ymin = min(ymin, shape[DimensionNames.Y])
-            ymax = max(ymax, shape[DimensionNames.Y])
+        shapes = self._table.tile_shapes()
+        unknown = np.flatnonzero(shapes[:, 0] == UNKNOWN_SHAPE)
+        if len(unknown) > 0 and self.default_tile_shape is not None:
+            shapes[unknown] = Tile.format_dict_shape_to_tuple_shape(self.default_tile_shape)
+        elif len(unknown) > 0:
+            # discover the shapes of the tiles that do not declare them concurrently.  This reads
+            # only the headers of the tiles' files where possible.
+            def probe(row):
+                return Tile.format_dict_shape_to_tuple_shape(self._table.tile(row).tile_shape)
+
+            tp = ThreadPool()
+            try:
+                shapes[unknown] = tp.map(probe, unknown.tolist())
+            finally:
+                tp.terminate()
+
+        if len(shapes) > 0:
+            ymin, xmin = shapes.min(axis=0).tolist()
+            ymax, xmax = shapes.max(axis=0).tolist()
+        else:
+            xmin, xmax, ymin, ymax = float("inf"), float("-inf"), float("inf"), float("-inf")
 
         if xmin == xmax:
             attributes.append("x: {}".format(xmin))
@@ -66,15 +79,243 @@ class TileSet:
     def validate(self):
         raise NotImplementedError()
 
+    @property
+    def _tiles(self):
+        return self._table.tiles()
+
     def add_tile(self, tile):
-        self._tiles.append(tile)
+        self._table.append_tile(tile)
+
+    def _add_tile_record(self, coordinates, indices, tile_shape, sha256, extras, source, name):
+        """
+        Adds a tile that is stored only as a record of its metadata, and presented as a
+        :py:class:`TileView` when it is accessed.  See :py:meth:`TileTable.append_record` for the
+        parameters.
+        """
+        self._table.append_record(coordinates, indices, tile_shape, sha256, extras, source, name)
+
+    def _add_tile_records(
+            self, coordinates, indices, tile_shapes, sha256s, extras, sources, names):
+        """
+        Adds tiles that are stored only as records of their metadata.  This is how tiles are added
+        when a tileset is read from a manifest.  See :py:meth:`TileTable.append_records` for the
+        parameters.
+        """
+        self._table.append_records(
+            coordinates, indices, tile_shapes, sha256s, extras, sources, names)
 
     def tiles(self, filter_fn=lambda _: True):
         """
         Return the tiles in this tileset.  If a filter_fn is provided, only the tiles for which
         filter_fn returns True are returned.
         """
-        return list(filter(filter_fn, self._tiles))
+        return list(filter(filter_fn, self._table.tiles()))
+
+    def get_tile(self, **indices):
+        """
+        Return the tile with exactly the given indices, e.g., ``tileset.get_tile(r=0, ch=1, z=2)``,
+        or None if there is no such tile.  The lookup does not scan the tiles.
+
+        The tiles are indexed by their indices as they are added, so the indices of a tile should
+        not be modified after it is added to the tileset.
+        """
+        row = self._table.find(indices)
+        if row is None:
+            return None
+        return self._table.tile(row)
+
+    def select(self, **indices):
+        """
+        Return the tiles whose indices match all the given indices, in the order they were added to
+        the tileset, e.g., ``tileset.select(r=0, ch=1)`` returns the tiles of every z plane for
+        round 0 and channel 1.  The cost of the lookup depends on the number of tiles that match the
+        most selective of the indices, rather than the number of tiles in the tileset.
+
+        The tiles are indexed by their indices as they are added, so the indices of a tile should
+        not be modified after it is added to the tileset.
+        """
+        return [self._table.tile(row) for row in self._table.select(indices).tolist()]
+
+    def query_region(self, **ranges):
+        """
+        Return the tiles whose physical extent overlaps the given region, in the order they were
+        added to the tileset, e.g., ``tileset.query_region(x=(0.0, 0.5), y=(0.2, 0.3))``.  Each
+        range is inclusive, and may also be a single coordinate.  Tiles that have no coordinates for
+        one of the given dimensions do not match.
+
+        The coordinates of the tiles are stored in arrays as they are added, such that the query
+        itself is vectorized.  The coordinates of a tile should therefore not be modified after it
+        is added to the tileset.
+        """
+        matches = np.ones(len(self._table), dtype=bool)
+        for name, coordinate_range in ranges.items():
+            low, high = format_tile_coordinates({name: coordinate_range})[name]
+            low, high = min(low, high), max(low, high)
+            extents = self._table.coordinate_extents(name)
+            if extents is None:
+                return []
+            mins, maxs = extents
+            # NaN, which stands for a missing coordinate, never compares true.
+            matches &= (mins <= high) & (maxs >= low)
+
+        return [self._table.tile(row) for row in np.flatnonzero(matches).tolist()]
+
+    def prefetch(self, filter_fn=lambda _: True, max_workers=None, progress_callback=None):
+        """
+        Fetch and decode the data for the tiles in this tileset concurrently, and retain the data in
+        the tiles.  If a filter_fn is provided, only the tiles for which filter_fn returns True are
+        fetched.
+
+        A failure to fetch one tile does not stop the other tiles from being fetched.  Instead, the
+        exception is reported for that tile.
+
+        Parameters
+        ----------
+        filter_fn : Callable[[Tile], bool]
+            Only the tiles for which this returns True are fetched.
+        max_workers : Optional[int]
+            The maximum number of tiles that are fetched concurrently.  If None, the number of CPUs
+            is used.
+        progress_callback : Optional[Callable[[Tile, Optional[Exception]], None]]
+            If provided, this is called from the calling thread as each tile completes, with the
+            tile and the exception raised while fetching it, or None if it was successful.
+
+        Returns
+        -------
+        Sequence[Tuple[Tile, Optional[Exception]]] :
+            A tuple of the tile and the exception raised while fetching it, or None if it was
+            successful, for each of the selected tiles, in the order they appear in the tileset.
+        """
+        tiles = self.tiles(filter_fn)
+        results = [None] * len(tiles)
+
+        def load(position):
+            tile = tiles[position]
+            try:
+                tile._load()
+            except Exception as ex:
+                return position, ex
+            return position, None
+
+        tp = ThreadPool(max_workers)
+        try:
+            for position, exception in tp.imap_unordered(load, range(len(tiles))):
+                results[position] = (tiles[position], exception)
+                if progress_callback is not None:
+                    progress_callback(tiles[position], exception)
+        finally:
+            tp.terminate()
+
+        return results
+
+    def to_ndarray(self, dims_order=None, dtype=None, out=None, max_workers=None):
+        """
+        Assemble the data of all the tiles in this tileset into a single array.  The array has one
+        axis for each of the dimensions in `dims_order`, sized according to the tileset's shape,
+        followed by the y and x axes of the tiles.  Each tile's data is copied into the array at the
+        position given by its indices.  Positions without a tile are left as zeros, or untouched if
+        `out` is provided.
+
+        Tiles are fetched and decoded concurrently, and each is copied, and converted to the array's
+        dtype if necessary, directly into its place in the array.
+
+        Parameters
+        ----------
+        dims_order : Optional[Sequence[str]]
+            The dimensions of the tiles' indices, in the order of the array's leading axes.  If
+            None, all the non-spatial dimensions of the tileset's shape are used, in sorted order.
+        dtype : Optional[np.dtype]
+            The dtype of the array.  If None, the dtype of the data of the first tile is used.
+        out : Optional[np.ndarray]
+            If provided, the data is written into this array, which may, for instance, be a
+            np.memmap, instead of a newly allocated one.  Its shape must match the assembled shape.
+        max_workers : Optional[int]
+            The maximum number of tiles that are fetched concurrently.  If None, the number of CPUs
+            is used.
+
+        Returns
+        -------
+        np.ndarray :
+            The assembled array, which is `out` if it was provided.
+        """
+        dims_order, shape = self._assembly_layout(dims_order)
+
+        tiles = list(self._tiles)
+        first_data = None
+        if out is None:
+            if dtype is None:
+                first_data = tiles[0].numpy_array
+                dtype = first_data.dtype
+            out = np.zeros(shape, dtype=dtype)
+        elif out.shape != shape:
+            raise ValueError(
+                "out has shape {}, but the assembled shape is {}".format(out.shape, shape))
+
+        def fill(tile, data=None):
+            try:
+                position = tuple(tile.indices[dim] for dim in dims_order)
+            except KeyError as ex:
+                raise ValueError(
+                    "Tile with indices {} does not have an index for {}".format(
+                        tile.indices, ex.args[0])) from ex
+            if data is None:
+                data = tile.numpy_array
+            if data.shape != shape[-2:]:
+                raise ValueError(
+                    "Tile with indices {} has shape {}, but the assembled tile shape is {}".format(
+                        tile.indices, data.shape, shape[-2:]))
+            out[position] = data
+
+        if first_data is not None:
+            # this tile was already decoded to find the dtype.
+            fill(tiles.pop(0), first_data)
+
+        tp = ThreadPool(max_workers)
+        try:
+            for _ in tp.imap_unordered(fill, tiles):
+                pass
+        finally:
+            tp.terminate()
+
+        return out
+
+    def to_lazy_array(self, dims_order=None, dtype=None, max_workers=None):
+        """
+        Return a read-only, array-like view of this tileset, laid out as :py:meth:`to_ndarray`
+        would lay it out, with one chunk per tile.  Tiles are only fetched and decoded when the
+        parts of the array that they hold are read, such that crops, projections, and reductions
+        never need to hold the whole tileset in memory.
+
+        The view can be wrapped for use with dask, e.g.,
+        ``dask.array.from_array(view, chunks=view.chunks)``.
+
+        Building the view does not decode any tiles.  If the tile shapes are not declared in the
+        tileset, or `dtype` is not provided, they are read from the header of the first tile's
+        file where the tile format allows it.  See :py:class:`LazyTileArray`.
+        """
+        dims_order, shape = self._assembly_layout(dims_order)
+        return LazyTileArray(self, dims_order, shape, dtype, max_workers)
+
+    def _assembly_layout(self, dims_order):
+        """Returns the dimensions of the tiles' indices that make up the leading axes of the
+        assembled array, and the shape of the assembled array."""
+        if dims_order is None:
+            dims_order = sorted(
+                set(self.shape.keys()) - {DimensionNames.X.value, DimensionNames.Y.value})
+        dims_order = [_str_or_enum_to_str(dim) for dim in dims_order]
+        if len(self._table) == 0:
+            raise ValueError("Cannot assemble a tileset without any tiles")
+
+        # find the tile shape without decoding a tile, if possible.
+        first_tile = self._table.tile(0)
+        tile_shape = first_tile._tile_shape
+        if tile_shape is None:
+            tile_shape = self.default_tile_shape
+        if tile_shape is None:
+            tile_shape = first_tile.tile_shape
+        shape = tuple(self.shape[dim] for dim in dims_order) + (
+            tile_shape[DimensionNames.Y], tile_shape[DimensionNames.X])
+        return dims_order, shape
 
     def get_dimension_shape(self, dimension_name):
         return self.shape[dimension_name]
@@ -1,5 +1,15 @@
+import contextlib
 import hashlib
+import io
+import threading
 from abc import abstractmethod
+from tempfile import SpooledTemporaryFile
+
+from slicedimage._compat import get_running_loop
+
+DEFAULT_SPOOL_SIZE = 64 * 1024 * 1024
+
+_read_throttles = threading.local()
 
 
 class Backend:
@@ -23,16 +33,136 @@ class Backend:
         """
         raise NotImplementedError()
 
+    def read_range(self, name, offset, length, checksum_sha256=None):
+        """
+        Reads `length` bytes of a file, starting at `offset`, and returns them as bytes.  Fewer
+        bytes are returned if the file is not long enough.  Because only part of the file is read,
+        its checksum cannot be verified, but backends that hold files by their checksum may use it
+        to find the file.
+
+        Backends without native support for ranged reads fall back to reading through
+        :py:meth:`read_contextmanager` and seeking.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file that is to be read.
+        offset : int
+            The offset of the first byte to read.
+        length : int
+            The number of bytes to read.
+        checksum_sha256 : Optional[str]
+            The expected checksum of the entire file.
+        """
+        with self.read_contextmanager(name) as fh:
+            fh.seek(offset)
+            return fh.read(length)
+
+    async def read_async(self, name, checksum_sha256=None, executor=None):
+        """
+        Reads the entirety of a file asynchronously, and returns its contents as bytes.
+
+        If the checksum is provided and it does not match the checksum of the data read,
+        ChecksumValidationError will be raised.
+
+        Backends without native support for asynchronous IO fall back to running
+        :py:meth:`read_contextmanager` on `executor`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file that is to be read.
+        checksum_sha256 : Optional[str]
+            The expected checksum of the file.
+        executor : Optional[concurrent.futures.Executor]
+            The executor to run blocking IO on.  If None, the event loop's default executor is used.
+        """
+        def read():
+            with self.read_contextmanager(name, checksum_sha256) as fh:
+                return fh.read()
+
+        loop = get_running_loop()
+        return await loop.run_in_executor(executor, read)
+
+    def local_path(self, name, checksum_sha256=None):
+        """
+        Returns the path of a local file that holds the data, if the backend can provide one that
+        can be mapped into memory.  Otherwise, returns None, and the data should be read through
+        :py:meth:`read_contextmanager`.
+
+        If the checksum is provided and it does not match the checksum of the data,
+        ChecksumValidationError will be raised.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file that is to be read.
+        checksum_sha256 : Optional[str]
+            The expected checksum of the file.
+        """
+        return None
+
+    @contextlib.contextmanager
+    def local_file(self, name, checksum_sha256=None):
+        """
+        Context manager that yields the path of a local file that holds the data, as
+        :py:meth:`local_path` does, or None.  The file remains in place until the context manager
+        exits, such that it can be mapped into memory in the meantime.  A mapping made in the
+        meantime remains valid after the context manager exits.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file that is to be read.
+        checksum_sha256 : Optional[str]
+            The expected checksum of the file.
+        """
+        yield self.local_path(name, checksum_sha256)
+
+    def url(self, name):
+        """
+        Returns a url that uniquely identifies the file `name` across backends, or None if the
+        backend cannot provide one.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file.
+        """
+        return None
+
+    def read_if_changed(self, name, validators=None):
+        """
+        Reads a file, unless it is unchanged since the read that returned `validators`.  Returns a
+        tuple consisting of the file's current validators and a seekable file-like object with the
+        file's data, or None in place of the file-like object if the file is unchanged.  The caller
+        is responsible for closing the file-like object.
+
+        Validators are opaque mappings of strings to strings, such as the ETag of an object.
+        Backends that cannot cheaply determine whether a file has changed return None as the
+        validators, and always read the file.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file that is to be read.
+        validators : Optional[Mapping[str, str]]
+            The validators returned by a previous read of the file.
+        """
+        with self.read_contextmanager(name) as fh:
+            return None, io.BytesIO(fh.read())
+
     @abstractmethod
     def write_file_handle(self, name):
         raise NotImplementedError()
 
     def write_file_from_handle(self, name, source_handle, block_size=(128 * 1024)):
         with self.write_file_handle(name) as dest_handle:
-            data = source_handle.read(block_size)
-            if len(data) == 0:
-                return
-            dest_handle.write(data)
+            while True:
+                data = source_handle.read(block_size)
+                if len(data) == 0:
+                    return
+                dest_handle.write(data)
 
 
 class ChecksumValidationError(ValueError):
@@ -69,3 +199,228 @@ def verify_checksum(fh, expected_sha256_checksum, block_size=1024 * 1024):
             break
 
     fh.seek(0)
+
+
+def spool_stream(
+        stream, checksum_sha256=None, max_size=DEFAULT_SPOOL_SIZE, block_size=1024 * 1024):
+    """
+    Copy a stream, which need not be seekable, into a seekable temporary file, and rewind the
+    temporary file.  The temporary file is held in memory until it exceeds `max_size` bytes, at
+    which point it is spilled to disk.  This bounds the memory used to hold data for decoders that
+    need to seek.
+
+    If the checksum is provided, it is calculated while the data is copied, and if it does not
+    match, ChecksumValidationError is raised.
+
+    If the copy is made within :py:func:`throttle_reads`, the throttle is invoked as each block is
+    read.
+    """
+    if checksum_sha256 is not None:
+        stream = HashingReader(stream, checksum_sha256, block_size)
+    throttle = getattr(_read_throttles, "throttle", None)
+
+    spool = SpooledTemporaryFile(max_size=max_size)
+    try:
+        while True:
+            data = stream.read(block_size)
+            if len(data) == 0:
+                break
+            if throttle is not None:
+                throttle(len(data))
+            spool.write(data)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+@contextlib.contextmanager
+def throttle_reads(throttle):
+    """
+    Within this context manager, data that backends stream from remote storage on the calling
+    thread is reported to `throttle` as it is read, such that the throttle can slow the reads down.
+
+    Parameters
+    ----------
+    throttle : Optional[Callable[[int], None]]
+        Invoked with the number of bytes in each block that is read.  It may block to delay the
+        reading of the next block.
+    """
+    previous = getattr(_read_throttles, "throttle", None)
+    _read_throttles.throttle = throttle
+    try:
+        yield
+    finally:
+        _read_throttles.throttle = previous
+
+
+class SpooledUpload:
+    """
+    A writable file-like object for backends that store objects remotely.  Data written to it is
+    buffered in a temporary file, which is held in memory until it exceeds `max_size` bytes, at
+    which point it is spilled to disk.  When it is closed without error, the rewound temporary file
+    is passed to `upload`.
+    """
+    def __init__(self, upload, max_size=DEFAULT_SPOOL_SIZE):
+        self._upload = upload
+        self._spool = SpooledTemporaryFile(max_size=max_size)
+
+    @property
+    def closed(self):
+        return self._spool.closed
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self._spool.write(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._spool.seek(0)
+            self._upload(self._spool)
+        finally:
+            self._spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            # discard the data.
+            self._spool.close()
+        else:
+            self.close()
+
+
+class HashingReader(io.RawIOBase):
+    """
+    Wraps a binary file-like object, and calculates the sha256 checksum of the data as it is
+    consumed, such that the data does not need to be read once to verify the checksum and then
+    once more to decode it.
+
+    The checksum is verified when the end of the data is read, or when the reader is exited as a
+    context manager.  If the checksum does not match, `ChecksumValidationError` is raised.  If the
+    consumer seeks past data that has not been read, that data is read and hashed first.  If the
+    consumer closes the reader or exits before reading all the data, the remainder is read and
+    hashed at that point.
+    """
+    def __init__(self, fh, expected_sha256_checksum, block_size=1024 * 1024):
+        super().__init__()
+        self._fh = fh
+        self._expected_sha256_checksum = expected_sha256_checksum
+        self._block_size = block_size
+        self._checksummer = hashlib.sha256()
+        self._position = 0
+        # the number of bytes, starting from the beginning of the data, that have been hashed.
+        self._hashed = 0
+        # set when all the data has been hashed.
+        self._finished = False
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._fh.seekable()
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._position = self._fh.seek(offset, whence)
+        return self._position
+
+    def read(self, size=-1):
+        if self._position > self._hashed:
+            self._hash_remaining(self._position)
+
+        start = self._position
+        data = self._fh.read(size)
+        self._position = start + len(data)
+        if start <= self._hashed < self._position:
+            self._checksummer.update(memoryview(data)[self._hashed - start:])
+            self._hashed = self._position
+
+        if ((size is None or size < 0 or (size > 0 and len(data) == 0))
+                and self._hashed == self._position):
+            # we have reached the end of the data, and all of it has been hashed.
+            self._finished = True
+            self._check()
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, b):
+        view = memoryview(b).cast("B")
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def verify(self):
+        """
+        Reads and hashes any data that has not been consumed, and verifies the checksum.
+        """
+        if not self._finished:
+            self._hash_remaining(None)
+            self._finished = True
+        self._check()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if not self._finished:
+                self._hash_remaining(None)
+                self._finished = True
+        finally:
+            try:
+                self._fh.close()
+            finally:
+                super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            # there is no reason to read the rest of the data.
+            self._finished = True
+            self.close()
+            return
+
+        try:
+            self.verify()
+        finally:
+            self.close()
+
+    def _hash_remaining(self, end):
+        """Hash the data from the end of the hashed data up to `end`, or to the end of the data if
+        `end` is None.  The position is restored afterwards."""
+        if self._hashed != self._position:
+            self._fh.seek(self._hashed)
+        while end is None or self._hashed < end:
+            if end is None:
+                block_size = self._block_size
+            else:
+                block_size = min(self._block_size, end - self._hashed)
+            data = self._fh.read(block_size)
+            if len(data) == 0:
+                break
+            self._checksummer.update(data)
+            self._hashed += len(data)
+        if self._hashed != self._position:
+            if self._fh.seekable():
+                self._fh.seek(self._position)
+            else:
+                self._position = self._hashed
+
+    def _check(self):
+        calculated_checksum = self._checksummer.hexdigest()
+        if calculated_checksum != self._expected_sha256_checksum:
+            raise ChecksumValidationError(
+                "calculated checksum ({}) does not match expected checksum ({})".format(
+                    calculated_checksum, self._expected_sha256_checksum))
@@ -1,69 +1,373 @@
+import contextlib
 import io
-from typing import MutableMapping
+import os
+import shutil
+import time
+import uuid
+from multiprocessing.pool import ThreadPool
+from typing import List, MutableMapping, Tuple
 from threading import Lock
 
-from diskcache import Cache
+from diskcache import Cache, Lock as DiskCacheLock
 
-from ._base import Backend, verify_checksum
+from ._base import Backend, HashingReader, throttle_reads, verify_checksum
 
 SIZE_LIMIT = 5e9
 CACHE_VERSION = "v1"
+FETCH_LOCK_EXPIRE = 600
+"""Seconds after which a fetch lock held by another process is presumed abandoned."""
+MMAP_DIRECTORY = "mmap"
+"""The directory, within the cache directory, that holds the links to the cache files that are
+being mapped into memory."""
 
 
 class CachingBackend(Backend):
     _LOCK = Lock()
     _CACHE = {}  # type: MutableMapping[str, Cache]
+    # maps (cache directory, cache key) to a lock serializing the fetches of that key, and the
+    # number of readers using the lock.
+    _FETCH_LOCKS = {}  # type: MutableMapping[Tuple[str, str], List]
 
-    def __init__(self, cacheroot, authoritative_backend, size_limit=SIZE_LIMIT):
+    def __init__(
+            self, cacheroot, authoritative_backend, size_limit=SIZE_LIMIT, verify_hits=True,
+            mmap=False):
+        """
+        Parameters
+        ----------
+        cacheroot : str
+            The directory that holds the cache.
+        authoritative_backend : Backend
+            The backend that cache misses are served from.
+        size_limit : int
+            The maximum size of the cache, in bytes.
+        verify_hits : bool
+            If True, data served from the cache is checked against its checksum.  Cache entries are
+            keyed by the checksum of the data, and misses are verified before they are cached, so
+            this only guards against corruption of the cache directory.
+        mmap : bool
+            If True, data in the cache may be memory-mapped directly from the cache directory, for
+            tile formats that support it.
+        """
         with CachingBackend._LOCK:
             if cacheroot not in CachingBackend._CACHE:
                 CachingBackend._CACHE[cacheroot] = Cache(cacheroot, size_limit=int(size_limit))
             self._cache = CachingBackend._CACHE[cacheroot]
         self._authoritative_backend = authoritative_backend
+        self._verify_hits = verify_hits
+        self._mmap = mmap
 
     def read_contextmanager(self, name, checksum_sha256=None):
         if checksum_sha256 is not None:
             return _CachingBackendContextManager(
-                self._authoritative_backend, self._cache, name, checksum_sha256)
+                self._authoritative_backend, self._cache, name, checksum_sha256,
+                self._verify_hits)
+
+        url = self._authoritative_backend.url(name)
+        if url is not None:
+            # without a checksum, the cached data is only used if the authoritative backend
+            # confirms that the file is unchanged.
+            return _RevalidatingContextManager(self._authoritative_backend, self._cache, name, url)
         else:
             return self._authoritative_backend.read_contextmanager(
                 name, checksum_sha256)
 
+    def read_range(self, name, offset, length, checksum_sha256=None):
+        # ranged reads are served from the cache if the entire file is there, but they do not
+        # populate the cache, as that would require reading the entire file.
+        if checksum_sha256 is not None:
+            file_data = self._cache.get(_cache_key(checksum_sha256), None, read=True)
+            if isinstance(file_data, io.IOBase):
+                with file_data:
+                    file_data.seek(offset)
+                    return file_data.read(max(length, 0))
+            elif file_data is not None:
+                return bytes(file_data[offset:offset + max(length, 0)])
+        return self._authoritative_backend.read_range(name, offset, length, checksum_sha256)
+
+    @contextlib.contextmanager
+    def local_file(self, name, checksum_sha256=None):
+        """
+        Yields the path of a link to the cache file that holds the data, if it is held in a file of
+        its own.  The cache may evict its file at any time, so the data is served from a link of its
+        own, which is removed when the context manager exits.
+        """
+        if not self._mmap or checksum_sha256 is None:
+            yield None
+            return
+
+        cache_key = _cache_key(checksum_sha256)
+        handle = self._cache.get(cache_key, None, read=True)
+        verify = self._verify_hits
+        if handle is None:
+            # populate the cache, which verifies the data as it is fetched.
+            with self.read_contextmanager(name, checksum_sha256):
+                pass
+            handle = self._cache.get(cache_key, None, read=True)
+            verify = False
+        if not isinstance(handle, io.IOBase):
+            # the data is not held in a file of its own.
+            yield None
+            return
+
+        with handle:
+            if verify:
+                verify_checksum(handle, checksum_sha256)
+            path = self._link(handle)
+        try:
+            yield path
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                # e.g., on Windows, a file cannot be removed while it is mapped.
+                pass
+
+    def _link(self, handle):
+        """Links the file of an open handle to the cache into MMAP_DIRECTORY, or copies it if it is
+        no longer in place, e.g., because the cache evicted it after it was opened."""
+        directory = os.path.join(self._cache.directory, MMAP_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, uuid.uuid4().hex)
+        try:
+            os.link(handle.name, path)
+            if os.path.samestat(os.stat(path), os.fstat(handle.fileno())):
+                return path
+            os.unlink(path)
+        except OSError:
+            pass
+        handle.seek(0)
+        with open(path, "wb") as fh:
+            shutil.copyfileobj(handle, fh)
+        return path
+
+    def url(self, name):
+        return self._authoritative_backend.url(name)
+
+    def warm(
+            self, names_and_checksums, max_workers=None, bandwidth_limit=None,
+            progress_callback=None):
+        """
+        Fetch files into the cache concurrently, such that later reads are served from the cache.
+        Files with a checksum that are already in the cache are skipped.  Files without a checksum
+        are revalidated.
+
+        A failure to fetch one file does not stop the other files from being fetched.  Instead, the
+        exception is reported for that file.
+
+        Parameters
+        ----------
+        names_and_checksums : Iterable[Tuple[str, Optional[str]]]
+            The names of the files to fetch, and their expected checksums.
+        max_workers : Optional[int]
+            The maximum number of files that are fetched concurrently.  If None, the number of CPUs
+            is used.
+        bandwidth_limit : Optional[float]
+            If provided, the maximum rate, in bytes per second, at which files are fetched, across
+            all the concurrent fetches.  Data streamed from remote storage is throttled as it is
+            read.  Data read otherwise, e.g., from local disk, is accounted for once it is read.
+        progress_callback : Optional[Callable[[str, Optional[Exception]], None]]
+            If provided, this is called from the calling thread as each file completes, with the
+            name of the file and the exception raised while fetching it, or None if it was
+            successful.
+
+        Returns
+        -------
+        Sequence[Tuple[str, Optional[Exception]]] :
+            A tuple of the name of the file and the exception raised while fetching it, or None if
+            it was successful, for each of the files, in the order they were provided.
+        """
+        names_and_checksums = list(names_and_checksums)
+        results = [None] * len(names_and_checksums)
+        limiter = _BandwidthLimiter(bandwidth_limit) if bandwidth_limit is not None else None
+
+        def fetch(position):
+            name, checksum_sha256 = names_and_checksums[position]
+            try:
+                if checksum_sha256 is not None and _cache_key(checksum_sha256) in self._cache:
+                    return position, None
+                streamed = [0]
+
+                def throttle(nbytes):
+                    streamed[0] += nbytes
+                    limiter.consume(nbytes)
+
+                with throttle_reads(throttle if limiter is not None else None):
+                    with self.read_contextmanager(name, checksum_sha256) as fh:
+                        size = fh.seek(0, io.SEEK_END)
+                if limiter is not None and size > streamed[0]:
+                    # the data was not streamed through the throttle.
+                    limiter.consume(size - streamed[0])
+            except Exception as ex:
+                return position, ex
+            return position, None
+
+        tp = ThreadPool(max_workers)
+        try:
+            for position, exception in tp.imap_unordered(fetch, range(len(names_and_checksums))):
+                results[position] = (names_and_checksums[position][0], exception)
+                if progress_callback is not None:
+                    progress_callback(names_and_checksums[position][0], exception)
+        finally:
+            tp.terminate()
+
+        return results
+
     def write_file_handle(self, name):
         return self._authoritative_backend.write_file_handle(name)
 
 
+def _cache_key(checksum_sha256):
+    return "{}-{}".format(CACHE_VERSION, checksum_sha256)
+
+
 class _CachingBackendContextManager:
-    def __init__(self, authoritative_backend, cache, name, checksum_sha256):
+    def __init__(self, authoritative_backend, cache, name, checksum_sha256, verify_hits=True):
         self.authoritative_backend = authoritative_backend
         self.cache = cache
         self.name = name
         self.checksum_sha256 = checksum_sha256
+        self.verify_hits = verify_hits
         self.handle = None
 
     def __enter__(self):
-        cache_key = "{}-{}".format(CACHE_VERSION, self.checksum_sha256)
-        try:
-            file_data = self.cache.read(cache_key)
-        except KeyError:
-            # not in cache :(
-            with self.authoritative_backend.read_contextmanager(
-                    self.name, self.checksum_sha256) as sfh:
-                file_data = sfh.read()
-            self.cache.set(cache_key, file_data)
-            self.handle = io.BytesIO(file_data)
+        cache_key = _cache_key(self.checksum_sha256)
+        file_data = self.cache.get(cache_key, None, read=True)
+        if file_data is None:
+            with _fetch_lock(self.cache, cache_key):
+                # another thread or process may have fetched the data while we waited.
+                file_data = self.cache.get(cache_key, None, read=True)
+                if file_data is None:
+                    # not in cache :(
+                    return self._fetch(cache_key)
 
-            # we are directly returning the data from the authoritative backend, which we assume
-            # is verifying the checksum, so we don't layer on another checksum calculation.
+        # Entries written by older versions may be returned as bytes instead of a file handle.
+        # In that case, we want to wrap it in a file-like object.
+        if isinstance(file_data, io.IOBase):
+            self.handle = file_data
         else:
-            # If the data is small enough, the DiskCache library returns the cache data
-            # as bytes instead of a buffered reader.
-            # In that case, we want to wrap it in a file-like object.
+            self.handle = io.BytesIO(file_data)
+        if self.verify_hits:
+            self.handle = HashingReader(self.handle, self.checksum_sha256)
+
+        return self.handle.__enter__()
+
+    def _fetch(self, cache_key):
+        # the authoritative backend verifies the checksum as the data is read, so the data is
+        # streamed straight into the cache, and then served from the authoritative backend's handle,
+        # which is rewound.
+        self.handle = self.authoritative_backend.read_contextmanager(
+            self.name, self.checksum_sha256)
+        sfh = self.handle.__enter__()
+        try:
+            self.cache.set(cache_key, sfh, read=True)
+            sfh.seek(0)
+        except BaseException as ex:
+            self.__exit__(type(ex), ex, ex.__traceback__)
+            raise
+        return sfh
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.handle is not None:
+            try:
+                return self.handle.__exit__(exc_type, exc_val, exc_tb)
+            finally:
+                self.handle = None
+
+
+@contextlib.contextmanager
+def _fetch_lock(cache, cache_key):
+    """
+    Serializes the fetches of a cache entry, such that when several readers miss on the same entry,
+    only the first fetches it, and the rest wait for it to land in the cache.  Threads in this
+    process wait on a shared lock, and the thread holding it then takes a lock in the cache itself,
+    which excludes other processes sharing the cache directory.  The lock in the cache expires, such
+    that a process that dies while fetching does not block the others forever.
+    """
+    lock_key = (cache.directory, cache_key)
+    with CachingBackend._LOCK:
+        entry = CachingBackend._FETCH_LOCKS.get(lock_key, None)
+        if entry is None:
+            entry = [Lock(), 0]
+            CachingBackend._FETCH_LOCKS[lock_key] = entry
+        entry[1] += 1
+    try:
+        with entry[0]:
+            with DiskCacheLock(cache, _fetch_lock_key(cache_key), expire=FETCH_LOCK_EXPIRE):
+                yield
+    finally:
+        with CachingBackend._LOCK:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del CachingBackend._FETCH_LOCKS[lock_key]
+
+
+def _fetch_lock_key(cache_key):
+    return "{}-fetch-lock".format(cache_key)
+
+
+class _BandwidthLimiter:
+    """
+    Limits the rate at which data is fetched by several threads.  Each block of data reserves the
+    time it takes to fetch at the permitted rate, after the time reserved by the blocks before it,
+    and the fetching thread waits until its reservation ends before it reads the next block.  Time
+    that passes without any reservation is not banked, so the data fetched up to any point in time
+    never exceeds the permitted rate by more than one block per thread.
+    """
+    def __init__(self, bytes_per_second):
+        self._lock = Lock()
+        self._bytes_per_second = bytes_per_second
+        self._available_at = time.monotonic()
+
+    def consume(self, nbytes):
+        with self._lock:
+            now = time.monotonic()
+            self._available_at = max(self._available_at, now) + nbytes / self._bytes_per_second
+            delay = self._available_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _RevalidatingContextManager:
+    """
+    Serves a file that has no known checksum from the cache, provided the authoritative backend
+    confirms that the file has not changed since it was cached.  The data and the validators
+    returned by the authoritative backend are cached under keys derived from the file's url.
+    """
+    def __init__(self, authoritative_backend, cache, name, url):
+        self.authoritative_backend = authoritative_backend
+        self.cache = cache
+        self.name = name
+        self.data_key = "{}-url-{}".format(CACHE_VERSION, url)
+        self.validators_key = "{}-url-validators-{}".format(CACHE_VERSION, url)
+        self.handle = None
+
+    def __enter__(self):
+        with self.cache.transact():
+            validators = self.cache.get(self.validators_key, None)
+            file_data = self.cache.get(self.data_key, None, read=True)
+        if file_data is None:
+            validators = None
+
+        new_validators, fh = self.authoritative_backend.read_if_changed(self.name, validators)
+        if fh is None:
+            # unchanged, so the cached data is still good.
             if isinstance(file_data, io.IOBase):
                 self.handle = file_data
             else:
                 self.handle = io.BytesIO(file_data)
-            verify_checksum(self.handle, self.checksum_sha256)
+        else:
+            if file_data is not None and isinstance(file_data, io.IOBase):
+                file_data.close()
+            if new_validators is not None:
+                try:
+                    with self.cache.transact():
+                        self.cache.set(self.data_key, fh, read=True)
+                        self.cache.set(self.validators_key, new_validators)
+                    fh.seek(0)
+                except BaseException:
+                    fh.close()
+                    raise
+            self.handle = fh
 
         return self.handle.__enter__()
 
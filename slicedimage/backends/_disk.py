@@ -1,15 +1,47 @@
 import os
+from pathlib import Path
+from threading import Lock
+from typing import MutableMapping, Tuple
 
-from ._base import Backend, verify_checksum
+from ._base import Backend, HashingReader, verify_checksum
 
 
 class DiskBackend(Backend):
-    def __init__(self, basedir):
+    CONFIG_MMAP_KEY = "mmap"
+
+    _LOCK = Lock()
+    # maps the (path, mtime, size) of files that have been verified to their checksum.
+    _VERIFIED = {}  # type: MutableMapping[Tuple[str, int, int], str]
+
+    def __init__(self, basedir, disk_config=None):
         self._basedir = basedir
+        self._disk_config = {} if disk_config is None else disk_config
 
     def read_contextmanager(self, name, checksum_sha256=None):
         return _FileLikeContextManager(os.path.join(self._basedir, name), checksum_sha256)
 
+    def url(self, name):
+        return Path(os.path.abspath(os.path.join(self._basedir, name))).as_uri()
+
+    def local_path(self, name, checksum_sha256=None):
+        if not self._disk_config.get(DiskBackend.CONFIG_MMAP_KEY, False):
+            return None
+
+        path = os.path.join(self._basedir, name)
+        if checksum_sha256 is not None:
+            # the checksum is verified once, and remembered for as long as the file is unmodified.
+            stat = os.stat(path)
+            verified_key = (path, stat.st_mtime_ns, stat.st_size)
+            with DiskBackend._LOCK:
+                verified = DiskBackend._VERIFIED.get(verified_key, None) == checksum_sha256
+            if not verified:
+                with open(path, "rb") as fh:
+                    verify_checksum(fh, checksum_sha256)
+                with DiskBackend._LOCK:
+                    DiskBackend._VERIFIED[verified_key] = checksum_sha256
+
+        return path
+
     def write_file_handle(self, name):
         return open(os.path.join(self._basedir, name), "wb")
 
@@ -22,7 +54,8 @@ class _FileLikeContextManager:
 
     def __enter__(self):
         self.handle = open(self.path, "rb")
-        verify_checksum(self.handle, self.checksum_sha256)
+        if self.checksum_sha256 is not None:
+            self.handle = HashingReader(self.handle, self.checksum_sha256)
         return self.handle
 
     def __exit__(self, exc_type, exc_val, exc_tb):
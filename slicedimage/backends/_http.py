@@ -1,43 +1,151 @@
+from threading import Lock
+from typing import MutableMapping, Tuple
+
 import requests
-from io import BytesIO
 
 from requests.adapters import HTTPAdapter
 from urllib3.util import retry
 
 from slicedimage import url
-from ._base import Backend, verify_checksum
+from ._base import Backend, DEFAULT_SPOOL_SIZE, spool_stream, SpooledUpload
 
 
 RETRY_STATUS_CODES = frozenset({500, 502, 503, 504})
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+# maps the response headers that identify a version of a file to the request headers that make a
+# request conditional on them.
+VALIDATOR_HEADERS = {
+    "ETag": "If-None-Match",
+    "Last-Modified": "If-Modified-Since",
+}
 
 
 class HttpBackend(Backend):
-    def __init__(self, baseurl):
+    CONFIG_POOL_CONNECTIONS_KEY = "pool-connections"
+    CONFIG_POOL_MAXSIZE_KEY = "pool-maxsize"
+    CONFIG_KEEP_ALIVE_KEY = "keep-alive"
+    CONFIG_BUFFER_SIZE_KEY = "buffer-size"
+
+    _LOCK = Lock()
+    _SESSIONS = {}  # type: MutableMapping[Tuple, requests.Session]
+
+    def __init__(self, baseurl, http_config=None):
         self._baseurl = baseurl
+        self._http_config = {} if http_config is None else http_config
 
     def read_contextmanager(self, name, checksum_sha256=None):
         parsed = url.path.join(self._baseurl, name)
-        return _UrlContextManager(parsed, checksum_sha256)
+        buffer_size = self._http_config.get(HttpBackend.CONFIG_BUFFER_SIZE_KEY, DEFAULT_SPOOL_SIZE)
+        return _UrlContextManager(parsed, checksum_sha256, self._session(), buffer_size)
+
+    def read_range(self, name, offset, length, checksum_sha256=None):
+        if length <= 0:
+            return b""
+        parsed = url.path.join(self._baseurl, name)
+        headers = {
+            "Range": "bytes={}-{}".format(offset, offset + length - 1),
+            # ranges apply to the encoded data, so we cannot have the data encoded.
+            "Accept-Encoding": "identity",
+        }
+        with self._session().get(parsed, headers=headers, stream=True) as resp:
+            if resp.status_code == 416:
+                # the range starts beyond the end of the file.
+                return b""
+            resp.raise_for_status()
+            if resp.status_code != 206:
+                # the server does not support ranged requests, and is sending us the entire file.
+                # discard the data before the range.
+                remaining = offset
+                while remaining > 0:
+                    discarded = resp.raw.read(min(remaining, 1024 * 1024))
+                    if len(discarded) == 0:
+                        return b""
+                    remaining -= len(discarded)
+            return resp.raw.read(length)
+
+    def url(self, name):
+        return url.path.join(self._baseurl, name)
+
+    def read_if_changed(self, name, validators=None):
+        parsed = url.path.join(self._baseurl, name)
+        buffer_size = self._http_config.get(HttpBackend.CONFIG_BUFFER_SIZE_KEY, DEFAULT_SPOOL_SIZE)
+        headers = {}
+        if validators is not None:
+            for validator, conditional_header in VALIDATOR_HEADERS.items():
+                if validator in validators:
+                    headers[conditional_header] = validators[validator]
+        with self._session().get(parsed, headers=headers, stream=True) as resp:
+            if resp.status_code == 304:
+                return validators, None
+            resp.raise_for_status()
+            new_validators = {
+                validator: resp.headers[validator]
+                for validator in VALIDATOR_HEADERS
+                if validator in resp.headers
+            }
+            resp.raw.decode_content = True
+            return (
+                new_validators if len(new_validators) > 0 else None,
+                spool_stream(resp.raw, None, buffer_size),
+            )
+
+    def write_file_handle(self, name):
+        parsed = url.path.join(self._baseurl, name)
+        buffer_size = self._http_config.get(HttpBackend.CONFIG_BUFFER_SIZE_KEY, DEFAULT_SPOOL_SIZE)
+        session = self._session()
+
+        def upload(fh):
+            resp = session.put(parsed, data=fh)
+            resp.raise_for_status()
+
+        return SpooledUpload(upload, buffer_size)
+
+    def _session(self):
+        """
+        Returns the session for this backend's configuration.  Sessions are shared across all
+        backends with the same configuration, such that the connections in the pool can be reused
+        across tiles, tilesets, and threads.
+        """
+        pool_connections = self._http_config.get(
+            HttpBackend.CONFIG_POOL_CONNECTIONS_KEY, DEFAULT_POOL_CONNECTIONS)
+        pool_maxsize = self._http_config.get(
+            HttpBackend.CONFIG_POOL_MAXSIZE_KEY, DEFAULT_POOL_MAXSIZE)
+        keep_alive = self._http_config.get(HttpBackend.CONFIG_KEEP_ALIVE_KEY, True)
+        session_key = (pool_connections, pool_maxsize, keep_alive, RETRY_STATUS_CODES)
+
+        with HttpBackend._LOCK:
+            session = HttpBackend._SESSIONS.get(session_key, None)
+            if session is None:
+                session = requests.Session()
+                retry_policy = retry.Retry(
+                    connect=10, read=10, status=10, backoff_factor=0.1,
+                    status_forcelist=RETRY_STATUS_CODES)
+                adapter = HTTPAdapter(
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    max_retries=retry_policy)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if not keep_alive:
+                    session.headers["Connection"] = "close"
+                HttpBackend._SESSIONS[session_key] = session
+            return session
 
 
 class _UrlContextManager:
-    def __init__(self, url, checksum_sha256):
+    def __init__(self, url, checksum_sha256, session, buffer_size):
         self.url = url
         self.checksum_sha256 = checksum_sha256
+        self.session = session
+        self.buffer_size = buffer_size
         self.handle = None
 
     def __enter__(self):
-        session = requests.Session()
-        retry_policy = retry.Retry(
-            connect=10, read=10, status=10, backoff_factor=0.1, status_forcelist=RETRY_STATUS_CODES)
-        adapter = HTTPAdapter(max_retries=retry_policy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        resp = session.get(self.url)
-        resp.raise_for_status()
-        self.handle = BytesIO(resp.content)
-        verify_checksum(self.handle, self.checksum_sha256)
+        with self.session.get(self.url, stream=True) as resp:
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            self.handle = spool_stream(resp.raw, self.checksum_sha256, self.buffer_size)
         return self.handle.__enter__()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -1,18 +1,31 @@
 import urllib.parse
-from io import BytesIO
 from pathlib import PurePosixPath
+from threading import Lock
+from typing import MutableMapping, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore import UNSIGNED
 from botocore.config import Config
+from botocore.exceptions import ClientError
 
-from ._base import Backend, verify_checksum
+from ._base import Backend, DEFAULT_SPOOL_SIZE, spool_stream, SpooledUpload
 
 RETRY_STATUS_CODES = frozenset({500, 502, 503, 504})
+DEFAULT_MAX_POOL_CONNECTIONS = 32
+DEFAULT_MULTIPART_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_MULTIPART_CONCURRENCY = 10
 
 
 class S3Backend(Backend):
     CONFIG_UNSIGNED_REQUESTS_KEY = "unsigned-requests"
+    CONFIG_MAX_POOL_CONNECTIONS_KEY = "max-pool-connections"
+    CONFIG_BUFFER_SIZE_KEY = "buffer-size"
+    CONFIG_MULTIPART_THRESHOLD_KEY = "multipart-threshold"
+    CONFIG_MULTIPART_CONCURRENCY_KEY = "multipart-concurrency"
+
+    _LOCK = Lock()
+    _CLIENTS = {}  # type: MutableMapping[Tuple, object]
 
     def __init__(self, baseurl, s3_config):
         parsed = urllib.parse.urlparse(baseurl)
@@ -27,32 +40,107 @@ class S3Backend(Backend):
 
     def read_contextmanager(self, name, checksum_sha256=None):
         key = str(self._basepath / name)
-        return _S3ContextManager(self._bucket, key, checksum_sha256, self._s3_config)
+        buffer_size = self._s3_config.get(S3Backend.CONFIG_BUFFER_SIZE_KEY, DEFAULT_SPOOL_SIZE)
+        return _S3ContextManager(self._bucket, key, checksum_sha256, self._client(), buffer_size)
+
+    def read_range(self, name, offset, length, checksum_sha256=None):
+        if length <= 0:
+            return b""
+        key = str(self._basepath / name)
+        try:
+            body = self._client().get_object(
+                Bucket=self._bucket,
+                Key=key,
+                Range="bytes={}-{}".format(offset, offset + length - 1),
+            )["Body"]
+        except ClientError as ex:
+            if ex.response.get("Error", {}).get("Code", None) == "InvalidRange":
+                # the range starts beyond the end of the object.
+                return b""
+            raise
+        try:
+            return body.read()
+        finally:
+            body.close()
+
+    def url(self, name):
+        return "s3://{}/{}".format(self._bucket, self._basepath / name)
+
+    def read_if_changed(self, name, validators=None):
+        key = str(self._basepath / name)
+        buffer_size = self._s3_config.get(S3Backend.CONFIG_BUFFER_SIZE_KEY, DEFAULT_SPOOL_SIZE)
+        kwargs = {}
+        if validators is not None and "ETag" in validators:
+            kwargs["IfNoneMatch"] = validators["ETag"]
+        try:
+            response = self._client().get_object(Bucket=self._bucket, Key=key, **kwargs)
+        except ClientError as ex:
+            if ex.response.get("Error", {}).get("Code", None) in ("304", "NotModified"):
+                return validators, None
+            raise
+        body = response["Body"]
+        try:
+            return {"ETag": response["ETag"]}, spool_stream(body, None, buffer_size)
+        finally:
+            body.close()
+
+    def write_file_handle(self, name):
+        key = str(self._basepath / name)
+        buffer_size = self._s3_config.get(S3Backend.CONFIG_BUFFER_SIZE_KEY, DEFAULT_SPOOL_SIZE)
+        transfer_config = TransferConfig(
+            multipart_threshold=self._s3_config.get(
+                S3Backend.CONFIG_MULTIPART_THRESHOLD_KEY, DEFAULT_MULTIPART_THRESHOLD),
+            max_concurrency=self._s3_config.get(
+                S3Backend.CONFIG_MULTIPART_CONCURRENCY_KEY, DEFAULT_MULTIPART_CONCURRENCY),
+        )
+        client = self._client()
+
+        def upload(fh):
+            # objects larger than the multipart threshold are uploaded in parts, in parallel.
+            client.upload_fileobj(fh, self._bucket, key, Config=transfer_config)
+
+        return SpooledUpload(upload, buffer_size)
+
+    def _client(self):
+        """
+        Returns the S3 client for this backend's configuration.  boto3 sessions are expensive to
+        create and are not thread-safe, but clients are, so a single client is shared across all
+        backends with the same configuration.
+        """
+        unsigned_requests = self._s3_config.get(S3Backend.CONFIG_UNSIGNED_REQUESTS_KEY, False)
+        max_pool_connections = self._s3_config.get(
+            S3Backend.CONFIG_MAX_POOL_CONNECTIONS_KEY, DEFAULT_MAX_POOL_CONNECTIONS)
+        client_key = (unsigned_requests, max_pool_connections)
+
+        with S3Backend._LOCK:
+            client = S3Backend._CLIENTS.get(client_key, None)
+            if client is None:
+                if unsigned_requests:
+                    client_config = Config(
+                        signature_version=UNSIGNED, max_pool_connections=max_pool_connections)
+                else:
+                    client_config = Config(max_pool_connections=max_pool_connections)
+
+                session = boto3.session.Session()
+                client = session.client("s3", config=client_config)
+                S3Backend._CLIENTS[client_key] = client
+            return client
 
 
 class _S3ContextManager:
-    def __init__(self, s3_bucket, s3_key, checksum_sha256, s3_config):
+    def __init__(self, s3_bucket, s3_key, checksum_sha256, s3_client, buffer_size):
         self.s3_bucket = s3_bucket
         self.s3_key = s3_key
         self.checksum_sha256 = checksum_sha256
-        self.s3_config = s3_config
+        self.s3_client = s3_client
+        self.buffer_size = buffer_size
 
     def __enter__(self):
-        unsigned_requests = self.s3_config.get(S3Backend.CONFIG_UNSIGNED_REQUESTS_KEY, False)
-
-        if unsigned_requests:
-            resource_config = Config(signature_version=UNSIGNED)
-        else:
-            resource_config = None
-
-        session = boto3.session.Session()
-        s3 = session.resource("s3", config=resource_config)
-        bucket = s3.Bucket(self.s3_bucket)
-        s3_obj = bucket.Object(self.s3_key)
-        self.buffer = BytesIO()
-        s3_obj.download_fileobj(self.buffer)
-        self.buffer.seek(0)
-        verify_checksum(self.buffer, self.checksum_sha256)
+        body = self.s3_client.get_object(Bucket=self.s3_bucket, Key=self.s3_key)["Body"]
+        try:
+            self.buffer = spool_stream(body, self.checksum_sha256, self.buffer_size)
+        finally:
+            body.close()
         return self.buffer.__enter__()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
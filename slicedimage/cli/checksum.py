@@ -1,5 +1,16 @@
-from slicedimage import Reader, Writer
-from slicedimage.url.resolve import resolve_path_or_url
+import codecs
+import hashlib
+import json
+import os
+import sys
+import threading
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+from slicedimage.io import _json, WriterContract
+from slicedimage.io._keys import CollectionKeys, TileKeys, TileSetKeys
+from slicedimage.url.path import calculate_relative_url, get_absolute_url, join
+from slicedimage.url.resolve import resolve_path_or_url, resolve_url
 from ._base import CliCommand
 
 
@@ -19,41 +30,137 @@ class ChecksumCommand(CliCommand):
             "--pretty",
             action="store_true",
             help="Pretty-print the output file")
+        checksum_command.add_argument(
+            "--max-workers",
+            type=int,
+            default=16,
+            help="Maximum number of tiles to checksum concurrently")
+        checksum_command.add_argument(
+            "--journal",
+            default=None,
+            help=("File to record checksums in as they are calculated, such that an interrupted "
+                  "run can be resumed without recalculating them (default: out_path with the "
+                  "extension .checksums)"))
 
         return checksum_command
 
     @classmethod
     def run_command(cls, args):
         _, name, baseurl = resolve_path_or_url(args.in_url)
-        slicedimage = Reader.parse_doc(name, baseurl)
+        out_path = Path(args.out_path).absolute()
+        journal_path = (
+            Path(args.journal) if args.journal is not None else out_path.with_suffix(".checksums"))
+
+        # read all the partition documents, and find the tiles that are missing checksums.
+        documents = []
+        missing = []
+        _read_partition(join(baseurl, name), out_path.as_uri(), documents, missing)
+
+        journal = _read_journal(journal_path)
+        pending = [tile_url for tile_url in missing if tile_url not in journal]
+        print(
+            "{} tiles missing checksums, {} of which were checksummed by a previous run".format(
+                len(missing), len(missing) - len(pending)),
+            file=sys.stderr)
+
+        with open(str(journal_path), "a") as journal_fh:
+            journal.update(_checksum_tiles(pending, args.max_workers, journal_fh))
+
+        indent = 4 if args.pretty else None
+        for doc_in_url, doc_out_url, json_doc in documents:
+            if TileSetKeys.TILES in json_doc:
+                for tile_doc in json_doc[TileSetKeys.TILES]:
+                    tile_url = _absolute_url(tile_doc[TileKeys.FILE], doc_in_url)
+                    if tile_doc.get(TileKeys.SHA256, None) is None:
+                        tile_doc[TileKeys.SHA256] = journal[tile_url]
+                    tile_doc[TileKeys.FILE] = calculate_relative_url(doc_out_url, tile_url)
+
+            backend, name, _ = resolve_url(doc_out_url)
+            with backend.write_file_handle(name) as fh:
+                writer = codecs.getwriter("utf-8")(fh)
+                json.dump(json_doc, writer, indent=indent, sort_keys=args.pretty,
+                          ensure_ascii=False)
+
+        os.unlink(str(journal_path))
+
+
+def _absolute_url(name_or_url, doc_url):
+    name, baseurl = get_absolute_url(name_or_url, doc_url.rsplit("/", 1)[0])
+    return join(baseurl, name)
 
-        Writer.write_to_path(
-            slicedimage,
-            args.out_path,
-            pretty=args.pretty,
-            tile_opener=fake_file_opener,
-            tile_writer=identity_writer)
 
+def _read_partition(in_url, out_url, documents, missing):
+    """
+    Reads the partition document at `in_url`, and recursively, the partitions it contains.  Appends
+    the input url, the output url, and the parsed document of each to `documents`, and the url of
+    each tile without a checksum to `missing`.  The urls of the partitions in a collection are
+    rewritten to point at their output urls.
+    """
+    backend, name, _ = resolve_url(in_url)
+    with backend.read_contextmanager(name) as fh:
+        json_doc = _json.load(fh)
+    documents.append((in_url, out_url, json_doc))
 
-def fake_file_opener(partition_path, tile, ext):
-    class null_file_handle:
-        def __init__(self, name):
-            self.name = name
+    if CollectionKeys.CONTENTS in json_doc:
+        writer_contract = WriterContract()
+        contents = json_doc[CollectionKeys.CONTENTS]
+        for partition_name, relative_path_or_url in contents.items():
+            partition_out_url = writer_contract.partition_url_generator(out_url, partition_name)
+            _read_partition(
+                _absolute_url(relative_path_or_url, in_url), partition_out_url, documents, missing)
+            contents[partition_name] = calculate_relative_url(out_url, partition_out_url)
+    elif TileSetKeys.TILES in json_doc:
+        for tile_doc in json_doc[TileSetKeys.TILES]:
+            # a null checksum is as good as a missing one.
+            if tile_doc.get(TileKeys.SHA256, None) is None:
+                missing.append(_absolute_url(tile_doc[TileKeys.FILE], in_url))
 
-        def write(self, data):
-            return len(data)
 
-        def __enter__(self):
-            return self
+def _read_journal(journal_path):
+    """Returns a mapping from tile url to checksum for the tiles recorded in the journal."""
+    journal = {}
+    if journal_path.exists():
+        with open(str(journal_path), "r") as fh:
+            for line in fh:
+                # the last line may be incomplete if a previous run was interrupted.
+                if not line.endswith("\n"):
+                    break
+                checksum, tile_url = line.rstrip("\n").split(" ", 1)
+                journal[tile_url] = checksum
+    return journal
 
-        def __exit__(self, exc_type, exc_val, exc_tb):
-            pass
 
-    return null_file_handle(tile._file_or_url)
+def _checksum_tiles(tile_urls, max_workers, journal_fh, block_size=1024 * 1024):
+    """
+    Calculates the checksums of the tiles concurrently, streaming the data of each tile through the
+    hash such that the memory used is bounded.  Each checksum is recorded in the journal as it is
+    calculated.  Returns a mapping from tile url to checksum.
+    """
+    backends = {}
+    backends_lock = threading.Lock()
 
+    def checksum(tile_url):
+        with backends_lock:
+            backend, name, _ = resolve_url(tile_url, backends=backends)
+        checksummer = hashlib.sha256()
+        with backend.read_contextmanager(name) as fh:
+            while True:
+                data = fh.read(block_size)
+                if len(data) == 0:
+                    break
+                checksummer.update(data)
+        return tile_url, checksummer.hexdigest()
 
-def identity_writer(tile, fh):
-    assert tile._source_fh_contextmanager is not None
-    with tile._source_fh_contextmanager as sfh:
-        fh.write(sfh.read())
-    return tile.tile_format
+    results = {}
+    tp = ThreadPool(max_workers)
+    try:
+        for tile_url, sha256 in tp.imap_unordered(checksum, tile_urls):
+            results[tile_url] = sha256
+            journal_fh.write("{} {}\n".format(sha256, tile_url))
+            journal_fh.flush()
+            if len(results) % 100 == 0 or len(results) == len(tile_urls):
+                print("checksummed {}/{} tiles".format(len(results), len(tile_urls)),
+                      file=sys.stderr)
+    finally:
+        tp.terminate()
+    return results
@@ -1,6 +1,6 @@
 import argparse
 
-from . import checksum  # noqa
+from . import checksum, prefetch  # noqa
 from ._base import CliCommand
 
 
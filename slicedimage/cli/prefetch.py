@@ -0,0 +1,79 @@
+import sys
+from collections import OrderedDict
+
+from slicedimage import Reader
+from slicedimage.backends import CachingBackend, SIZE_LIMIT
+from slicedimage.io._base import SourceFileFuture
+from slicedimage.url.resolve import resolve_path_or_url
+from ._base import CliCommand
+
+
+class PrefetchCommand(CliCommand):
+    @classmethod
+    def register_parser(cls, subparser_root):
+        prefetch_command = subparser_root.add_parser(
+            "prefetch",
+            help="Read a partition file and fetch all of its tiles into a local cache.")
+        prefetch_command.add_argument(
+            "in_url",
+            help="URL for the source partition file")
+        prefetch_command.add_argument(
+            "cache_dir",
+            help="Directory of the cache to fetch the tiles into")
+        prefetch_command.add_argument(
+            "--size-limit",
+            type=int,
+            default=int(SIZE_LIMIT),
+            help="Maximum size of the cache, in bytes")
+        prefetch_command.add_argument(
+            "--max-workers",
+            type=int,
+            default=16,
+            help="Maximum number of tiles to fetch concurrently")
+        prefetch_command.add_argument(
+            "--bandwidth-limit",
+            type=float,
+            default=None,
+            help="Maximum rate to fetch tiles at, in megabytes per second")
+
+        return prefetch_command
+
+    @classmethod
+    def run_command(cls, args):
+        backend_config = {
+            "caching": {
+                "directory": args.cache_dir,
+                "size_limit": args.size_limit,
+            },
+        }
+        _, name, baseurl = resolve_path_or_url(args.in_url, backend_config)
+        partition = Reader.parse_doc(name, baseurl, backend_config)
+
+        # tiles that are read through the same backend are fetched together.
+        names_and_checksums_by_backend = OrderedDict()
+        for tile in partition.tiles():
+            future = tile._numpy_array_future
+            if (not isinstance(future, SourceFileFuture)
+                    or not isinstance(future.backend, CachingBackend)):
+                # local files are not cached.
+                continue
+            names_and_checksums_by_backend.setdefault(future.backend, []).append(
+                (future.name, future.checksum_sha256))
+
+        bandwidth_limit = (
+            args.bandwidth_limit * 1000 * 1000 if args.bandwidth_limit is not None else None)
+        total = sum(len(items) for items in names_and_checksums_by_backend.values())
+        progress = {"completed": 0, "failed": 0}
+
+        def report(name, exception):
+            progress["completed"] += 1
+            if exception is not None:
+                progress["failed"] += 1
+                print("failed to fetch {}: {}".format(name, exception), file=sys.stderr)
+            print("fetched {}/{} tiles".format(progress["completed"], total), file=sys.stderr)
+
+        for backend, names_and_checksums in names_and_checksums_by_backend.items():
+            backend.warm(names_and_checksums, args.max_workers, bandwidth_limit, report)
+
+        if progress["failed"] > 0:
+            sys.exit(1)
@@ -1,44 +1,88 @@
 import codecs
+import inspect
 import json
 import hashlib
+import os
+import re
+import threading
 import urllib.parse
 import warnings
 from abc import abstractmethod
+from collections import deque
+from functools import lru_cache, partial
 from io import BytesIO
+from multiprocessing.pool import AsyncResult, ThreadPool
 from pathlib import Path, PurePath, PurePosixPath
 from typing import (
     BinaryIO,
     Callable,
     cast,
+    Deque,
     Mapping,
     MutableSequence,
     Optional,
+    MutableMapping,
     Sequence,
     TextIO,
+    Tuple,
     Union,
 )
 
 from packaging import version
 
-from slicedimage.url.path import get_path_from_parsed_file_url
+from slicedimage.url.path import get_path_from_parsed_file_url, join
 from slicedimage.url.resolve import resolve_url
+from slicedimage._array_cache import decoded_array_cache
+from slicedimage._compat import get_running_loop
+from slicedimage.backends._base import Backend
 from slicedimage._collection import Collection
 from slicedimage._formats import ImageFormat
 from slicedimage._tile import Tile
 from slicedimage._tileset import TileSet
+from . import _json
 from ._keys import CommonPartitionKeys
 
 
 _VERSIONS = []  # type: MutableSequence
 
+DEFAULT_PARSE_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+"""The default number of threads used to parse the partitions of a collection."""
+
 
 class Reader:
     @staticmethod
-    def parse_doc(name_or_url, baseurl, backend_config=None):
+    def parse_doc(name_or_url, baseurl, backend_config=None, lazy=False, max_workers=None):
+        """
+        Parses the partition document at `name_or_url`, resolved relative to `baseurl`.
+
+        If `lazy` is True, the partitions of a collection are not parsed until they are first
+        accessed.  Otherwise, all the partitions are parsed before this returns.  The partitions of
+        a collection, and of any collections nested in it, are parsed on a single pool of at most
+        `max_workers` threads, whether they are parsed before this returns, or when they are
+        accessed.  If `max_workers` is None, it is taken from
+        backend_config["parsing"]["max_workers"], and defaults to DEFAULT_PARSE_WORKERS.
+        """
+        if max_workers is None:
+            parsing_config = (backend_config or {}).get("parsing", {})
+            max_workers = parsing_config.get("max_workers", DEFAULT_PARSE_WORKERS)
+        executor = _ParseExecutor(max_workers)
+        if lazy:
+            return Reader._parse_doc(
+                name_or_url, baseurl, backend_config, lazy=True, executor=executor)
+
+        try:
+            result = Reader._parse_doc(name_or_url, baseurl, backend_config, executor=executor)
+            executor.wait()
+        finally:
+            executor.terminate()
+        _resolve_partitions(result)
+        return result
+
+    @staticmethod
+    def _parse_doc(name_or_url, baseurl, backend_config, lazy=False, executor=None):
         backend, name, baseurl = resolve_url(name_or_url, baseurl, backend_config)
         with backend.read_contextmanager(name) as fh:
-            reader = codecs.getreader("utf-8")
-            json_doc = json.load(reader(fh))
+            json_doc = _json.load(fh)
 
         try:
             doc_version = version.parse(json_doc[CommonPartitionKeys.VERSION])
@@ -58,7 +102,7 @@ class Reader:
             raise KeyError(
                 "JSON document missing `version` field. Please specify the file format version.")
 
-        return parser.parse(json_doc, baseurl, backend_config)
+        return parser.parse(json_doc, baseurl, backend_config, lazy=lazy, executor=executor)
 
     @classmethod
     @abstractmethod
@@ -66,7 +110,7 @@ class Reader:
         raise NotImplementedError()
 
     @abstractmethod
-    def parse(self, json_doc, baseurl, backend_config):
+    def parse(self, json_doc, baseurl, backend_config, lazy=False, executor=None):
         raise NotImplementedError()
 
 
@@ -143,11 +187,22 @@ class Writer:
         if version_class is None:
             version_class = VERSIONS[-1]
 
+        if kwargs.get("executor", None) is None:
+            # the tiles and partitions of a collection, and of any collections nested in it, are
+            # written on a single pool of at most `max_workers` threads.
+            executor = _WriteExecutor(kwargs.get("max_workers", 1))
+            try:
+                return Writer.write_to_url(
+                    partition, url, pretty, version_class, *args,
+                    **dict(kwargs, executor=executor))
+            finally:
+                executor.terminate()
+
         document = version_class.Writer().generate_partition_document(
             partition, url, pretty, *args, **kwargs)
         indent = 4 if pretty else None
 
-        backend, name, _ = resolve_url(url)
+        backend, name, _ = resolve_url(url, backend_config=kwargs.get("backend_config", None))
         with backend.write_file_handle(name) as fh:
             writer = cast(TextIO, codecs.getwriter("utf-8")(fh))
             json.dump(document, writer, indent=indent, sort_keys=pretty, ensure_ascii=False)
@@ -244,12 +299,11 @@ class WriterContract(object):
         buffer_fh = BytesIO()
         tile.write(buffer_fh, tile_format)
 
-        buffer_fh.seek(0)
-        sha256 = hashlib.sha256(buffer_fh.getvalue()).hexdigest()
+        with buffer_fh.getbuffer() as buffer_view:
+            sha256 = hashlib.sha256(buffer_view).hexdigest()
 
-        buffer_fh.seek(0)
-        with backend.write_file_handle(name) as fh:
-            fh.write(buffer_fh.read())
+            with backend.write_file_handle(name) as fh:
+                fh.write(buffer_view)
 
         return sha256
 
@@ -318,7 +372,193 @@ class CompatibilityWriterContract(WriterContract):
         return urllib.parse.urlunparse(tile_parsed_url)
 
 
-def _parse_collection(parse_method, baseurl, backend_config):
+class SourceFileFuture:
+    """Produces a future that reads from a file and decodes according to the
+    specified file format.  Decoded data is retained in the process-wide decoded array cache, keyed
+    by the checksum of the file, or by its url if the checksum is not known."""
+    def __init__(
+            self, backend, name, checksum_sha256, tile_format: ImageFormat,
+            url: Optional[str] = None,
+    ):
+        self.backend = backend
+        self.name = name
+        self.checksum_sha256 = checksum_sha256
+        self.tile_format = tile_format
+        self.url = url
+
+    @property
+    def source_fh_contextmanager(self):
+        return self.backend.read_contextmanager(self.name, checksum_sha256=self.checksum_sha256)
+
+    @property
+    def cache_key(self):
+        if self.checksum_sha256 is not None:
+            return self.tile_format.name, "sha256", self.checksum_sha256
+        if self.url is not None and decoded_array_cache.key_by_url:
+            return self.tile_format.name, "url", self.url
+        return None
+
+    def __call__(self, *args, **kwargs):
+        mmap_reader_func = self.tile_format.mmap_reader_func
+        if mmap_reader_func is not None:
+            with self.backend.local_file(self.name, self.checksum_sha256) as path:
+                if path is not None:
+                    # memory-mapped data is paged in by the OS, so it is not worth caching.
+                    return mmap_reader_func(path)
+
+        cache_key = self.cache_key
+        if cache_key is not None:
+            result = decoded_array_cache.get(cache_key)
+            if result is not None:
+                return result
+
+        with self.source_fh_contextmanager as fh:
+            result = self.tile_format.reader_func(fh)
+        if cache_key is not None:
+            result = decoded_array_cache.put(cache_key, result)
+        return result
+
+    def read_region(self, y_slice, x_slice):
+        """Reads a region of the tile through ranged reads, if the tile format supports it.
+        Otherwise, returns None.  Ranged reads are not verified against the checksum."""
+        region_reader_func = self.tile_format.region_reader_func
+        if region_reader_func is None:
+            return None
+        return region_reader_func(
+            partial(self.backend.read_range, self.name, checksum_sha256=self.checksum_sha256),
+            y_slice, x_slice)
+
+    def read_header(self):
+        """Returns the (shape, dtype) of the tile data, read from the header of the tile's file
+        through ranged reads, if the tile format supports it.  Otherwise, returns None."""
+        cache_key = self.cache_key
+        if cache_key is not None and cache_key in decoded_array_cache:
+            result = decoded_array_cache.get(cache_key)
+            if result is not None:
+                return result.shape, result.dtype
+
+        header_reader_func = self.tile_format.header_reader_func
+        if header_reader_func is None:
+            return None
+        return header_reader_func(
+            partial(self.backend.read_range, self.name, checksum_sha256=self.checksum_sha256))
+
+    async def call_async(self, executor=None):
+        """Reads the file through the backend's asynchronous read path, and decodes it on
+        `executor`."""
+        cache_key = self.cache_key
+        if cache_key is not None:
+            result = decoded_array_cache.get(cache_key)
+            if result is not None:
+                return result
+
+        data = await self.backend.read_async(self.name, self.checksum_sha256, executor)
+        loop = get_running_loop()
+        result = await loop.run_in_executor(executor, self.tile_format.reader_func, BytesIO(data))
+        if cache_key is not None:
+            result = decoded_array_cache.put(cache_key, result)
+        return result
+
+
+class _SourceFileFutureFactory:
+    """Produces the :py:class:`SourceFileFuture` objects of the tiles that are read through the same
+    backend, relative to the same baseurl, and in the same format, such that a tile only needs to
+    retain the name of its file and its checksum until its data is requested."""
+    def __init__(self, backend, baseurl, tile_format: ImageFormat):
+        self.backend = backend
+        self.baseurl = baseurl
+        self.tile_format = tile_format
+
+    def __call__(self, name, checksum_sha256):
+        return SourceFileFuture(
+            self.backend, name, checksum_sha256, self.tile_format,
+            url=join(self.baseurl, name))
+
+
+class _TileSourceResolver:
+    """
+    Resolves the file of each tile in a tileset document to the :py:class:`_SourceFileFutureFactory`
+    that produces the tile's future, and the name of the tile's file.
+
+    Resolving a url is expensive relative to the rest of the work of parsing a tile, so the
+    resolution is shared by the tiles whose files are plain relative paths in the same directory.
+    For such paths, the backend and the baseurl depend only on the directory, and the name of the
+    file is the last component of the path.  Other files, e.g., absolute urls, are resolved one by
+    one.
+    """
+    # characters that give a path a meaning other than a plain relative path, i.e., schemes,
+    # params, queries, fragments, and quoting.
+    NOT_PLAIN_PATH = re.compile(r"[:;?#%]")
+
+    def __init__(self, baseurl, backend_config, default_tile_format: Optional[ImageFormat]):
+        self.baseurl = baseurl
+        self.backend_config = backend_config
+        self.default_tile_format = default_tile_format
+        # tiles that share a baseurl share a backend, and thus its connection pool.
+        self._backends = {}  # type: MutableMapping[str, Backend]
+        self._sources = {}  # type: MutableMapping[tuple, _SourceFileFutureFactory]
+        # maps the directory of a plain relative path, and what determines the tile's format, to
+        # the source of the tiles.
+        self._plain_path_sources = {}  # type: MutableMapping[tuple, _SourceFileFutureFactory]
+
+    def __call__(self, relative_path_or_url, tile_format_str=None):
+        if self.NOT_PLAIN_PATH.search(relative_path_or_url) is not None:
+            return self._resolve(relative_path_or_url, tile_format_str)
+
+        # the separator distinguishes "/name" from "name".
+        directory, separator, name = relative_path_or_url.rpartition("/")
+        if tile_format_str or self.default_tile_format is not None:
+            source_key = (directory + separator, tile_format_str, None)
+        else:
+            source_key = (directory + separator, None, os.path.splitext(name)[1])
+        source = self._plain_path_sources.get(source_key, None)
+        if source is None:
+            source, name = self._resolve(relative_path_or_url, tile_format_str)
+            self._plain_path_sources[source_key] = source
+        return source, name
+
+    def _resolve(self, relative_path_or_url, tile_format_str):
+        backend, name, tile_baseurl = resolve_url(
+            relative_path_or_url, self.baseurl, self.backend_config, self._backends)
+
+        if tile_format_str:
+            tile_format = ImageFormat[tile_format_str]
+        elif self.default_tile_format is not None:
+            tile_format = self.default_tile_format
+        else:
+            extension = os.path.splitext(name)[1].lstrip(".")
+            tile_format = ImageFormat.find_by_extension(extension)
+
+        source_key = (backend, tile_baseurl, tile_format)
+        source = self._sources.get(source_key, None)
+        if source is None:
+            source = _SourceFileFutureFactory(backend, tile_baseurl, tile_format)
+            self._sources[source_key] = source
+        return source, name
+
+
+def _write_tile(writer_contract, tile_url, tile, tile_format, backend_config):
+    """
+    Writes the data of a tile through `writer_contract`, and returns the tile's checksum.  Unless
+    the contract says otherwise, the data is written through the write_file_handle of the backend
+    that the tile's url resolves to with `backend_config`, which for file urls, is the disk backend
+    if there is no config.  Contracts that override write_tile with a version written before
+    backend_config existed are not passed the config.
+    """
+    if _accepts_backend_config(type(writer_contract).write_tile):
+        return writer_contract.write_tile(
+            tile_url, tile, tile_format, backend_config=backend_config)
+    return writer_contract.write_tile(tile_url, tile, tile_format)
+
+
+@lru_cache(maxsize=None)
+def _accepts_backend_config(write_tile):
+    parameters = inspect.signature(write_tile).parameters
+    return "backend_config" in parameters or any(
+        parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values())
+
+
+def _parse_collection(parse_method, baseurl, backend_config, lazy=False, executor=None):
     """Return a method that binds a parse method, a baseurl, and a backend config to a method that
     accepts name and path of a partition belonging to a collection.  The method should then return
     the name and the parsed partition data.
@@ -326,7 +566,8 @@ def _parse_collection(parse_method, baseurl, backend_config):
     def parse(name_relative_path_or_url_tuple):
         name, relative_path_or_url = name_relative_path_or_url_tuple
 
-        partition = parse_method(relative_path_or_url, baseurl, backend_config)
+        partition = parse_method(
+            relative_path_or_url, baseurl, backend_config, lazy=lazy, executor=executor)
         partition._name_or_url = relative_path_or_url
 
         return name, partition
@@ -334,6 +575,192 @@ def _parse_collection(parse_method, baseurl, backend_config):
     return parse
 
 
+def _partition_only(parse, name_relative_path_or_url_tuple):
+    """Invokes a method returned by :py:func:`_parse_collection`, and returns just the partition."""
+    return parse(name_relative_path_or_url_tuple)[1]
+
+
+def _add_collection_partitions(collection, contents, baseurl, backend_config, lazy, executor):
+    """
+    Adds the partitions listed in the contents of a collection document to the collection.
+
+    If `lazy` is True, each partition is parsed when it is first accessed, and partitions that are
+    accessed together are parsed on `executor`.  Otherwise, the partitions are parsed on
+    `executor`, and are added to the collection as futures, which are resolved by
+    :py:meth:`Reader.parse_doc` once every document has been parsed.  If there is no executor, the
+    partitions are parsed on a new one before this returns.
+    """
+    if executor is None and not lazy:
+        executor = _ParseExecutor(DEFAULT_PARSE_WORKERS)
+        try:
+            _add_collection_partitions(
+                collection, contents, baseurl, backend_config, lazy, executor)
+            executor.wait()
+        finally:
+            executor.terminate()
+        _resolve_partitions(collection)
+        return
+
+    func = _parse_collection(Reader._parse_doc, baseurl, backend_config, lazy, executor)
+    if lazy:
+        collection._executor = executor
+    for name, relative_path_or_url in contents.items():
+        if lazy:
+            collection.add_partition_future(
+                name, partial(_partition_only, func, (name, relative_path_or_url)))
+        else:
+            async_result = executor.submit(_partition_only, func, (name, relative_path_or_url))
+            collection.add_partition_future(name, async_result.get)
+
+
+def _resolve_partitions(partition):
+    """Replaces the futures in a tree of collections with the partitions they produced."""
+    if isinstance(partition, Collection):
+        for name in list(partition._partition_entries.keys()):
+            _resolve_partitions(partition._get_partition(name))
+
+
+class _ParseExecutor:
+    """
+    A bounded pool of threads that parses all the partition documents of a tree of collections.
+    Parsing a collection submits the parsing of its partitions, but never waits for them, such that
+    nested collections cannot exhaust the pool's threads.  Instead, :py:meth:`wait` waits for all
+    the submitted work, including work submitted while waiting.
+
+    The collections of a lazily parsed tree keep the executor, and load their partitions on it
+    through :py:meth:`map`.
+    """
+    def __init__(self, max_workers):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool = None  # type: Optional[ThreadPool]
+        self._pending = deque()  # type: Deque[AsyncResult]
+        # the number of calls to map() in progress.
+        self._num_mapping = 0
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._pool is None:
+                # documents without collections never need the threads, so they are only started
+                # when there is work for them.
+                self._pool = ThreadPool(self._max_workers)
+        async_result = self._pool.apply_async(func, args)
+        self._pending.append(async_result)
+        return async_result
+
+    def wait(self):
+        """Waits for all the submitted work.  If any of it failed, the exception is raised."""
+        while len(self._pending) > 0:
+            self._pending.popleft().get()
+
+    def map(self, func, items):
+        """
+        Applies `func` to each of the items on the pool, and returns the results, in the order of
+        the items.  Unlike :py:meth:`submit`, this waits for the work, so it should not be called
+        from the pool's threads.  Lazily parsed collections may be accessed long after they are
+        parsed, so the pool's threads are stopped once no calls to this are in progress.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self._max_workers)
+            pool = self._pool
+            self._num_mapping += 1
+        try:
+            return pool.map(func, items)
+        finally:
+            with self._lock:
+                self._num_mapping -= 1
+                idle = self._num_mapping == 0 and len(self._pending) == 0
+                if idle:
+                    self._pool = None
+            if idle:
+                pool.terminate()
+
+    def terminate(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+
+
+class _WriteExecutor:
+    """
+    A bounded pool of threads that writes all the tiles and partitions of a tree of collections.
+    Writing a collection writes its partitions on the pool, and waits for them.  So that nested
+    collections cannot exhaust the pool's threads, a thread that waits for work takes part in it,
+    such that the work always progresses, even if every thread of the pool is waiting.  The calling
+    thread takes part in the work, so the pool has `max_workers` - 1 threads of its own.  If
+    `max_workers` is None, the number of CPUs is used, as it is for a ThreadPool.
+    """
+    def __init__(self, max_workers):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1, not {}".format(max_workers))
+        self._max_workers = max_workers
+        self._pool = ThreadPool(max_workers - 1) if max_workers > 1 else None
+
+    def map(self, func, items):
+        """Applies `func` to each of the items, and returns the results, in the order of the
+        items."""
+        items = list(items)
+        if self._pool is None or len(items) <= 1:
+            return [func(item) for item in items]
+        batch = _WriteBatch(func, items)
+        for _ in range(min(self._max_workers, len(items)) - 1):
+            self._pool.apply_async(batch.run)
+        batch.run()
+        return batch.results()
+
+    def terminate(self):
+        if self._pool is not None:
+            self._pool.terminate()
+
+
+class _WriteBatch:
+    """The items of a call to :py:meth:`_WriteExecutor.map`, which are handed out to the threads
+    that run the batch, one at a time, until there are none left."""
+    def __init__(self, func, items):
+        self._func = func
+        self._items = items
+        self._results = [None] * len(items)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._in_progress = 0
+        self._exception = None  # type: Optional[BaseException]
+        self._done = threading.Event()
+
+    def run(self):
+        while True:
+            with self._lock:
+                if self._next == len(self._items):
+                    return
+                position = self._next
+                self._next += 1
+                self._in_progress += 1
+            try:
+                self._results[position] = self._func(self._items[position])
+            except BaseException as ex:
+                with self._lock:
+                    if self._exception is None:
+                        self._exception = ex
+                    # the remaining items are not started.
+                    self._next = len(self._items)
+            finally:
+                with self._lock:
+                    self._in_progress -= 1
+                    if self._next == len(self._items) and self._in_progress == 0:
+                        self._done.set()
+
+    def results(self):
+        """Waits for the items taken by other threads.  If any of the items failed, the exception
+        is raised."""
+        self._done.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._results
+
+
 # this has to be at the end of this file to prevent recursive imports.
 from ._v0_0_0 import v0_0_0  # noqa
 from ._v0_1_0 import v0_1_0  # noqa
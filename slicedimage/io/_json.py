@@ -0,0 +1,44 @@
+"""
+Decoding of partition documents.  If orjson or ujson is installed, documents are decoded with it,
+which is several times faster than the standard library for large tileset documents.  Otherwise, the
+standard library is used.  Either way, documents are decoded directly from the bytes of the file.
+"""
+import json
+
+
+def _find_fast_decoder():
+    try:
+        import orjson
+        return "orjson", orjson.loads
+    except ImportError:
+        pass
+    try:
+        import ujson
+        return "ujson", ujson.loads
+    except ImportError:
+        pass
+    return None, None
+
+
+FAST_DECODER_NAME, _fast_loads = _find_fast_decoder()
+"""The name of the third-party decoder used to decode documents, or None if neither is
+installed."""
+
+
+def loads(data):
+    """
+    Decode a JSON document from bytes.  Documents that the fast decoder rejects, e.g., because they
+    contain NaN or Infinity, which the standard library accepts, are decoded with the standard
+    library.
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+def load(fh):
+    """Decode a JSON document from a binary file handle."""
+    return loads(fh.read())
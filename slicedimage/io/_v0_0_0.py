@@ -1,6 +1,4 @@
-import os
-from multiprocessing.pool import ThreadPool
-from typing import Optional, Union
+from typing import Mapping, Optional, Union
 
 from packaging import version
 
@@ -9,7 +7,6 @@ from slicedimage._formats import ImageFormat
 from slicedimage._tile import Tile
 from slicedimage._tileset import TileSet
 from slicedimage.url.path import calculate_relative_url
-from slicedimage.url.resolve import resolve_url
 from . import _base
 from ._keys import (
     CollectionKeys,
@@ -32,18 +29,13 @@ class v0_0_0:
                 < version.parse(v0_0_0.FIRST_UNREADABLE_VERSION)
             )
 
-        def parse(self, json_doc, baseurl, backend_config):
+        def parse(self, json_doc, baseurl, backend_config, lazy=False, executor=None):
             if CollectionKeys.CONTENTS in json_doc:
                 # this is a Collection
                 result = Collection(json_doc.get(CommonPartitionKeys.EXTRAS, None))
-                tp = ThreadPool()
-                try:
-                    func = _base._parse_collection(_base.Reader.parse_doc, baseurl, backend_config)
-                    results = tp.map(func, json_doc[CollectionKeys.CONTENTS].items())
-                finally:
-                    tp.terminate()
-                for name, partition in results:
-                    result.add_partition(name, partition)
+                _base._add_collection_partitions(
+                    result, json_doc[CollectionKeys.CONTENTS], baseurl, backend_config, lazy,
+                    executor)
             elif TileSetKeys.TILES in json_doc:
                 imageformat = json_doc.get(TileSetKeys.DEFAULT_TILE_FORMAT, None)
                 if imageformat is not None:
@@ -58,34 +50,29 @@ class v0_0_0:
                     json_doc.get(TileSetKeys.EXTRAS, None),
                 )
 
-                for tile_doc in json_doc[TileSetKeys.TILES]:
-                    relative_path_or_url = tile_doc[TileKeys.FILE]
-                    backend, name, _ = resolve_url(relative_path_or_url, baseurl, backend_config)
-
-                    tile_format_str = tile_doc.get(TileKeys.TILE_FORMAT, None)
-                    if tile_format_str:
-                        tile_format = ImageFormat[tile_format_str]
-                    else:
-                        tile_format = result.default_tile_format
-                    if tile_format is None:
-                        # Still none :(
-                        extension = os.path.splitext(name)[1].lstrip(".")
-                        tile_format = ImageFormat.find_by_extension(extension)
-                    checksum = tile_doc.get(TileKeys.SHA256, None)
-                    tile = Tile(
-                        tile_doc[TileKeys.COORDINATES],
-                        tile_doc[TileKeys.INDICES],
-                        tile_shape=Tile.format_tuple_shape_to_dict_shape(
-                            tile_doc.get(TileKeys.TILE_SHAPE, None)),
-                        sha256=checksum,
-                        extras=tile_doc.get(TileKeys.EXTRAS, None),
-                    )
-
-                    tile.set_numpy_array_future(
-                        SourceFileFuture(
-                            backend.read_contextmanager(name, checksum_sha256=checksum),
-                            tile_format))
-                    result.add_tile(tile)
+                # the tiles are added column by column, such that the work done for each tile is
+                # limited to gathering its fields.
+                tile_docs = json_doc[TileSetKeys.TILES]
+                resolve_tile_source = _base._TileSourceResolver(
+                    baseurl, backend_config, result.default_tile_format)
+                sources_and_names = [
+                    resolve_tile_source(
+                        tile_doc[TileKeys.FILE], tile_doc.get(TileKeys.TILE_FORMAT, None))
+                    for tile_doc in tile_docs
+                ]
+                result._add_tile_records(
+                    [tile_doc[TileKeys.COORDINATES] for tile_doc in tile_docs],
+                    [tile_doc[TileKeys.INDICES] for tile_doc in tile_docs],
+                    [
+                        Tile.format_tuple_shape_to_dict_shape(
+                            tile_doc.get(TileKeys.TILE_SHAPE, None))
+                        for tile_doc in tile_docs
+                    ],
+                    [tile_doc.get(TileKeys.SHA256, None) for tile_doc in tile_docs],
+                    [tile_doc.get(TileKeys.EXTRAS, None) for tile_doc in tile_docs],
+                    [source for source, _ in sources_and_names],
+                    [name for _, name in sources_and_names],
+                )
             else:
                 raise ValueError(
                     "JSON doc does not appear to be a collection partition or a tileset "
@@ -104,26 +91,37 @@ class v0_0_0:
                 pretty: bool = False,
                 writer_contract: Optional[_base.WriterContract] = None,
                 tile_format=ImageFormat.NUMPY,
+                max_workers: Optional[int] = 1,
+                backend_config: Optional[Mapping] = None,
+                executor: Optional[_base._WriteExecutor] = None,
                 *args, **kwargs
         ):
             if writer_contract is None:
                 writer_contract = _base.WriterContract()
+            if executor is None:
+                # without the executor of Writer.write_to_url, the partition is written serially.
+                executor = _base._WriteExecutor(1)
             json_doc = {
                 CommonPartitionKeys.VERSION: v0_0_0.VERSION,
                 CommonPartitionKeys.EXTRAS: partition.extras,
             }
             if isinstance(partition, Collection):
-                json_doc[CollectionKeys.CONTENTS] = dict()
-                for partition_name, partition in partition._partitions.items():
+                def write_partition(name_partition_tuple):
+                    partition_name, partition = name_partition_tuple
                     partition_url = writer_contract.partition_url_generator(url, partition_name)
                     _base.Writer.write_to_url(
                         partition, partition_url, pretty,
                         version_class=v0_0_0,
                         writer_contract=writer_contract,
                         tile_format=tile_format,
+                        max_workers=max_workers,
+                        backend_config=backend_config,
+                        executor=executor,
                     )
-                    json_doc[CollectionKeys.CONTENTS][partition_name] = calculate_relative_url(
-                        url, partition_url)
+                    return partition_name, calculate_relative_url(url, partition_url)
+
+                json_doc[CollectionKeys.CONTENTS] = dict(executor.map(
+                    write_partition, partition._partitions.items()))
                 return json_doc
             elif isinstance(partition, TileSet):
                 json_doc[TileSetKeys.DIMENSIONS] = tuple(partition.dimensions)
@@ -138,15 +136,15 @@ class v0_0_0:
                 if len(partition.extras) != 0:
                     json_doc[TileSetKeys.EXTRAS] = partition.extras
 
-                for tile in partition._tiles:
+                def generate_tile_document(tile):
                     tiledoc = {
                         TileKeys.COORDINATES: tile.coordinates,
                         TileKeys.INDICES: tile.indices,
                     }
 
                     tile_url = writer_contract.tile_url_generator(url, tile, tile_format.file_ext)
-                    tiledoc[TileKeys.SHA256] = writer_contract.write_tile(
-                        tile_url, tile, tile_format)
+                    tiledoc[TileKeys.SHA256] = _base._write_tile(
+                        writer_contract, tile_url, tile, tile_format, backend_config)
                     tiledoc[TileKeys.FILE] = calculate_relative_url(url, tile_url)
 
                     if tile.tile_shape is not None:
@@ -156,18 +154,9 @@ class v0_0_0:
                         tiledoc[TileKeys.TILE_FORMAT] = tile_format.name
                     if len(tile.extras) != 0:
                         tiledoc[TileKeys.EXTRAS] = tile.extras
-                    json_doc[TileSetKeys.TILES].append(tiledoc)
-
-                return json_doc
+                    return tiledoc
 
+                json_doc[TileSetKeys.TILES] = executor.map(
+                    generate_tile_document, partition._tiles)
 
-class SourceFileFuture:
-    """Produces a future that reads from a file and decodes according to the
-    specified file format."""
-    def __init__(self, source_fh_contextmanager, tile_format: ImageFormat):
-        self.source_fh_contextmanager = source_fh_contextmanager
-        self.tile_format = tile_format
-
-    def __call__(self, *args, **kwargs):
-        with self.source_fh_contextmanager as fh:
-            return self.tile_format.reader_func(fh)
+                return json_doc
@@ -18,6 +18,33 @@ def infer_backend(baseurl, backend_config=None):
      - ["caching"]["directory"]  (default: None which disables caching)
      - ["caching"]["debug"]      (default: False)
      - ["caching"]["size_limit"] (default: SIZE_LIMIT)
+     - ["caching"]["verify_hits"] (default: True.  If False, data served from the cache is not
+                                  checked against its checksum.)
+     - ["caching"]["mmap"]        (default: False.  If True, tiles that support it, i.e., numpy
+                                  tiles, are memory-mapped read-only from the cache directory.)
+
+    Files without a checksum, such as partition documents, are cached as well, but are revalidated
+    with the server on each read.
+
+    Disk parameter keys include:
+
+     - ["disk"]["mmap"] (default: False, which reads tiles into memory.  If True, tiles that support
+                        it, i.e., numpy tiles, are memory-mapped read-only.)
+
+    HTTP parameter keys include:
+
+     - ["http"]["pool-connections"] (default: 10)
+     - ["http"]["pool-maxsize"]      (default: 32)
+     - ["http"]["keep-alive"]        (default: True)
+     - ["http"]["buffer-size"]       (default: 64MiB.  Tile data beyond this is spilled to disk.)
+
+    S3 parameter keys include:
+
+     - ["s3"]["unsigned-requests"]     (default: False)
+     - ["s3"]["max-pool-connections"]  (default: 32)
+     - ["s3"]["buffer-size"]           (default: 64MiB.  Tile data beyond this is spilled to disk.)
+     - ["s3"]["multipart-threshold"]   (default: 64MiB.  Larger objects are uploaded in parts.)
+     - ["s3"]["multipart-concurrency"] (default: 10)
 
     """
     if backend_config is None:
@@ -27,10 +54,12 @@ def infer_backend(baseurl, backend_config=None):
 
     if parsed.scheme == "file":
         local_path = get_path_from_parsed_file_url(parsed)
-        return DiskBackend(fspath(local_path))
+        disk_config = backend_config.get("disk", {})
+        return DiskBackend(fspath(local_path), disk_config)
 
     if parsed.scheme in ("http", "https"):
-        backend = HttpBackend(baseurl)
+        http_config = backend_config.get("http", {})
+        backend = HttpBackend(baseurl, http_config)
     elif parsed.scheme == "s3":
         s3_config = backend_config.get("s3", {})
         backend = S3Backend(baseurl, s3_config)
@@ -51,7 +80,11 @@ def infer_backend(baseurl, backend_config=None):
             if debug:
                 print("> caching {} to {} (size_limit: {})".format(
                     baseurl, cache_dir, size_limit))
-            backend = CachingBackend(cache_dir, backend, size_limit)
+            backend = CachingBackend(
+                cache_dir, backend, size_limit,
+                verify_hits=cache_config.get("verify_hits", True),
+                mmap=cache_config.get("mmap", False),
+            )
 
     return backend
 
@@ -76,7 +109,7 @@ def resolve_path_or_url(path_or_url, backend_config=None):
         raise
 
 
-def resolve_url(name_or_url, baseurl=None, backend_config=None):
+def resolve_url(name_or_url, baseurl=None, backend_config=None, backends=None):
     """
     Given a string that can either be a name or a fully qualified url, return a tuple consisting of:
     a :py:class:`slicedimage.backends._base.Backend`, the basename of the object, and the baseurl of
@@ -84,6 +117,16 @@ def resolve_url(name_or_url, baseurl=None, backend_config=None):
 
     If the string is a name and not a fully qualified url, then baseurl must be set.  If the string
     is a fully qualified url, then baseurl is ignored.
+
+    If `backends` is provided, it is used as a mapping from baseurl to previously inferred backends,
+    such that objects that share a baseurl also share a backend.
     """
     name, baseurl = get_absolute_url(name_or_url, baseurl)
-    return infer_backend(baseurl, backend_config=backend_config), name, baseurl
+    if backends is None:
+        return infer_backend(baseurl, backend_config=backend_config), name, baseurl
+
+    backend = backends.get(baseurl, None)
+    if backend is None:
+        backend = infer_backend(baseurl, backend_config=backend_config)
+        backends[baseurl] = backend
+    return backend, name, baseurl
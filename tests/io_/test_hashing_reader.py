@@ -0,0 +1,74 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from slicedimage.backends import ChecksumValidationError
+from slicedimage.backends._base import HashingReader
+
+
+def _setup(length=10000):
+    data = os.urandom(length)
+    bad_checksum = "{:x}".format(int(hashlib.sha256().hexdigest(), 16) + 1)
+    return data, hashlib.sha256(data).hexdigest(), bad_checksum
+
+
+def test_sequential_read():
+    data, checksum, bad_checksum = _setup()
+
+    with HashingReader(io.BytesIO(data), checksum) as reader:
+        assert reader.read(100) + reader.read() == data
+
+    reader = HashingReader(io.BytesIO(data), bad_checksum)
+    reader.read(100)
+    # the checksum is verified as soon as the end of the data is reached.
+    with pytest.raises(ChecksumValidationError):
+        reader.read()
+
+
+def test_seek_past_unread_data():
+    """Seeking past data that has not been read, and reading backwards, should still produce the
+    correct checksum."""
+    data, checksum, bad_checksum = _setup()
+
+    for expected_checksum, should_fail in ((checksum, False), (bad_checksum, True)):
+        reader = HashingReader(io.BytesIO(data), expected_checksum)
+        reader.seek(5000)
+        assert reader.read(100) == data[5000:5100]
+        reader.seek(10)
+        assert reader.read(10) == data[10:20]
+        assert reader.tell() == 20
+        if should_fail:
+            with pytest.raises(ChecksumValidationError):
+                reader.__exit__(None, None, None)
+        else:
+            reader.__exit__(None, None, None)
+
+
+def test_partial_read_then_close():
+    """A consumer that closes the reader before reading all the data should still get the checksum
+    verified when exiting."""
+    data, checksum, bad_checksum = _setup()
+
+    reader = HashingReader(io.BytesIO(data), bad_checksum)
+    view = bytearray(16)
+    assert reader.readinto(view) == 16
+    assert bytes(view) == data[:16]
+    reader.close()
+    with pytest.raises(ChecksumValidationError):
+        reader.__exit__(None, None, None)
+
+    with HashingReader(io.BytesIO(data), checksum) as reader:
+        reader.read(16)
+        reader.close()
+
+
+def test_exit_with_exception():
+    """If the consumer raises, that exception should not be masked by a checksum failure."""
+    data, checksum, bad_checksum = _setup()
+
+    with pytest.raises(KeyError):
+        with HashingReader(io.BytesIO(data), bad_checksum) as reader:
+            reader.read(16)
+            raise KeyError()
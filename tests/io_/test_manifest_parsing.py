@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+from slicedimage import ImageFormat
+from slicedimage.io import _json
+from slicedimage.io._base import _TileSourceResolver
+
+
+def test_json_decoding():
+    assert _json.loads(b'{"tiles": [{"file": "a.npy"}]}') == {"tiles": [{"file": "a.npy"}]}
+    # documents that only the standard library decodes are decoded by it.
+    assert math.isnan(_json.loads(b'{"value": NaN}')["value"])
+    with pytest.raises(ValueError):
+        _json.loads(b'{"value": ')
+
+
+def test_tile_sources_are_shared(tmp_path):
+    resolver = _TileSourceResolver(tmp_path.as_uri(), None, None)
+
+    source, name = resolver("a.npy")
+    assert name == "a.npy"
+    assert source.tile_format == ImageFormat.NUMPY
+    assert resolver("b.npy") == (source, "b.npy")
+    assert resolver(tmp_path.joinpath("c.npy").as_uri()) == (source, "c.npy")
+
+    # tiles in other directories or of other formats have other sources.
+    sub_source, name = resolver("sub/a.npy")
+    assert name == "a.npy"
+    assert sub_source is not source
+    assert sub_source.baseurl == tmp_path.joinpath("sub").as_uri()
+    assert resolver("sub/b.npy") == (sub_source, "b.npy")
+    tiff_source, _ = resolver("a.tiff")
+    assert tiff_source.tile_format == ImageFormat.TIFF
+    assert resolver("a.npy", "TIFF")[0] is tiff_source
@@ -5,11 +5,17 @@ import sys
 import tempfile
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import requests
+from diskcache import Cache, Lock as DiskCacheLock
 from six import unichr
 
-from slicedimage.backends import ChecksumValidationError, HttpBackend
+from slicedimage import ImageFormat
+from slicedimage.backends import CachingBackend, ChecksumValidationError, HttpBackend
+from slicedimage.backends import _caching
+from slicedimage.io._base import SourceFileFuture
 from tests.utils import (
     ContextualCachingBackend,
     ContextualChildProcess,
@@ -106,6 +112,48 @@ class TestCachingBackend(unittest.TestCase):
             with self.caching_backend.read_contextmanager(filename, expected_checksum) as cm:
                 self.assertEqual(cm.read(), data)
 
+    def test_ranged_reads_served_from_cache(self):
+        """
+        Ranged reads of a file that is in the cache should be served from the cache, without
+        touching the authoritative backend.  Ranged reads should not populate the cache.
+        """
+        with self._test_checksum_setup(self.tempdir.name) as setupdata:
+            filename, data, expected_checksum = setupdata
+
+            self.assertEqual(
+                self.caching_backend.read_range(filename, 10, 20, expected_checksum),
+                data[10:30])
+            self.assertNotIn(_caching._cache_key(expected_checksum), self.caching_backend._cache)
+
+            with self.caching_backend.read_contextmanager(filename, expected_checksum) as cm:
+                cm.read()
+            self.http_backend.read_contextmanager = None
+            self.http_backend.read_range = None
+            self.assertEqual(
+                self.caching_backend.read_range(filename, 10, 20, expected_checksum),
+                data[10:30])
+            self.assertEqual(
+                self.caching_backend.read_range(filename, len(data) - 5, 20, expected_checksum),
+                data[-5:])
+
+    def test_tile_headers_and_regions_served_from_cache(self):
+        """
+        The shape and regions of a tile that is in the cache should be read from the cache, such
+        that they are available while the authoritative backend is unreachable.
+        """
+        data = np.arange(20 * 10, dtype=np.uint16).reshape(20, 10)
+        np.save(os.path.join(self.tempdir.name, "tile.npy"), data)
+        with open(os.path.join(self.tempdir.name, "tile.npy"), "rb") as fh:
+            checksum = hashlib.sha256(fh.read()).hexdigest()
+        self.caching_backend.warm([("tile.npy", checksum)])
+
+        self.http_backend.read_contextmanager = None
+        self.http_backend.read_range = None
+        future = SourceFileFuture(self.caching_backend, "tile.npy", checksum, ImageFormat.NUMPY)
+        self.assertEqual(future.read_header(), ((20, 10), np.dtype(np.uint16)))
+        self.assertTrue(
+            np.array_equal(future.read_region(slice(2, 5), slice(3, 4)), data[2:5, 3:4]))
+
     def test_reentrant(self):
         if os.name == "nt":
             self.skipTest("Cannot run reentrant test on Windows")
@@ -122,6 +170,204 @@ class TestCachingBackend(unittest.TestCase):
                 self.assertEqual(data, data0)
                 self.assertEqual(data, data1)
 
+    def test_hits_served_from_cache_file(self):
+        """
+        Cache hits should be served from the file in the cache directory.  If hits are verified, a
+        corrupted cache file should be detected.  If they are not, the file should be served as-is.
+        """
+        trusting_backend = CachingBackend(
+            self.cachedir.name, self.http_backend, verify_hits=False, mmap=True)
+        with self._test_checksum_setup(self.tempdir.name) as setupdata:
+            filename, data, expected_checksum = setupdata
+
+            # the first read populates the cache.
+            with trusting_backend.local_file(filename, expected_checksum) as path:
+                self.assertTrue(path.startswith(self.cachedir.name))
+                with open(path, "rb") as fh:
+                    self.assertEqual(fh.read(), data)
+
+                # corrupt the cached file, through its link.
+                with open(path, "r+b") as fh:
+                    fh.write(b"\0" * 16)
+                corrupted_data = b"\0" * 16 + data[16:]
+            # the link is removed, but not the cached file.
+            self.assertFalse(os.path.exists(path))
+
+            with self.assertRaises(ChecksumValidationError):
+                with self.caching_backend.read_contextmanager(filename, expected_checksum) as cm:
+                    cm.read()
+            with trusting_backend.read_contextmanager(filename, expected_checksum) as cm:
+                self.assertEqual(cm.read(), corrupted_data)
+            with trusting_backend.local_file(filename, expected_checksum) as path:
+                with open(path, "rb") as fh:
+                    self.assertEqual(fh.read(), corrupted_data)
+
+    def test_mapped_file_survives_eviction(self):
+        """Data mapped from the cache should remain readable after the cache evicts its file."""
+        mapping_backend = CachingBackend(self.cachedir.name, self.http_backend, mmap=True)
+        with self._test_checksum_setup(self.tempdir.name) as setupdata:
+            filename, data, expected_checksum = setupdata
+
+            with mapping_backend.local_file(filename, expected_checksum) as path:
+                mapping_backend._cache.clear()
+                with open(path, "rb") as fh:
+                    self.assertEqual(fh.read(), data)
+
+    def test_concurrent_misses_coalesced(self):
+        """
+        Concurrent misses on the same file should result in a single fetch from the authoritative
+        backend.
+        """
+        fetches = []
+        read_contextmanager = self.http_backend.read_contextmanager
+
+        def slow_read_contextmanager(name, checksum_sha256=None):
+            fetches.append(name)
+            time.sleep(0.5)
+            return read_contextmanager(name, checksum_sha256)
+        self.http_backend.read_contextmanager = slow_read_contextmanager
+
+        with self._test_checksum_setup(self.tempdir.name) as setupdata:
+            filename, data, expected_checksum = setupdata
+
+            def read():
+                with self.caching_backend.read_contextmanager(filename, expected_checksum) as cm:
+                    return cm.read()
+
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(lambda _: read(), range(8)))
+
+            self.assertEqual(results, [data] * 8)
+            self.assertEqual(fetches, [filename])
+
+    def test_miss_waits_for_other_process(self):
+        """
+        A miss on a file that another process, which shares the cache directory, is fetching
+        should wait for that process to populate the cache rather than fetch the file itself.
+        """
+        with self._test_checksum_setup(self.tempdir.name) as setupdata:
+            filename, data, expected_checksum = setupdata
+            cache_key = _caching._cache_key(expected_checksum)
+
+            # stand in for the other process with a separate handle to the cache directory.
+            with Cache(self.cachedir.name) as other_cache:
+                other_lock = DiskCacheLock(other_cache, _caching._fetch_lock_key(cache_key))
+                other_lock.acquire()
+
+                def read():
+                    with self.caching_backend.read_contextmanager(
+                            filename, expected_checksum) as cm:
+                        return cm.read()
+
+                # the file must not be fetched from the authoritative backend.
+                self.http_backend.read_contextmanager = None
+                with ThreadPoolExecutor(1) as executor:
+                    future = executor.submit(read)
+                    time.sleep(0.5)
+                    self.assertFalse(future.done())
+
+                    other_cache.set(cache_key, data)
+                    other_lock.release()
+                    self.assertEqual(future.result(), data)
+
+    def test_warm(self):
+        """
+        Warming the cache should fetch all the files, such that later reads do not touch the
+        authoritative backend.  Failures should be reported per file.
+        """
+        files = []
+        for _ in range(3):
+            data = os.urandom(1024)
+            with tempfile.NamedTemporaryFile(dir=self.tempdir.name, delete=False) as tfh:
+                tfh.write(data)
+            files.append((os.path.basename(tfh.name), data, hashlib.sha256(data).hexdigest()))
+
+        progress = []
+        start = time.monotonic()
+        results = self.caching_backend.warm(
+            [(filename, checksum) for filename, _, checksum in files] + [("missing", "0" * 64)],
+            max_workers=2,
+            bandwidth_limit=3 * 1024 / 0.5,
+            progress_callback=lambda name, exception: progress.append(name))
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+
+        self.assertEqual(
+            [name for name, _ in results], [filename for filename, _, _ in files] + ["missing"])
+        self.assertEqual(sorted(progress), sorted(name for name, _ in results))
+        for _, exception in results[:3]:
+            self.assertIsNone(exception)
+        self.assertIsNotNone(results[3][1])
+
+        # the data should now be served from the cache.
+        self.http_backend.read_contextmanager = None
+        for filename, data, checksum in files:
+            with self.caching_backend.read_contextmanager(filename, checksum) as cm:
+                self.assertEqual(cm.read(), data)
+
+    def test_warm_throttles_while_streaming(self):
+        """
+        The bandwidth limit should be applied to each block of a file as it is fetched, rather than
+        to each file once it has been fetched.
+        """
+        data = os.urandom(3 * 1024 * 1024 + 1)
+        with tempfile.NamedTemporaryFile(dir=self.tempdir.name, delete=False) as tfh:
+            tfh.write(data)
+
+        consumed = []
+        consume = _caching._BandwidthLimiter.consume
+
+        def recording_consume(limiter, nbytes):
+            consumed.append(nbytes)
+            consume(limiter, nbytes)
+
+        _caching._BandwidthLimiter.consume = recording_consume
+        try:
+            results = self.caching_backend.warm(
+                [(os.path.basename(tfh.name), hashlib.sha256(data).hexdigest())],
+                bandwidth_limit=1e12)
+        finally:
+            _caching._BandwidthLimiter.consume = consume
+
+        self.assertIsNone(results[0][1])
+        self.assertGreater(len(consumed), 1)
+        self.assertEqual(sum(consumed), len(data))
+
+    def test_revalidation(self):
+        """
+        Files without a checksum should be served from the cache as long as the server reports that
+        they are unchanged, and refetched once they change.
+        """
+        unchanged = []
+        read_if_changed = self.http_backend.read_if_changed
+
+        def spy(name, validators=None):
+            result = read_if_changed(name, validators)
+            unchanged.append(result[1] is None)
+            return result
+        self.http_backend.read_if_changed = spy
+
+        with self._test_checksum_setup(self.tempdir.name) as setupdata:
+            filename, data, _ = setupdata
+
+            for _ in range(2):
+                with self.caching_backend.read_contextmanager(filename) as cm:
+                    self.assertEqual(cm.read(), data)
+            self.assertEqual(unchanged, [False, True])
+
+            # change the file, and make sure its modification time moves forward.
+            path = os.path.join(self.tempdir.name, filename)
+            new_data = os.urandom(1024)
+            with open(path, "wb") as fh:
+                fh.write(new_data)
+            mtime = os.stat(path).st_mtime + 10
+            os.utime(path, (mtime, mtime))
+
+            with self.caching_backend.read_contextmanager(filename) as cm:
+                self.assertEqual(cm.read(), new_data)
+            with self.caching_backend.read_contextmanager(filename) as cm:
+                self.assertEqual(cm.read(), new_data)
+            self.assertEqual(unchanged, [False, True, False, True])
+
     @staticmethod
     @contextlib.contextmanager
     def _test_checksum_setup(tempdir):
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import slicedimage
+from slicedimage._collection import _PartitionFuture
+from slicedimage._dimensions import DimensionNames
+
+
+def _build_tileset(fov):
+    tileset = slicedimage.TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch"],
+        {'ch': 2},
+        {DimensionNames.Y: 12, DimensionNames.X: 8},
+    )
+    for ch in range(2):
+        tile = slicedimage.Tile(
+            {
+                DimensionNames.X: (0.0, 0.01),
+                DimensionNames.Y: (0.0, 0.01),
+            },
+            {
+                'ch': ch,
+            },
+        )
+        tile.numpy_array = np.full((12, 8), fov * 2 + ch, dtype=np.float32)
+        tileset.add_tile(tile)
+    return tileset
+
+
+class TestCollectionParsing(unittest.TestCase):
+    def test_lazy_collection(self):
+        collection = slicedimage.Collection()
+        for fov in range(3):
+            collection.add_partition("fov{:03}".format(fov), _build_tileset(fov))
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            partition_path = Path(tempdir) / "collection.json"
+            slicedimage.Writer.write_to_path(collection, partition_path)
+
+            loaded = slicedimage.Reader.parse_doc(
+                partition_path.name, partition_path.parent.as_uri(), lazy=True)
+            for partition in loaded._partition_entries.values():
+                self.assertIsInstance(partition, _PartitionFuture)
+
+            # remove a partition that we never access, to show that it is not read.
+            os.unlink(os.path.join(tempdir, "collection-fov000.json"))
+
+            tileset = loaded.find_tileset("fov001")
+            self.assertEqual(tileset._name_or_url, "collection-fov001.json")
+            self.assertIs(loaded.find_tileset("fov001"), tileset)
+            self.assertTrue(np.all(
+                tileset.tiles(lambda tile: tile.indices['ch'] == 1)[0].numpy_array == 3))
+            self.assertIsInstance(loaded._partition_entries["fov000"], _PartitionFuture)
+            self.assertIsInstance(loaded._partition_entries["fov002"], _PartitionFuture)
+
+            # accessing all the partitions requires the missing one to be read.
+            with self.assertRaises(FileNotFoundError):
+                loaded._partitions
+
+    def test_nested_collections_share_bounded_pool(self):
+        """
+        Nested collections should be parsed on a single pool, which should not deadlock even with a
+        single thread.
+        """
+        inner = slicedimage.Collection()
+        for fov in range(3):
+            inner.add_partition("fov{:03}".format(fov), _build_tileset(fov))
+        outer = slicedimage.Collection()
+        outer.add_partition("inner", inner)
+        outer.add_partition("fov003", _build_tileset(3))
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            partition_path = Path(tempdir) / "collection.json"
+            slicedimage.Writer.write_to_path(outer, partition_path)
+
+            for kwargs in (
+                    {"max_workers": 1},
+                    {"backend_config": {"parsing": {"max_workers": 2}}},
+            ):
+                loaded = slicedimage.Reader.parse_doc(
+                    partition_path.name, partition_path.parent.as_uri(), **kwargs)
+
+                # everything should have been parsed eagerly.
+                self.assertIsInstance(loaded._partition_entries["inner"], slicedimage.Collection)
+                self.assertEqual(
+                    sorted(name for name, _ in loaded.all_tilesets()),
+                    ["fov000", "fov001", "fov002", "fov003"])
+                for name, tileset in loaded.all_tilesets():
+                    fov = int(name[3:])
+                    self.assertTrue(np.all(
+                        tileset.tiles(lambda tile: tile.indices['ch'] == 0)[0].numpy_array
+                        == fov * 2))
+
+    def test_lazy_nested_collections_share_bounded_pool(self):
+        """
+        The partitions of lazily parsed collections, at every level, should be loaded on the pool of
+        the parse, which is bounded by the configured number of workers, and whose threads are
+        stopped once the partitions are loaded.
+        """
+        inner = slicedimage.Collection()
+        for fov in range(3):
+            inner.add_partition("fov{:03}".format(fov), _build_tileset(fov))
+        outer = slicedimage.Collection()
+        outer.add_partition("inner", inner)
+        outer.add_partition("fov003", _build_tileset(3))
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            partition_path = Path(tempdir) / "collection.json"
+            slicedimage.Writer.write_to_path(outer, partition_path)
+
+            loaded = slicedimage.Reader.parse_doc(
+                partition_path.name, partition_path.parent.as_uri(), lazy=True,
+                backend_config={"parsing": {"max_workers": 2}})
+            executor = loaded._executor
+            self.assertEqual(executor._max_workers, 2)
+
+            loaded_inner = loaded._partitions["inner"]
+            self.assertIs(loaded_inner._executor, executor)
+            self.assertEqual(
+                sorted(name for name, _ in loaded_inner._partitions.items()),
+                ["fov000", "fov001", "fov002"])
+            self.assertIsNone(executor._pool)
+            self.assertEqual(
+                sorted(name for name, _ in loaded.all_tilesets()),
+                ["fov000", "fov001", "fov002", "fov003"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,16 @@
+import asyncio
 import contextlib
 import hashlib
 import os
 import tempfile
 from pathlib import Path
 
+import numpy as np
 import pytest
 
+from slicedimage import Reader, Tile, TileSet, Writer
 from slicedimage._compat import fspath
+from slicedimage._dimensions import DimensionNames
 from slicedimage.backends import ChecksumValidationError, DiskBackend
 
 
@@ -67,3 +71,69 @@ def _test_checksum_setup(tmpdir: Path):
         tfh.write(data)
 
     yield tfh.name, data, expected_checksum
+
+
+def test_read_async(tmpdir):
+    with _test_checksum_setup(tmpdir) as setupdata:
+        filepath, data, expected_checksum = setupdata
+
+        backend = DiskBackend(os.path.dirname(filepath))
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(
+                backend.read_async(os.path.basename(filepath), expected_checksum)) == data
+
+            # make the hash incorrect
+            expected_checksum = "{:x}".format(int(hashlib.sha256().hexdigest(), 16) + 1)
+            with pytest.raises(ChecksumValidationError):
+                loop.run_until_complete(
+                    backend.read_async(os.path.basename(filepath), expected_checksum))
+        finally:
+            loop.close()
+
+
+def test_mmap_numpy_tiles(tmpdir):
+    """
+    Verifies that numpy tiles are memory-mapped when the disk backend is configured to do so, and
+    that their checksums are still verified.
+    """
+    image = TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch"],
+        {'ch': 2},
+        {DimensionNames.Y: 120, DimensionNames.X: 80},
+    )
+    for ch in range(2):
+        tile = Tile(
+            {
+                DimensionNames.X: (0.0, 0.01),
+                DimensionNames.Y: (0.0, 0.01),
+            },
+            {
+                'ch': ch,
+            },
+        )
+        tile.numpy_array = np.full((120, 80), ch, dtype=np.uint16)
+        image.add_tile(tile)
+
+    partition_path = Path(fspath(tmpdir)) / "tileset.json"
+    Writer.write_to_path(image, partition_path)
+
+    backend_config = {"disk": {DiskBackend.CONFIG_MMAP_KEY: True}}
+    loaded = Reader.parse_doc(partition_path.name, partition_path.parent.as_uri(), backend_config)
+    for tile in loaded.tiles():
+        array = tile.numpy_array
+        assert isinstance(array, np.memmap)
+        assert np.all(array == tile.indices['ch'])
+
+    # corrupt the data of one of the tiles.
+    tile = loaded.tiles()[0]
+    tile_path = os.path.join(fspath(tmpdir), tile._numpy_array_future.name)
+    data = np.load(tile_path)
+    data[0, 0] += 1
+    np.save(tile_path, data)
+    with pytest.raises(ChecksumValidationError):
+        tile.numpy_array
+
+    # without the configuration, tiles are read into memory.
+    loaded = Reader.parse_doc(partition_path.name, partition_path.parent.as_uri())
+    assert not isinstance(loaded.tiles()[1].numpy_array, np.memmap)
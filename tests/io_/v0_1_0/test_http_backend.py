@@ -1,6 +1,7 @@
 import contextlib
 import hashlib
 import os
+import sys
 import tempfile
 import threading
 import time
@@ -13,6 +14,7 @@ from slicedimage.backends import ChecksumValidationError, HttpBackend
 from slicedimage.backends import _http
 from tests.utils import (
     ContextualChildProcess,
+    PUT_SERVER_PATH,
     unused_tcp_port,
 )
 
@@ -144,3 +146,100 @@ def test_retry(monkeypatch, http_server):
         mc.setattr(_http, "RETRY_STATUS_CODES", frozenset({404}))
         with http_backend.read_contextmanager("tileset.json") as cm:
             cm.read()
+
+
+def test_session_shared(http_server):
+    """
+    Verifies that backends with the same configuration share a session, and thus a connection pool,
+    and that backends with a different configuration do not.
+    """
+    tempdir, port = http_server
+    baseurl = "http://127.0.0.1:{port}".format(port=port)
+    http_backend0 = HttpBackend(baseurl)
+    http_backend1 = HttpBackend(baseurl)
+    http_backend2 = HttpBackend(baseurl, {HttpBackend.CONFIG_POOL_MAXSIZE_KEY: 4})
+    assert http_backend0._session() is http_backend1._session()
+    assert http_backend0._session() is not http_backend2._session()
+    assert http_backend2._session().get_adapter(baseurl)._pool_maxsize == 4
+
+    with _test_checksum_setup(tempdir) as setupdata:
+        filename, data, expected_checksum = setupdata
+
+        for http_backend in (http_backend0, http_backend1, http_backend2):
+            with http_backend.read_contextmanager(filename, expected_checksum) as cm:
+                assert cm.read() == data
+
+
+def test_buffer_size(http_server):
+    """
+    Verifies that tile data larger than the configured buffer size is spilled to disk rather than
+    held in memory, and that it is still read and checksummed correctly.
+    """
+    tempdir, port = http_server
+    http_backend = HttpBackend(
+        "http://127.0.0.1:{port}".format(port=port), {HttpBackend.CONFIG_BUFFER_SIZE_KEY: 256})
+    with _test_checksum_setup(tempdir) as setupdata:
+        filename, data, expected_checksum = setupdata
+
+        with http_backend.read_contextmanager(filename, expected_checksum) as cm:
+            assert cm._rolled
+            assert cm.read() == data
+
+
+def test_read_range(http_server):
+    """
+    Verifies that ranged reads return the requested bytes.  The test server does not support ranged
+    requests, so this also verifies that we fall back correctly when the server sends us the entire
+    file.
+    """
+    tempdir, port = http_server
+    http_backend = HttpBackend("http://127.0.0.1:{port}".format(port=port))
+    with _test_checksum_setup(tempdir) as setupdata:
+        filename, data, _ = setupdata
+
+        assert http_backend.read_range(filename, 100, 50) == data[100:150]
+        assert http_backend.read_range(filename, 1000, 50) == data[1000:]
+        assert http_backend.read_range(filename, 2000, 50) == b""
+
+
+@pytest.fixture(scope="module")
+def put_server(timeout_seconds=5):
+    with tempfile.TemporaryDirectory() as tempdir:
+
+        port = unused_tcp_port()
+
+        with ContextualChildProcess(
+                [sys.executable, PUT_SERVER_PATH, str(port)],
+                cwd=tempdir,
+        ):
+            end = time.time() + timeout_seconds
+
+            while True:
+                try:
+                    requests.get("http://127.0.0.1:{port}".format(port=port))
+                    break
+                except requests.ConnectionError:
+                    if time.time() > end:
+                        raise
+
+            yield tempdir, port
+
+
+def test_write(put_server):
+    """
+    Verifies that files written through the backend are PUT to the server, and can be read back.
+    """
+    tempdir, port = put_server
+    http_backend = HttpBackend(
+        "http://127.0.0.1:{port}/subdir".format(port=port),
+        {HttpBackend.CONFIG_BUFFER_SIZE_KEY: 256})
+    data = os.urandom(1024)
+    expected_checksum = hashlib.sha256(data).hexdigest()
+
+    with http_backend.write_file_handle("blob") as fh:
+        fh.write(data)
+
+    with open(os.path.join(tempdir, "subdir", "blob"), "rb") as fh:
+        assert fh.read() == data
+    with http_backend.read_contextmanager("blob", expected_checksum) as cm:
+        assert cm.read() == data
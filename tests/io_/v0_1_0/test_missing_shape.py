@@ -71,5 +71,6 @@ class TestMissingShape(unittest.TestCase):
                         tile_shape = tiles[0].tile_shape
 
                         self.assertEqual(tile_shape, {DimensionNames.Y: 120, DimensionNames.X: 80})
-                        self.assertEqual(len(w), 1)
-                        self.assertIn("Decoding tile just to obtain shape", str(w[0].message))
+                        # the shape is read from the header of the tile's file, without
+                        # decoding the tile.
+                        self.assertEqual(len(w), 0)
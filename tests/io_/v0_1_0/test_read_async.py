@@ -0,0 +1,63 @@
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import slicedimage
+from slicedimage._dimensions import DimensionNames
+
+
+class TestReadAsync(unittest.TestCase):
+    def test_numpy_array_async(self):
+        image = slicedimage.TileSet(
+            [DimensionNames.X, DimensionNames.Y, "ch", "hyb"],
+            {'ch': 2, 'hyb': 2},
+            {DimensionNames.Y: 120, DimensionNames.X: 80},
+        )
+
+        for hyb in range(2):
+            for ch in range(2):
+                tile = slicedimage.Tile(
+                    {
+                        DimensionNames.X: (0.0, 0.01),
+                        DimensionNames.Y: (0.0, 0.01),
+                    },
+                    {
+                        'hyb': hyb,
+                        'ch': ch,
+                    },
+                )
+                tile.numpy_array = np.full((120, 80), hyb * 2 + ch, dtype=np.float32)
+                image.add_tile(tile)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            partition_path = Path(tempdir) / "tileset.json"
+            slicedimage.Writer.write_to_path(image, partition_path)
+
+            loaded = slicedimage.Reader.parse_doc(
+                partition_path.name, partition_path.parent.as_uri())
+            tiles = loaded.tiles()
+
+            async def read_all(executor):
+                return await asyncio.gather(
+                    *[tile.numpy_array_async(executor) for tile in tiles])
+
+            loop = asyncio.new_event_loop()
+            try:
+                with ThreadPoolExecutor(2) as executor:
+                    arrays = loop.run_until_complete(read_all(executor))
+            finally:
+                loop.close()
+
+            self.assertEqual(len(arrays), 4)
+            for tile, array in zip(tiles, arrays):
+                self.assertEqual(array.shape, (120, 80))
+                self.assertTrue(np.all(
+                    array == tile.indices['hyb'] * 2 + tile.indices['ch']))
+
+
+if __name__ == "__main__":
+    unittest.main()
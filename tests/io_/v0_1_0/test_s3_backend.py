@@ -1,8 +1,19 @@
+import hashlib
 import json
+import os
+
+import boto3
+import numpy as np
 import pytest
+from moto import mock_aws
 
+import slicedimage
+from slicedimage import ImageFormat
+from slicedimage._dimensions import DimensionNames
 from slicedimage.backends import ChecksumValidationError, S3Backend
 
+BUCKET = "slicedimage-test"
+
 
 @pytest.mark.parametrize(
     "expected_checksum",
@@ -38,3 +49,139 @@ def test_checksum_bad():
             data = cm.read()
             parsed = json.loads(data)
             assert parsed['version'] == "5.0.0"
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    """
+    Sets up a local S3 stand-in with an empty bucket.  Clients that are shared across S3Backends
+    are discarded, such that each test gets clients that talk to its own stand-in.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(S3Backend, "_CLIENTS", {})
+    with mock_aws():
+        s3 = boto3.resource("s3")
+        bucket = s3.create_bucket(Bucket=BUCKET)
+        yield bucket
+
+
+def test_client_shared(s3_bucket):
+    """
+    Verifies that S3Backends with the same configuration share a client, that backends with a
+    different configuration do not, and that reads through either are correct.
+    """
+    data = os.urandom(1024)
+    expected_checksum = hashlib.sha256(data).hexdigest()
+    s3_bucket.put_object(Key="prefix/tile.npy", Body=data)
+
+    s3backend0 = S3Backend("s3://{}/prefix".format(BUCKET), {})
+    s3backend1 = S3Backend("s3://{}/prefix".format(BUCKET), {})
+    s3backend2 = S3Backend(
+        "s3://{}/prefix".format(BUCKET), {S3Backend.CONFIG_MAX_POOL_CONNECTIONS_KEY: 4})
+    assert s3backend0._client() is s3backend1._client()
+    assert s3backend0._client() is not s3backend2._client()
+    assert s3backend2._client().meta.config.max_pool_connections == 4
+
+    for s3backend in (s3backend0, s3backend1, s3backend2):
+        with s3backend.read_contextmanager("tile.npy", expected_checksum) as cm:
+            assert cm.read() == data
+
+
+def test_streaming_read(s3_bucket):
+    """
+    Verifies that tile data larger than the configured buffer size is spilled to disk rather than
+    held in memory, and that the checksum is still verified.
+    """
+    data = os.urandom(4096)
+    expected_checksum = hashlib.sha256(data).hexdigest()
+    s3_bucket.put_object(Key="prefix/tile.npy", Body=data)
+
+    s3backend = S3Backend(
+        "s3://{}/prefix".format(BUCKET), {S3Backend.CONFIG_BUFFER_SIZE_KEY: 256})
+    with s3backend.read_contextmanager("tile.npy", expected_checksum) as cm:
+        assert cm._rolled
+        assert cm.read() == data
+
+    bad_checksum = "{:x}".format(int(hashlib.sha256().hexdigest(), 16) + 1)
+    with pytest.raises(ChecksumValidationError):
+        with s3backend.read_contextmanager("tile.npy", bad_checksum) as cm:
+            cm.read()
+
+
+def test_read_range(s3_bucket):
+    data = os.urandom(1024)
+    s3_bucket.put_object(Key="prefix/tile.npy", Body=data)
+
+    s3backend = S3Backend("s3://{}/prefix".format(BUCKET), {})
+    assert s3backend.read_range("tile.npy", 100, 50) == data[100:150]
+    assert s3backend.read_range("tile.npy", 1000, 50) == data[1000:]
+    assert s3backend.read_range("tile.npy", 2000, 50) == b""
+
+
+def test_write(s3_bucket):
+    """
+    Verifies that a tileset can be written directly to S3 and read back.
+    """
+    image = slicedimage.TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch"],
+        {"ch": 2},
+        {DimensionNames.Y: 30, DimensionNames.X: 20},
+    )
+    for ch in range(2):
+        tile = slicedimage.Tile(
+            {
+                DimensionNames.X: (0.0, 0.01),
+                DimensionNames.Y: (0.0, 0.01),
+            },
+            {"ch": ch},
+        )
+        tile.numpy_array = np.full((30, 20), ch, dtype=np.float32)
+        image.add_tile(tile)
+
+    url = "s3://{}/prefix/tileset.json".format(BUCKET)
+    slicedimage.Writer.write_to_url(
+        image, url, tile_format=ImageFormat.NUMPY, backend_config={})
+
+    result = slicedimage.Reader.parse_doc("tileset.json", "s3://{}/prefix".format(BUCKET))
+    for tile in result.tiles():
+        assert np.array_equal(tile.numpy_array, np.full((30, 20), tile.indices["ch"]))
+
+
+def test_multipart_write(s3_bucket):
+    """
+    Verifies that objects larger than the configured multipart threshold are uploaded correctly.
+    """
+    data = os.urandom(11 * 1024 * 1024)
+    s3backend = S3Backend(
+        "s3://{}/prefix".format(BUCKET),
+        {
+            S3Backend.CONFIG_BUFFER_SIZE_KEY: 1024 * 1024,
+            S3Backend.CONFIG_MULTIPART_THRESHOLD_KEY: 5 * 1024 * 1024,
+            S3Backend.CONFIG_MULTIPART_CONCURRENCY_KEY: 4,
+        },
+    )
+    with s3backend.write_file_handle("blob") as fh:
+        fh.write(data)
+
+    assert s3_bucket.Object("prefix/blob").get()["Body"].read() == data
+
+
+def test_read_if_changed(s3_bucket):
+    data = os.urandom(1024)
+    s3_bucket.put_object(Key="prefix/tileset.json", Body=data)
+
+    s3backend = S3Backend("s3://{}/prefix".format(BUCKET), {})
+    validators, fh = s3backend.read_if_changed("tileset.json")
+    with fh:
+        assert fh.read() == data
+
+    assert s3backend.read_if_changed("tileset.json", validators) == (validators, None)
+
+    new_data = os.urandom(1024)
+    s3_bucket.put_object(Key="prefix/tileset.json", Body=new_data)
+    new_validators, fh = s3backend.read_if_changed("tileset.json", validators)
+    with fh:
+        assert fh.read() == new_data
+    assert new_validators != validators
@@ -4,6 +4,7 @@ import json
 import os
 import sys
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 
@@ -388,6 +389,156 @@ class TestWrite(unittest.TestCase):
                     self.assertEqual(tiles[0].numpy_array.all(), expected.all())
                     self.assertIsNotNone(tiles[0].sha256)
 
+    def test_parallel_write(self):
+        """Writing with multiple workers should produce the same documents, in the same order, as
+        writing serially."""
+        collection = slicedimage.Collection()
+        for fov in range(3):
+            image = slicedimage.TileSet(
+                [DimensionNames.X, DimensionNames.Y, "ch", "hyb"],
+                {'ch': 2, 'hyb': 4},
+                {DimensionNames.Y: 12, DimensionNames.X: 8},
+            )
+            for hyb in range(4):
+                for ch in range(2):
+                    tile = slicedimage.Tile(
+                        {
+                            DimensionNames.X: (0.0, 0.01),
+                            DimensionNames.Y: (0.0, 0.01),
+                        },
+                        {
+                            'hyb': hyb,
+                            'ch': ch,
+                        },
+                    )
+                    tile.numpy_array = np.full((12, 8), fov * 100 + hyb * 10 + ch)
+                    image.add_tile(tile)
+            collection.add_partition("fov{:03}".format(fov), image)
+
+        documents = []
+        for max_workers in (1, 4):
+            with tempfile.TemporaryDirectory() as tempdir:
+                collection_path = Path(tempdir) / "collection.json"
+                slicedimage.Writer.write_to_path(
+                    collection, collection_path, pretty=True, max_workers=max_workers)
+
+                partition_documents = {}
+                for partition_path in sorted(Path(tempdir).glob("*.json")):
+                    with open(fspath(partition_path), "r") as fh:
+                        partition_documents[partition_path.name] = json.load(fh)
+                documents.append(partition_documents)
+
+                loaded = slicedimage.Reader.parse_doc(
+                    collection_path.name, collection_path.parent.as_uri())
+                for fov in range(3):
+                    tileset = loaded.find_tileset("fov{:03}".format(fov))
+                    for tile in tileset.tiles():
+                        self.assertTrue(np.all(
+                            tile.numpy_array
+                            == fov * 100 + tile.indices['hyb'] * 10 + tile.indices['ch']))
+
+        self.assertEqual(len(documents[0]), 4)
+        self.assertEqual(documents[0], documents[1])
+
+    def test_parallel_write_nested_collections(self):
+        """
+        Nested collections should be written on a single pool, such that no more than `max_workers`
+        threads write tiles, and such that writing does not deadlock when every thread is waiting
+        for the partitions of a collection to be written.
+        """
+        def build_collection(depth):
+            collection = slicedimage.Collection()
+            for ix in range(3):
+                if depth > 0:
+                    partition = build_collection(depth - 1)
+                else:
+                    partition = slicedimage.TileSet(
+                        [DimensionNames.X, DimensionNames.Y, "ch"],
+                        {'ch': 2},
+                        {DimensionNames.Y: 12, DimensionNames.X: 8},
+                    )
+                    for ch in range(2):
+                        tile = slicedimage.Tile(
+                            {DimensionNames.X: (0.0, 0.01), DimensionNames.Y: (0.0, 0.01)},
+                            {'ch': ch},
+                        )
+                        tile.numpy_array = np.full((12, 8), ch, dtype=np.float32)
+                        partition.add_tile(tile)
+                collection.add_partition("p{}".format(ix), partition)
+            return collection
+
+        threads = set()
+
+        class RecordingWriterContract(slicedimage.WriterContract):
+            def write_tile(self, *args, **kwargs):
+                threads.add(threading.get_ident())
+                return super().write_tile(*args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            collection_path = Path(tempdir) / "collection.json"
+            slicedimage.Writer.write_to_path(
+                build_collection(2), collection_path, max_workers=2,
+                writer_contract=RecordingWriterContract())
+
+            loaded = slicedimage.Reader.parse_doc(
+                collection_path.name, collection_path.parent.as_uri())
+            self.assertEqual(len(list(loaded.all_tilesets())), 27)
+        self.assertLessEqual(len(threads), 2)
+
+    def test_write_max_workers_none(self):
+        """A max_workers of None should write on as many threads as there are CPUs."""
+        image = slicedimage.TileSet(
+            [DimensionNames.X, DimensionNames.Y, "ch"],
+            {'ch': 4},
+            {DimensionNames.Y: 12, DimensionNames.X: 8},
+        )
+        for ch in range(4):
+            tile = slicedimage.Tile(
+                {DimensionNames.X: (0.0, 0.01), DimensionNames.Y: (0.0, 0.01)}, {'ch': ch})
+            tile.numpy_array = np.full((12, 8), ch, dtype=np.float32)
+            image.add_tile(tile)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            tileset_path = Path(tempdir) / "tileset.json"
+            slicedimage.Writer.write_to_path(image, tileset_path, max_workers=None)
+            loaded = slicedimage.Reader.parse_doc(tileset_path.name, tileset_path.parent.as_uri())
+            for tile in loaded.tiles():
+                self.assertTrue(np.all(tile.numpy_array == tile.indices['ch']))
+
+            with self.assertRaises(ValueError):
+                slicedimage.Writer.write_to_path(image, tileset_path, max_workers=0)
+
+    def test_legacy_write_tile(self):
+        """WriterContracts that override write_tile without backend_config should still work."""
+        image = slicedimage.TileSet(
+            [DimensionNames.X, DimensionNames.Y, "ch"],
+            {'ch': 2},
+            {DimensionNames.Y: 12, DimensionNames.X: 8},
+        )
+        for ch in range(2):
+            tile = slicedimage.Tile(
+                {DimensionNames.X: (0.0, 0.01), DimensionNames.Y: (0.0, 0.01)}, {'ch': ch})
+            tile.numpy_array = np.full((12, 8), ch, dtype=np.float32)
+            image.add_tile(tile)
+
+        written = []
+
+        class LegacyWriterContract(slicedimage.WriterContract):
+            def write_tile(self, tile_url, tile, tile_format):
+                written.append(tile_url)
+                return super().write_tile(tile_url, tile, tile_format)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            tileset_path = Path(tempdir) / "tileset.json"
+            slicedimage.Writer.write_to_path(
+                image, tileset_path, writer_contract=LegacyWriterContract(),
+                backend_config={"caching": {"directory": tempdir}})
+            self.assertEqual(len(written), 2)
+
+            loaded = slicedimage.Reader.parse_doc(tileset_path.name, tileset_path.parent.as_uri())
+            for tile in loaded.tiles():
+                self.assertTrue(np.all(tile.numpy_array == tile.indices['ch']))
+
 
 if __name__ == "__main__":
     unittest.main()
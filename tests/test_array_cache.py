@@ -0,0 +1,137 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+import slicedimage
+from slicedimage import DecodedArrayCache, decoded_array_cache, ImageFormat, Tile
+from slicedimage._array_cache import DEFAULT_SIZE_LIMIT
+from slicedimage._compat import fspath
+from slicedimage._dimensions import DimensionNames
+from slicedimage.backends import DiskBackend
+from slicedimage.io._base import SourceFileFuture
+
+
+class CountingDiskBackend(DiskBackend):
+    """A DiskBackend that records the number of times a file is opened."""
+    def __init__(self, basedir):
+        super().__init__(basedir)
+        self.reads = 0
+
+    def read_contextmanager(self, name, checksum_sha256=None):
+        self.reads += 1
+        return super().read_contextmanager(name, checksum_sha256)
+
+
+@pytest.fixture
+def empty_cache():
+    """Enables the cache, and restores it to its default state afterwards."""
+    decoded_array_cache.clear()
+    decoded_array_cache.size_limit = 1024 * 1024
+    yield decoded_array_cache
+    decoded_array_cache.size_limit = DEFAULT_SIZE_LIMIT
+    decoded_array_cache.key_by_url = False
+    decoded_array_cache.clear()
+
+
+def test_lru_eviction():
+    cache = DecodedArrayCache(size_limit=3 * 80)
+    arrays = [np.full(10, ix, dtype=np.float64) for ix in range(4)]
+    for ix in range(3):
+        cache.put(ix, arrays[ix])
+
+    # touch 0, so 1 becomes the least recently used entry.
+    assert cache.get(0) is arrays[0]
+    cache.put(3, arrays[3])
+
+    assert 1 not in cache
+    assert cache.get(1) is None
+    assert len(cache) == 3
+    assert cache.size == 3 * 80
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+    cache.size_limit = 80
+    assert len(cache) == 1
+    assert 3 in cache
+
+
+def test_oversized_arrays_not_cached():
+    cache = DecodedArrayCache(size_limit=79)
+    array = np.zeros(10, dtype=np.float64)
+    assert cache.put(0, array) is array
+    assert array.flags.writeable
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_cached_arrays_are_read_only():
+    cache = DecodedArrayCache(size_limit=1024)
+    array = cache.put(0, np.zeros(10))
+    with pytest.raises(ValueError):
+        array[0] = 1
+
+
+@pytest.mark.parametrize("with_checksum", [True, False])
+def test_tile_reads_use_cache(tmp_path, empty_cache, with_checksum):
+    empty_cache.key_by_url = True
+    data = np.random.random((40, 35))
+    np.save(fspath(tmp_path / "tile.npy"), data)
+    with open(fspath(tmp_path / "tile.npy"), "rb") as fh:
+        checksum = hashlib.sha256(fh.read()).hexdigest() if with_checksum else None
+    backend = CountingDiskBackend(fspath(tmp_path))
+
+    tiles = []
+    for _ in range(2):
+        tile = Tile(
+            {DimensionNames.X: (0.0, 1.0), DimensionNames.Y: (0.0, 1.0)},
+            {"ch": 0},
+            sha256=checksum,
+        )
+        tile.set_numpy_array_future(SourceFileFuture(
+            backend, "tile.npy", checksum, ImageFormat.NUMPY,
+            url=(tmp_path / "tile.npy").as_uri()))
+        tiles.append(tile)
+
+    # the first access decodes the file, and the rest, even through a different tile, are served
+    # from the cache.
+    assert np.array_equal(tiles[0].numpy_array, data)
+    assert np.array_equal(tiles[0].numpy_array, data)
+    assert np.array_equal(tiles[1].numpy_array, data)
+    assert backend.reads == 1
+    assert (empty_cache.hits, empty_cache.misses) == (2, 1)
+
+
+def test_tiles_without_checksums_not_cached_by_default(tmp_path, empty_cache):
+    """Tiles without a checksum should be read again, unless they may be cached by url, as the file
+    may have been rewritten in place."""
+    np.save(fspath(tmp_path / "tile.npy"), np.zeros((4, 3)))
+    backend = CountingDiskBackend(fspath(tmp_path))
+    future = SourceFileFuture(
+        backend, "tile.npy", None, ImageFormat.NUMPY, url=(tmp_path / "tile.npy").as_uri())
+    future()
+    np.save(fspath(tmp_path / "tile.npy"), np.ones((4, 3)))
+
+    assert np.all(future() == 1)
+    assert backend.reads == 2
+    assert len(empty_cache) == 0
+
+
+def test_cache_disabled_by_default(tmp_path):
+    """By default, tiles with the same data should decode to arrays of their own, which the caller
+    may modify."""
+    tileset = slicedimage.TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch"],
+        {"ch": 2},
+        {DimensionNames.Y: 4, DimensionNames.X: 3},
+    )
+    for ch in range(2):
+        tile = Tile({DimensionNames.X: (0.0, 1.0), DimensionNames.Y: (0.0, 1.0)}, {"ch": ch})
+        tile.numpy_array = np.zeros((4, 3), dtype=np.float32)
+        tileset.add_tile(tile)
+    slicedimage.Writer.write_to_path(tileset, tmp_path / "tileset.json")
+
+    tiles = slicedimage.Reader.parse_doc("tileset.json", tmp_path.as_uri()).tiles()
+    arrays = [tile.numpy_array for tile in tiles]
+    assert arrays[0] is not arrays[1]
+    arrays[0][0, 0] = 5
+    assert len(decoded_array_cache) == 0
@@ -0,0 +1,70 @@
+import argparse
+import hashlib
+import json
+
+import numpy as np
+
+import slicedimage
+from slicedimage._compat import fspath
+from slicedimage._dimensions import DimensionNames
+from slicedimage.cli.checksum import ChecksumCommand
+
+
+def _write_tileset(path, num_ch):
+    tileset = slicedimage.TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch"],
+        {"ch": num_ch},
+        {DimensionNames.Y: 20, DimensionNames.X: 10},
+    )
+    for ch in range(num_ch):
+        tile = slicedimage.Tile(
+            {DimensionNames.X: (0.0, 1.0), DimensionNames.Y: (0.0, 1.0)},
+            {"ch": ch},
+        )
+        tile.numpy_array = np.full((20, 10), ch, dtype=np.float32)
+        tileset.add_tile(tile)
+    slicedimage.Writer.write_to_path(tileset, path)
+
+
+def test_checksum_command(tmp_path):
+    in_dir = tmp_path / "in"
+    out_dir = tmp_path / "out"
+    in_dir.mkdir()
+    out_dir.mkdir()
+    _write_tileset(in_dir / "tileset.json", 4)
+
+    with open(fspath(in_dir / "tileset.json")) as fh:
+        doc = json.load(fh)
+    expected = {}
+    for tile_doc in doc["tiles"]:
+        expected[tile_doc["file"]] = tile_doc.pop("sha256")
+    # tile 0 keeps its checksum, tile 1 was checksummed by an interrupted run, tile 2 has a null
+    # checksum, and the rest are missing their checksums.
+    doc["tiles"][0]["sha256"] = expected[doc["tiles"][0]["file"]]
+    doc["tiles"][2]["sha256"] = None
+    with open(fspath(in_dir / "tileset.json"), "w") as fh:
+        json.dump(doc, fh)
+    with open(fspath(out_dir / "tileset.checksums"), "w") as fh:
+        fh.write("{} {}\n".format(
+            "0" * 64, (in_dir / doc["tiles"][1]["file"]).as_uri()))
+        # an incomplete line should be ignored.
+        fh.write("0000")
+
+    ChecksumCommand.run_command(argparse.Namespace(
+        in_url=fspath(in_dir / "tileset.json"),
+        out_path=fspath(out_dir / "tileset.json"),
+        pretty=False,
+        max_workers=2,
+        journal=None,
+    ))
+
+    assert not (out_dir / "tileset.checksums").exists()
+    result = slicedimage.Reader.parse_doc("tileset.json", out_dir.as_uri())
+    for tile in result.tiles():
+        if tile.indices["ch"] == 1:
+            # this is taken from the journal.
+            assert tile.sha256 == "0" * 64
+            continue
+        with open(fspath(in_dir / "tileset-ch{}.npy".format(tile.indices["ch"])), "rb") as fh:
+            assert tile.sha256 == hashlib.sha256(fh.read()).hexdigest()
+        assert np.all(tile.numpy_array == tile.indices["ch"])
@@ -0,0 +1,174 @@
+import warnings
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import slicedimage
+from slicedimage import ImageFormat, Tile
+from slicedimage._compat import fspath
+from slicedimage._dimensions import DimensionNames
+from slicedimage.backends import ChecksumValidationError, DiskBackend
+from slicedimage.io._base import SourceFileFuture
+
+REGIONS = [
+    (slice(None), slice(None)),
+    (slice(10, 20), slice(5, 30)),
+    (slice(37, 40), slice(None, 3)),
+    (slice(None, None, -3), slice(2, 33, 4)),
+    (slice(15, 15), slice(None)),
+]
+
+
+class CountingDiskBackend(DiskBackend):
+    """A DiskBackend that records the number of bytes read through ranged reads."""
+    def __init__(self, basedir):
+        super().__init__(basedir)
+        self.bytes_read = 0
+
+    def read_range(self, name, offset, length, checksum_sha256=None):
+        data = super().read_range(name, offset, length, checksum_sha256)
+        self.bytes_read += len(data)
+        return data
+
+
+def _build_tile(tmp_path, filename, tile_format):
+    backend = CountingDiskBackend(fspath(tmp_path))
+    tile = Tile(
+        {DimensionNames.X: (0.0, 1.0), DimensionNames.Y: (0.0, 1.0)},
+        {"ch": 0},
+    )
+    tile.set_numpy_array_future(SourceFileFuture(backend, filename, None, tile_format))
+    return tile, backend
+
+
+@pytest.mark.parametrize("y_slice, x_slice", REGIONS)
+def test_npy_region(tmp_path, y_slice, x_slice):
+    data = np.random.randint(0, 65535, size=(40, 35), dtype=np.uint16)
+    np.save(fspath(tmp_path / "tile.npy"), data)
+    tile, backend = _build_tile(tmp_path, "tile.npy", ImageFormat.NUMPY)
+
+    region = tile.read_region(y_slice, x_slice)
+    assert np.array_equal(region, data[y_slice, x_slice])
+    assert 0 < backend.bytes_read
+
+
+def test_npy_region_reads_part_of_file(tmp_path):
+    data = np.random.random((400, 300))
+    np.save(fspath(tmp_path / "tile.npy"), data)
+    tile, backend = _build_tile(tmp_path, "tile.npy", ImageFormat.NUMPY)
+
+    region = tile.read_region(slice(100, 110), slice(20, 40))
+    assert np.array_equal(region, data[100:110, 20:40])
+    assert backend.bytes_read < data.nbytes / 10
+
+
+def test_npy_region_unsupported_layout(tmp_path):
+    """Fortran-ordered arrays fall back to decoding the entire tile."""
+    data = np.asfortranarray(np.random.random((40, 35)))
+    np.save(fspath(tmp_path / "tile.npy"), data)
+    tile, backend = _build_tile(tmp_path, "tile.npy", ImageFormat.NUMPY)
+
+    assert np.array_equal(tile.read_region(slice(3, 9), slice(1, 4)), data[3:9, 1:4])
+
+
+@pytest.mark.parametrize("y_slice, x_slice", REGIONS)
+def test_tiff_strip_region(tmp_path, y_slice, x_slice):
+    data = np.random.randint(0, 65535, size=(40, 35), dtype=np.uint16)
+    ImageFormat.TIFF.writer_func(Path(fspath(tmp_path / "tile.tiff")), data)
+    tile, backend = _build_tile(tmp_path, "tile.tiff", ImageFormat.TIFF)
+
+    region = tile.read_region(y_slice, x_slice)
+    assert np.array_equal(region, data[y_slice, x_slice])
+    assert 0 < backend.bytes_read
+
+
+@pytest.mark.parametrize("byteorder", ["<", ">"])
+@pytest.mark.parametrize("y_slice, x_slice", REGIONS)
+def test_tiff_tiled_region(tmp_path, byteorder, y_slice, x_slice):
+    tifffile = pytest.importorskip("tifffile")
+    data = np.random.random((40, 35)).astype(np.float32)
+    tifffile.imwrite(
+        fspath(tmp_path / "tile.tiff"), data, tile=(16, 16), byteorder=byteorder)
+    tile, backend = _build_tile(tmp_path, "tile.tiff", ImageFormat.TIFF)
+
+    read_range = partial(backend.read_range, "tile.tiff")
+    assert ImageFormat.TIFF.region_reader_func(read_range, y_slice, x_slice) is not None
+    region = tile.read_region(y_slice, x_slice)
+    assert np.array_equal(region, data[y_slice, x_slice])
+
+
+def test_tiff_compressed_region(tmp_path):
+    """Compressed TIFF files fall back to decoding the entire tile."""
+    tifffile = pytest.importorskip("tifffile")
+    data = np.random.randint(0, 255, size=(40, 35), dtype=np.uint8)
+    tifffile.imwrite(fspath(tmp_path / "tile.tiff"), data, compression="zlib")
+    tile, backend = _build_tile(tmp_path, "tile.tiff", ImageFormat.TIFF)
+
+    read_range = partial(backend.read_range, "tile.tiff")
+    assert ImageFormat.TIFF.region_reader_func(read_range, slice(3, 9), slice(1, 4)) is None
+    assert np.array_equal(tile.read_region(slice(3, 9), slice(1, 4)), data[3:9, 1:4])
+
+
+@pytest.mark.parametrize("tile_format, shape, dtype", [
+    (ImageFormat.NUMPY, (400, 300), np.float64),
+    (ImageFormat.TIFF, (400, 300), np.uint16),
+    (ImageFormat.PNG, (400, 300), np.uint8),
+    (ImageFormat.PNG, (400, 300), np.uint16),
+])
+def test_shape_from_header(tmp_path, tile_format, shape, dtype):
+    data = np.random.randint(0, 255, size=shape).astype(dtype)
+    filename = "tile.{}".format(tile_format.file_ext)
+    with open(fspath(tmp_path / filename), "wb") as fh:
+        tile_format.writer_func(fh, data)
+    tile, backend = _build_tile(tmp_path, filename, tile_format)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert tile.tile_shape == {DimensionNames.Y: shape[0], DimensionNames.X: shape[1]}
+    assert backend.bytes_read < 8192
+    assert tile._read_header() == (shape, np.dtype(dtype))
+    assert np.array_equal(tile.numpy_array, data)
+
+
+def test_shape_from_header_multipage_tiff(tmp_path):
+    """Multi-page TIFF files fall back to decoding the entire tile."""
+    tifffile = pytest.importorskip("tifffile")
+    data = np.random.randint(0, 255, size=(3, 40, 35), dtype=np.uint8)
+    tifffile.imwrite(fspath(tmp_path / "tile.tiff"), data, photometric="minisblack")
+    tile, backend = _build_tile(tmp_path, "tile.tiff", ImageFormat.TIFF)
+
+    assert tile._read_header() is None
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        assert tile.tile_shape == {DimensionNames.Y: 40, DimensionNames.X: 35}
+    assert "Decoding tile just to obtain shape" in str(w[0].message)
+
+
+def test_lazy_array_verifies_checksums(tmp_path):
+    """Tiles with a checksum are read in their entirety through the lazy array, such that a corrupt
+    tile raises instead of being read through ranged reads."""
+    tileset = slicedimage.TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch"],
+        {"ch": 2},
+        {DimensionNames.Y: 40, DimensionNames.X: 35},
+    )
+    for ch in range(2):
+        tile = Tile({DimensionNames.X: (0.0, 1.0), DimensionNames.Y: (0.0, 1.0)}, {"ch": ch})
+        tile.numpy_array = np.full((40, 35), ch, dtype=np.uint16)
+        tileset.add_tile(tile)
+    slicedimage.Writer.write_to_path(tileset, tmp_path / "tileset.json")
+
+    tile_path = tmp_path / "tileset-ch1.npy"
+    data = bytearray(tile_path.read_bytes())
+    data[-1] ^= 0xff
+    tile_path.write_bytes(bytes(data))
+
+    result = slicedimage.Reader.parse_doc("tileset.json", tmp_path.as_uri())
+    array = result.to_lazy_array()
+    assert np.all(array[0, 3:5, 3:5] == 0)
+    with pytest.raises(ChecksumValidationError):
+        np.asarray(array)
+    with pytest.raises(ChecksumValidationError):
+        array[1, 3:5, 3:5]
@@ -0,0 +1,286 @@
+import copy
+import gc
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from slicedimage import Tile, TileSet
+from slicedimage._dimensions import DimensionNames
+from slicedimage._tile_table import TileTable, TileView
+
+
+class Source:
+    """Produces futures that yield an array filled with the number in the tile's file name."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, name, sha256):
+        self.calls.append((name, sha256))
+        return lambda: np.full((4, 3), int(name.split(".")[0]), dtype=np.uint8)
+
+
+def _build_table(source, num_tiles=5):
+    table = TileTable()
+    for ix in range(num_tiles):
+        table.append_record(
+            {"xc": [ix, ix + 1], "yc": 0.5},
+            {"r": ix % 2, "z": ix},
+            {"y": 4, "x": 3} if ix != 1 else None,
+            "{:064x}".format(ix + 1),
+            {"ix": ix} if ix == 0 else None,
+            source,
+            "{}.npy".format(ix),
+        )
+    return table
+
+
+def test_records_round_trip():
+    source = Source()
+    table = _build_table(source)
+
+    tile = table.tile(0)
+    assert isinstance(tile, TileView)
+    assert isinstance(tile, Tile)
+    assert tile.coordinates == {"xc": (0.0, 1.0), "yc": (0.5, 0.5)}
+    assert tile.indices == {"r": 0, "z": 0}
+    assert tile.tile_shape == {DimensionNames.Y: 4, DimensionNames.X: 3}
+    assert tile.sha256 == "{:064x}".format(1)
+    assert tile.extras == {"ix": 0}
+    assert table.tile(2).extras == {}
+    assert table.tile(1)._tile_shape is None
+    assert len(source.calls) == 0
+
+    assert np.all(table.tile(3).numpy_array == 3)
+    assert source.calls == [("3.npy", "{:064x}".format(4))]
+
+
+def test_views_share_state():
+    table = _build_table(Source())
+    assert table.tile(1) is table.tile(1)
+    assert table.tile(1) is not table.tile(2)
+    assert table.tiles()[1] is table.tile(1)
+    assert table.tiles()[3] is table.tiles()[3]
+
+    # the shape discovered through one view is seen by the others.
+    assert table.tile(1).tile_shape == {DimensionNames.Y: 4, DimensionNames.X: 3}
+    assert table.tile(1)._tile_shape == {DimensionNames.Y: 4, DimensionNames.X: 3}
+
+    table.tile(2)._load()
+    assert table.tile(2)._numpy_array is not None
+    table.tile(4).extras["key"] = "value"
+    assert table.tile(4).extras == {"key": "value"}
+
+    # checksums that cannot be stored as digests are retained as they are.
+    table.tile(0).sha256 = "0" * 64
+    table.tile(1).sha256 = "ABC"
+    assert table.tile(0).sha256 == "0" * 64
+    assert table.tile(1).sha256 == "ABC"
+    table.tile(1).sha256 = None
+    assert table.tile(1).sha256 is None
+
+
+def test_view_coordinates_and_indices():
+    table = TileTable()
+    table.append_records(
+        [{"xc": [0.5, 1.5]}, {"xc": [0, 1], "zc": None}, {"xc": 2.5}],
+        [{"r": 0}, {"r": 1}, {"r": 2}],
+        [None] * 3, [None] * 3, [None] * 3, [Source()] * 3, ["0.npy", "1.npy", "2.npy"])
+
+    # coordinates are returned as they were given.
+    assert table.tile(0).coordinates == {"xc": (0.5, 1.5)}
+    assert table.tile(2).coordinates == {"xc": (2.5, 2.5)}
+    coordinates = table.tile(1).coordinates
+    assert coordinates == {"xc": (0, 1), "zc": (None, None)}
+    assert all(type(value) is int for value in coordinates["xc"])
+    assert np.isnan(table.coordinate_extents("zc")[0][1])
+
+    # changes to the coordinates and indices of a view are kept.
+    tile = table.tile(0)
+    tile.indices["hyb"] = 7
+    tile.coordinates["xc"] = (3, 4)
+    assert table.tile(0).indices == {"r": 0, "hyb": 7}
+    assert table.tiles()[0].coordinates == {"xc": (3, 4)}
+    tile.indices = {"r": 5}
+    assert table.tile(0).indices == {"r": 5}
+
+
+def test_tiles_accept_attributes():
+    tile = Tile({"xc": (0, 1)}, {"r": 0})
+    tile.label = "background"
+    assert tile.label == "background"
+
+    view = _build_table(Source()).tile(0)
+    view.label = "foreground"
+    assert view.label == "foreground"
+
+
+def test_lookups():
+    table = _build_table(Source())
+    tile = Tile({"xc": (10, 11)}, {"r": 1, "z": 5, "c": 0})
+    table.append_tile(tile)
+
+    assert table.tile(5) is tile
+    assert table.find({"r": 1, "z": 3}) == 3
+    assert table.find({"r": 1, "z": 5}) is None
+    assert table.find({"r": 1, "z": 5, "c": 0}) == 5
+    assert table.find({"r": 1, "q": 5}) is None
+    assert table.select({"r": 1}).tolist() == [1, 3, 5]
+    assert table.select({"r": 1, "z": 3}).tolist() == [3]
+    assert table.select({"r": 2}).tolist() == []
+    mins, maxs = table.coordinate_extents("xc")
+    assert mins.tolist() == [0, 1, 2, 3, 4, 10]
+    assert np.isnan(table.coordinate_extents("yc")[0][5])
+
+    # indices that are not integers are stored in object columns, and still found.
+    table.append_tile(Tile({"xc": 0}, {"r": "odd", "z": 6}))
+    assert table.find({"r": "odd", "z": 6}) == 6
+    assert table.find({"r": 1, "z": 3}) == 3
+    assert table.select({"r": 1}).tolist() == [1, 3, 5]
+    assert table.tile(3).indices == {"r": 1, "z": 3}
+
+
+def test_tileset_of_records():
+    tileset = TileSet(["x", "y", "r", "z"], {"r": 2, "z": 5})
+    source = Source()
+    for ix in range(5):
+        tileset._add_tile_record(
+            {"x": [0, 1], "y": [0, 1]}, {"r": ix % 2, "z": ix}, {"y": 4, "x": 3}, None, None,
+            source, "{}.npy".format(ix))
+
+    assert "x: 3, y: 4" in repr(tileset)
+    assert tileset.get_tile(r=0, z=4).indices == {"r": 0, "z": 4}
+    assert [tile.indices["z"] for tile in tileset.select(r=1)] == [1, 3]
+    assert len(tileset.query_region(x=0.5)) == 5
+    assert tileset.to_ndarray(["z"])[:, 0, 0].tolist() == [0, 1, 2, 3, 4]
+    assert len(source.calls) == 5
+
+
+def test_append_irregular_records():
+    table = TileTable()
+    source = Source()
+    table.append_records(
+        [{"xc": [0, 1], "yc": 0.5}, {"xc": 2}, {"yc": [1, 2]}],
+        [{"r": 0, "z": 0}, {"r": "odd"}, {"z": 2}],
+        [{"y": 4, "x": 3}, None, {"y": 5, "x": 6, "c": 1}],
+        ["{:064x}".format(1), "0" * 64, "ABC"],
+        [None, {"key": "value"}, None],
+        [source] * 3,
+        ["0.npy", "1.npy", "2.npy"],
+    )
+
+    assert table.tile(0).coordinates == {"xc": (0.0, 1.0), "yc": (0.5, 0.5)}
+    assert table.tile(1).coordinates == {"xc": (2.0, 2.0)}
+    assert table.tile(2).coordinates == {"yc": (1.0, 2.0)}
+    assert table.tile(0).indices == {"r": 0, "z": 0}
+    assert table.tile(1).indices == {"r": "odd"}
+    assert table.tile(2).indices == {"z": 2}
+    assert table.tile(0).tile_shape == {DimensionNames.Y: 4, DimensionNames.X: 3}
+    assert table.tile(1)._tile_shape is None
+    assert table.tile(2)._tile_shape == {"y": 5, "x": 6, "c": 1}
+    assert [table.tile(row).sha256 for row in range(3)] == [
+        "{:064x}".format(1), "0" * 64, "ABC"]
+    assert table.tile(1).extras == {"key": "value"}
+    assert table.find({"r": "odd"}) == 1
+    assert table.select({"z": 2}).tolist() == [2]
+
+
+def test_booleans_are_not_integer_indices():
+    bulk = TileTable()
+    bulk.append_records(
+        [{}, {}], [{"r": True}, {"r": 1}], [None, None], [None, None], [None, None],
+        [Source()] * 2, ["0.npy", "1.npy"])
+    rows = TileTable()
+    for ix, value in enumerate((True, 1)):
+        rows.append_record({}, {"r": value}, None, None, None, Source(), "{}.npy".format(ix))
+
+    for table in (bulk, rows):
+        assert table._indices["r"].dtype == object
+        assert table.tile(0).indices["r"] is True
+        assert table.find({"r": 1}) == 0
+        assert table.select({"r": True}).tolist() == [0, 1]
+
+
+def test_lookups_between_appends():
+    """The lookup structures are brought up to date with the tiles appended since they were last
+    used, both while the appended tiles are scanned, and once they are merged."""
+    table = TileTable()
+    source = Source()
+    rng = np.random.RandomState(0)
+    expected = []
+    for batch in range(40):
+        batch_size = int(rng.randint(1, 60))
+        batch_indices = [
+            {"r": int(r), "z": int(z)} for r, z in rng.randint(0, 8, size=(batch_size, 2))]
+        table.append_records(
+            [{"xc": ix} for ix in range(len(batch_indices))], batch_indices,
+            [None] * len(batch_indices), [None] * len(batch_indices),
+            [None] * len(batch_indices), [source] * len(batch_indices),
+            ["{}.npy".format(ix) for ix in range(len(batch_indices))])
+        expected.extend(batch_indices)
+
+        r, z = rng.randint(0, 8, size=2).tolist()
+        matches = [row for row, indices in enumerate(expected) if indices == {"r": r, "z": z}]
+        assert table.find({"r": r, "z": z}) == (matches[0] if matches else None)
+        assert table.select({"z": z}).tolist() == [
+            row for row, indices in enumerate(expected) if indices["z"] == z]
+        assert len(table.coordinate_extents("xc")[0]) == len(expected)
+
+
+def test_concurrent_lookups():
+    """Lookups from several threads at once should each find the right tiles, both when the lookup
+    structures are first built, and when the tiles appended since then are merged into them."""
+    tileset = TileSet(["x", "y", "r", "z"], {"r": 100, "z": 400})
+    source = Source()
+    num_tiles = 0
+    for batch_size in (20000, 5000):
+        indices = [
+            {"r": row % 100, "z": row // 100} for row in range(num_tiles, num_tiles + batch_size)]
+        tileset._table.append_records(
+            [{}] * batch_size, indices, [None] * batch_size, [None] * batch_size,
+            [None] * batch_size, [source] * batch_size, ["0.npy"] * batch_size)
+        num_tiles += batch_size
+        barrier = threading.Barrier(8)
+
+        def look_up(seed):
+            barrier.wait()
+            rng = np.random.RandomState(seed)
+            for row in rng.randint(0, num_tiles, size=200).tolist():
+                r, z = row % 100, row // 100
+                tile = tileset.get_tile(r=r, z=z)
+                assert tile is not None and tile.indices == {"r": r, "z": z}
+                tiles = tileset.select(z=z)
+                assert [tile.indices["r"] for tile in tiles] == list(range(100))
+
+        # switching threads often makes it likelier that lookups interleave.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                list(executor.map(look_up, range(8)))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+
+def test_views_are_not_retained():
+    """Views, and the dicts of their coordinates and indices, should be discarded once they are no
+    longer in use, unless they were changed."""
+    table = _build_table(Source())
+    view = table.tile(1)
+    view.indices
+    view.coordinates
+    view_ref = weakref.ref(view)
+    del view
+    gc.collect()
+    assert view_ref() is None
+    # the coordinates of the row were given as integers, so they are retained as they were given.
+    assert list(table._overrides[1].keys()) == ["coordinates"]
+
+    table.tile(1).indices["hyb"] = 2
+    table.tiles()[2].label = "foreground"
+    gc.collect()
+    assert table.tile(1).indices == {"r": 1, "z": 1, "hyb": 2}
+    assert table.tile(2).label == "foreground"
+    assert copy.deepcopy(table.tile(3).indices).__class__ is dict
@@ -0,0 +1,214 @@
+import unittest
+
+import numpy as np
+
+from slicedimage import Collection, Tile, TileSet
+from slicedimage._dimensions import DimensionNames
+
+
+def build_tileset(num_hyb=2, num_ch=3, tile_shape=(12, 8)):
+    """
+    Returns a tileset where each tile's data is provided by a future.  Each tile's data is filled
+    with hyb * 10 + ch.
+    """
+    tileset = TileSet(
+        [DimensionNames.X, DimensionNames.Y, "ch", "hyb"],
+        {'ch': num_ch, 'hyb': num_hyb},
+        {DimensionNames.Y: tile_shape[0], DimensionNames.X: tile_shape[1]},
+    )
+    for hyb in range(num_hyb):
+        for ch in range(num_ch):
+            tile = Tile(
+                {
+                    DimensionNames.X: (ch, ch + 1),
+                    DimensionNames.Y: (hyb, hyb + 1),
+                },
+                {
+                    'hyb': hyb,
+                    'ch': ch,
+                },
+            )
+            tile.set_numpy_array_future(
+                lambda value=hyb * 10 + ch: np.full(tile_shape, value, dtype=np.uint16))
+            tileset.add_tile(tile)
+    return tileset
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_prefetch(self):
+        tileset = build_tileset()
+        progress = []
+        results = tileset.prefetch(
+            max_workers=2,
+            progress_callback=lambda tile, exception: progress.append((tile, exception)))
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(len(progress), 6)
+        for tile, exception in results:
+            self.assertIsNone(exception)
+            # the data should have been retained by the tile.
+            self.assertIsNone(tile._numpy_array_future)
+            self.assertTrue(np.all(
+                tile.numpy_array == tile.indices['hyb'] * 10 + tile.indices['ch']))
+
+    def test_prefetch_filter_and_errors(self):
+        tileset = build_tileset()
+
+        def fail():
+            raise IOError("tile is missing")
+
+        broken_tile = tileset.tiles(lambda tile: tile.indices == {'hyb': 1, 'ch': 1})[0]
+        broken_tile.set_numpy_array_future(fail)
+
+        results = tileset.prefetch(lambda tile: tile.indices['hyb'] == 1)
+        self.assertEqual(len(results), 3)
+        for tile, exception in results:
+            self.assertEqual(tile.indices['hyb'], 1)
+            if tile is broken_tile:
+                self.assertIsInstance(exception, IOError)
+            else:
+                self.assertIsNone(exception)
+
+        # tiles that were not selected should not have been fetched.
+        for tile in tileset.tiles(lambda tile: tile.indices['hyb'] == 0):
+            self.assertIsNotNone(tile._numpy_array_future)
+
+
+class TestIndexedLookup(unittest.TestCase):
+    def test_get_tile(self):
+        tileset = build_tileset()
+        tile = tileset.get_tile(hyb=1, ch=2)
+        self.assertEqual(tile.indices, {'hyb': 1, 'ch': 2})
+        self.assertIs(tile, tileset.tiles(lambda t: t.indices == {'hyb': 1, 'ch': 2})[0])
+
+        self.assertIsNone(tileset.get_tile(hyb=1, ch=3))
+        # the indices must match exactly.
+        self.assertIsNone(tileset.get_tile(hyb=1))
+        self.assertIsNone(tileset.get_tile(hyb=1, ch=2, zplane=0))
+
+    def test_select(self):
+        tileset = build_tileset()
+        self.assertEqual(
+            tileset.select(ch=1), tileset.tiles(lambda t: t.indices['ch'] == 1))
+        self.assertEqual(
+            tileset.select(hyb=0, ch=1), tileset.tiles(lambda t: t.indices == {'hyb': 0, 'ch': 1}))
+        self.assertEqual(tileset.select(), tileset.tiles())
+        self.assertEqual(tileset.select(ch=5), [])
+        self.assertEqual(tileset.select(zplane=0), [])
+
+    def test_collection_select(self):
+        collection = Collection()
+        collection.add_partition("fov000", build_tileset())
+        collection.add_partition("fov001", build_tileset())
+        self.assertEqual(
+            collection.select(hyb=1, ch=0),
+            collection.tiles(lambda t: t.indices == {'hyb': 1, 'ch': 0}))
+        self.assertEqual(len(collection.select(hyb=1, ch=0)), 2)
+
+
+class TestQueryRegion(unittest.TestCase):
+    def test_query_region(self):
+        # tiles span x in [ch, ch + 1] and y in [hyb, hyb + 1].
+        tileset = build_tileset()
+
+        def indices(tiles):
+            return [(tile.indices['hyb'], tile.indices['ch']) for tile in tiles]
+
+        self.assertEqual(indices(tileset.query_region(x=(0.25, 0.5))), [(0, 0), (1, 0)])
+        self.assertEqual(
+            indices(tileset.query_region(x=(0.5, 0.25), y=1.5)), [(1, 0)])
+        # ranges are inclusive, so tiles that touch the region match.
+        self.assertEqual(indices(tileset.query_region(x=2, y=(0, 0.5))), [(0, 1), (0, 2)])
+        self.assertEqual(tileset.query_region(x=(10, 20)), [])
+        self.assertEqual(tileset.query_region(zplane=(0, 1)), [])
+        self.assertEqual(tileset.query_region(), tileset.tiles())
+
+        # the index should pick up tiles added after a query.
+        tile = Tile({DimensionNames.X: (0.25, 0.5), DimensionNames.Y: 7}, {'hyb': 2, 'ch': 0})
+        tileset.add_tile(tile)
+        self.assertEqual(tileset.query_region(y=(6, 8)), [tile])
+
+
+class TestToNdarray(unittest.TestCase):
+    def test_to_ndarray(self):
+        tileset = build_tileset()
+        result = tileset.to_ndarray(max_workers=2)
+        self.assertEqual(result.shape, (3, 2, 12, 8))
+        self.assertEqual(result.dtype, np.uint16)
+        for ch in range(3):
+            for hyb in range(2):
+                self.assertTrue(np.all(result[ch, hyb] == hyb * 10 + ch))
+
+        result = tileset.to_ndarray(dims_order=("hyb", "ch"), dtype=np.float32)
+        self.assertEqual(result.shape, (2, 3, 12, 8))
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(result[1, 2, 0, 0], 12.0)
+
+    def test_to_ndarray_out(self):
+        tileset = build_tileset()
+        out = np.full((2, 3, 12, 8), -1, dtype=np.int32)
+        self.assertIs(tileset.to_ndarray(dims_order=("hyb", "ch"), out=out), out)
+        self.assertEqual(out[1, 0, 5, 5], 10)
+
+        with self.assertRaises(ValueError):
+            tileset.to_ndarray(out=out)
+
+
+class TestToLazyArray(unittest.TestCase):
+    def test_tiles_read_on_access(self):
+        tileset = build_tileset(num_hyb=3)
+        reads = []
+        for tile in tileset.tiles():
+            tile.set_numpy_array_future(
+                lambda future=tile._numpy_array_future, indices=tile.indices: (
+                    reads.append(indices) or future()))
+
+        array = tileset.to_lazy_array(dims_order=("hyb", "ch"), dtype=np.uint16, max_workers=2)
+        self.assertEqual(array.shape, (3, 3, 12, 8))
+        self.assertEqual(array.chunks, ((1, 1, 1), (1, 1, 1), (12,), (8,)))
+        self.assertEqual(len(reads), 0)
+
+        crop = array[1, 1:, 2:5, -3:]
+        self.assertEqual(crop.shape, (2, 3, 3))
+        self.assertTrue(np.all(crop[0] == 11))
+        self.assertTrue(np.all(crop[1] == 12))
+        self.assertEqual(
+            sorted((indices["hyb"], indices["ch"]) for indices in reads), [(1, 1), (1, 2)])
+
+        self.assertEqual(array[..., 0, 0].tolist(), [[0, 1, 2], [10, 11, 12], [20, 21, 22]])
+        self.assertTrue(np.array_equal(np.asarray(array), tileset.to_ndarray(("hyb", "ch"))))
+
+    def test_reduce(self):
+        tileset = build_tileset(num_hyb=3)
+        array = tileset.to_lazy_array(max_workers=2)
+        self.assertEqual(array.dtype, np.uint16)
+
+        projection = array.max("hyb")
+        self.assertEqual(projection.shape, (3, 12, 8))
+        self.assertEqual(projection[:, 0, 0].tolist(), [20, 21, 22])
+
+        total = array.sum(1, dtype=np.uint64)
+        self.assertEqual(total.dtype, np.uint64)
+        self.assertEqual(total[:, 0, 0].tolist(), [30, 33, 36])
+
+    def test_sum_upcasts(self):
+        tileset = build_tileset(num_hyb=2)
+        for tile in tileset.tiles():
+            tile.numpy_array = np.full((12, 8), 40000, dtype=np.uint16)
+        array = tileset.to_lazy_array(max_workers=2)
+
+        total = array.sum("hyb")
+        self.assertEqual(total.dtype, np.add.reduce(np.zeros(1, dtype=np.uint16)).dtype)
+        self.assertTrue(np.all(total == 80000))
+        self.assertEqual(array.max("hyb").dtype, np.uint16)
+
+    def test_missing_tiles(self):
+        tileset = build_tileset()
+        tileset.shape["hyb"] = 3
+        array = tileset.to_lazy_array(dims_order=("hyb", "ch"), dtype=np.uint16)
+        self.assertTrue(np.all(array[2] == 0))
+        self.assertEqual(array.max(0)[:, 0, 0].tolist(), [10, 11, 12])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import contextlib
+import os
 import socket
 
 from tests.utils.contextchild import ContextualChildProcess
@@ -14,6 +15,10 @@ def unused_tcp_port():
         return sock.getsockname()[1]
 
 
+PUT_SERVER_PATH = os.path.join(os.path.dirname(__file__), "putserver.py")
+"""Path to a script that runs an HTTP server that accepts PUT requests."""
+
+
 def build_skeleton_manifest():
     """
     Returns a 0.0.0 formatted manifest with no tiles.
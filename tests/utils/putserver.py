@@ -0,0 +1,27 @@
+"""
+An HTTP server that serves files from the current directory, and accepts PUT requests to write
+them.  Run as `python putserver.py <port>`.
+"""
+import http.server
+import os
+import sys
+
+
+class PutRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def do_PUT(self):
+        path = self.translate_path(self.path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        length = int(self.headers["Content-Length"])
+        with open(path, "wb") as fh:
+            while length > 0:
+                data = self.rfile.read(min(length, 1024 * 1024))
+                if len(data) == 0:
+                    break
+                fh.write(data)
+                length -= len(data)
+        self.send_response(201)
+        self.end_headers()
+
+
+if __name__ == "__main__":
+    http.server.HTTPServer(("127.0.0.1", int(sys.argv[1])), PutRequestHandler).serve_forever()